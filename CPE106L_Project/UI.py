@@ -1,6 +1,8 @@
 import flet as ft
+import asyncio
 import datetime
-import requests
+import httpx
+from api_client import ApiClient, ApiError
 
 BG_COLOR = "#f8f9fa"
 PRIMARY_COLOR = "#0d6efd"
@@ -13,7 +15,7 @@ SECONDARY_COLOR = "#6c757d"
 SHADOW_COLOR = "#1A000000"
 
 user_id = 1  # Hardcoded for now, but could be dynamic later
-API_BASE_URL = "http://127.0.0.1:8000/api"  # FastAPI base URL
+api = ApiClient()  # Pooled keep-alive client for the FastAPI backend
 
 def main(page: ft.Page):
     page.title = "Community Mental Health Tracker"
@@ -32,7 +34,22 @@ def main(page: ft.Page):
     file_picker = ft.FilePicker(on_result=save_file_result)
     page.overlay.append(file_picker)
 
-    def handle_login(e):
+    # In-flight requests; a newer click on the same action cancels the older one
+    pending_tasks = {}
+
+    async def run_latest(key, coro):
+        previous = pending_tasks.get(key)
+        if previous and not previous.done():
+            previous.cancel()
+        task = asyncio.ensure_future(coro)
+        pending_tasks[key] = task
+        try:
+            return await task
+        finally:
+            if pending_tasks.get(key) is task:
+                del pending_tasks[key]
+
+    async def handle_login(e):
         username = username_field.value
         if not username:
             username_field.error_text = "Username cannot be empty"
@@ -40,19 +57,34 @@ def main(page: ft.Page):
             return
 
         # Create or check user
-        response = requests.post(f"{API_BASE_URL}/create-user", json={
-            "user_id": user_id,
-            "name": username
-        })
-
-        if response.status_code == 200 or response.status_code == 400:
+        try:
+            await run_latest("login", api.create_user(user_id, username))
             page.go("/main")
-        else:
+        except asyncio.CancelledError:
+            return
+        except ApiError as ex:
+            if ex.status_code == 400:
+                page.go("/main")
+                return
             page.snack_bar = ft.SnackBar(content=ft.Text("Login failed."), bgcolor="red500")
             page.snack_bar.open = True
             page.update()
+        except httpx.HTTPError:
+            page.snack_bar = ft.SnackBar(content=ft.Text("Cannot connect to the server."), bgcolor="red500")
+            page.snack_bar.open = True
+            page.update()
 
-    def select_mood(e):
+    confirmed_mood = {"container": None}
+
+    def paint_mood_selection(selected_container):
+        for item_container in mood_items_ref:
+            is_selected = (item_container == selected_container)
+            item_container.bgcolor = PRIMARY_COLOR if is_selected else WHITE
+            item_container.border = ft.border.all(1, PRIMARY_COLOR if is_selected else BORDER_COLOR)
+            item_container.content.controls[0].color = WHITE if is_selected else None
+            item_container.content.controls[1].color = WHITE if is_selected else TEXT_MUTED
+
+    async def select_mood(e):
         clicked_container = e.control
         score_map = {
             "Happy": 9,
@@ -64,27 +96,25 @@ def main(page: ft.Page):
         label = clicked_container.content.controls[1].value
         score = score_map.get(label, 5)
 
-        response = requests.post(f"{API_BASE_URL}/mood-entry", json={
-            "user_id": user_id,
-            "mood_score": score,
-            "notes": f"Selected mood: {label}"
-        })
-
-        if response.status_code == 200:
+        # Show the selection right away and roll it back if the server rejects it
+        paint_mood_selection(clicked_container)
+        page.update()
+        try:
+            await run_latest("mood", api.add_mood(user_id, score, f"Selected mood: {label}"))
+            confirmed_mood["container"] = clicked_container
             page.snack_bar = ft.SnackBar(content=ft.Text(f"Mood '{label}' saved!"), bgcolor=SUCCESS_COLOR)
-        else:
-            page.snack_bar = ft.SnackBar(content=ft.Text(f"Error: {response.json().get('detail', 'Unknown error')}"), bgcolor="red500")
-
-        for item_container in mood_items_ref:
-            is_selected = (item_container == clicked_container)
-            item_container.bgcolor = PRIMARY_COLOR if is_selected else WHITE
-            item_container.border = ft.border.all(1, PRIMARY_COLOR if is_selected else BORDER_COLOR)
-            item_container.content.controls[0].color = WHITE if is_selected else None
-            item_container.content.controls[1].color = WHITE if is_selected else TEXT_MUTED
+        except asyncio.CancelledError:
+            return  # A newer mood click superseded this one
+        except ApiError as ex:
+            paint_mood_selection(confirmed_mood["container"])
+            page.snack_bar = ft.SnackBar(content=ft.Text(f"Error: {ex.detail}"), bgcolor="red500")
+        except httpx.HTTPError as ex:
+            paint_mood_selection(confirmed_mood["container"])
+            page.snack_bar = ft.SnackBar(content=ft.Text(f"Failed to connect to the server: {ex}"), bgcolor="red500")
         page.snack_bar.open = True
         page.update()
 
-    def save_entry(e):
+    async def save_entry(e):
         content = journal_entry_ref.current.value
         if not content:
             page.snack_bar = ft.SnackBar(content=ft.Text("Journal entry is empty."), bgcolor="red500")
@@ -92,28 +122,26 @@ def main(page: ft.Page):
             page.update()
             return
 
+        journal_entry_ref.current.value = ""  # Clear the input field
+        page.update()
         try:
-            response = requests.post(
-                f"{API_BASE_URL}/journal-entry",
-                json={"user_id": user_id, "content": content},
-            )
-            if response.status_code == 200:
-                journal_entry_ref.current.value = ""  # Clear the input field
-                page.snack_bar = ft.SnackBar(content=ft.Text("Journal entry saved successfully!"), bgcolor=SUCCESS_COLOR)
-            else:
-                page.snack_bar = ft.SnackBar(content=ft.Text(f"Error: {response.json().get('detail', 'Unknown error')}"), bgcolor="red500")
-        except Exception as ex:
-            page.snack_bar = ft.SnackBar(content=ft.Text(f"Failed to connect to the server: {ex}"), bgcolor="red500")
+            await api.add_journal(user_id, content)
+            page.snack_bar = ft.SnackBar(content=ft.Text("Journal entry saved successfully!"), bgcolor=SUCCESS_COLOR)
+        except (ApiError, httpx.HTTPError) as ex:
+            journal_entry_ref.current.value = content  # Give the text back so nothing is lost
+            detail = ex.detail if isinstance(ex, ApiError) else f"Failed to connect to the server: {ex}"
+            page.snack_bar = ft.SnackBar(content=ft.Text(f"Error: {detail}"), bgcolor="red500")
         page.snack_bar.open = True
         page.update()
 
-    def get_recommendations(e):
-        response = requests.get(f"{API_BASE_URL}/recommendation/{user_id}")
-        if response.status_code == 200:
-            rec = response.json()
+    async def get_recommendations(e):
+        try:
+            rec = await run_latest("recommendation", api.recommendation(user_id))
             recommendation_text_ref.current.value = f"{rec['strategy']} — {rec['reason']}"
             recommendation_output_ref.current.visible = True
-        else:
+        except asyncio.CancelledError:
+            return
+        except (ApiError, httpx.HTTPError):
             page.snack_bar = ft.SnackBar(content=ft.Text("Failed to fetch recommendation."), bgcolor="red500")
             page.snack_bar.open = True
         page.update()
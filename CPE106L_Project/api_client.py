@@ -0,0 +1,99 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
+import httpx
+
+# --- Client Settings ---
+API_BASE_URL = "http://127.0.0.1:8000/api"
+CONNECT_TIMEOUT = 3.05   # seconds to establish the TCP connection
+READ_TIMEOUT = 10        # seconds to wait for the server's response
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.3     # sleeps 0.3s, 0.6s, 1.2s between retries
+RETRY_STATUSES = (502, 503, 504)
+
+logger = logging.getLogger("tracker.api")
+
+
+class ApiError(Exception):
+    """Raised when the server answers with a non-2xx status."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(f"{status_code}: {detail}")
+        self.status_code = status_code
+        self.detail = detail
+
+
+class ApiClient:
+    """Typed async wrapper around the Community Mental Health Tracker REST API.
+
+    One pooled httpx.AsyncClient is reused for every call, so the TCP
+    connection to the backend stays alive between clicks.  Connection
+    failures are retried for every method; read errors and 502/503/504
+    responses are only retried for GETs, so a POST is never sent twice
+    after the server has received it.  Cancelling the awaiting task
+    aborts the request."""
+
+    def __init__(self, base_url: str = API_BASE_URL, connect_timeout: float = CONNECT_TIMEOUT,
+                 read_timeout: float = READ_TIMEOUT, retries: int = MAX_RETRIES,
+                 backoff_factor: float = BACKOFF_FACTOR):
+        self.base_url = base_url.rstrip("/")
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=4, max_keepalive_connections=4),
+        )
+
+    async def close(self):
+        await self.client.aclose()
+
+    # --- Transport ---
+    async def _send(self, method: str, path: str, **kwargs) -> httpx.Response:
+        attempt = 0
+        while True:
+            try:
+                response = await self.client.request(method, path, **kwargs)
+                if method != "GET" or response.status_code not in RETRY_STATUSES or attempt >= self.retries:
+                    return response
+            except (httpx.ConnectError, httpx.ConnectTimeout):
+                if attempt >= self.retries:
+                    raise
+            except httpx.TransportError:
+                if method != "GET" or attempt >= self.retries:
+                    raise
+            await asyncio.sleep(self.backoff_factor * (2 ** attempt))
+            attempt += 1
+
+    async def _request(self, method: str, path: str, **kwargs) -> dict:
+        start = time.perf_counter()
+        try:
+            response = await self._send(method, path, **kwargs)
+        except httpx.HTTPError as ex:
+            logger.warning("%s %s failed after %.1f ms: %s", method, path, (time.perf_counter() - start) * 1000, ex)
+            raise
+        logger.info("%s %s -> %d in %.1f ms", method, path, response.status_code, (time.perf_counter() - start) * 1000)
+        if not response.is_success:
+            try:
+                detail = response.json().get("detail", response.reason_phrase)
+            except ValueError:
+                detail = response.reason_phrase
+            raise ApiError(response.status_code, detail)
+        return response.json()
+
+    # --- Endpoints ---
+    async def create_user(self, user_id: int, name: str) -> dict:
+        """Creates the user, or does nothing if the user already exists."""
+        return await self._request("POST", "/create-user", json={"user_id": user_id, "name": name})
+
+    async def add_mood(self, user_id: int, mood_score: int, notes: Optional[str] = "") -> dict:
+        return await self._request("POST", "/mood-entry", json={"user_id": user_id, "mood_score": mood_score, "notes": notes})
+
+    async def add_journal(self, user_id: int, content: str) -> dict:
+        return await self._request("POST", "/journal-entry", json={"user_id": user_id, "content": content})
+
+    async def recommendation(self, user_id: int) -> dict:
+        """Returns {"strategy": ..., "reason": ...} based on the user's mood history."""
+        return await self._request("GET", f"/recommendation/{user_id}")
@@ -1,28 +1,70 @@
+import re
+from lineindex import LineIndex, ResultPages, TokenIndex, parseRange
+
+def print_next_matches(lines, results):
+    page = results.nextPage()
+    if not page:
+        print("No more matches." if results.shown else "No matches.")
+    for line_number in page:
+        print(f"Line {line_number}: {lines.lineAt(line_number)}")
+
 def navigate_file_lines():
     filename = input("Enter the filename: ")
 
     try:
-        with open(filename, 'r') as file:
-            lines = file.readlines()
+        # Only the line offsets are loaded; lines are read on demand
+        lines = LineIndex(filename)
     except FileNotFoundError:
         print(f"File '{filename}' not found.")
         return
 
     total_lines = len(lines)
     print(f"The file '{filename}' has {total_lines} lines.")
+    print("You can also enter a range (100-200), /text to search, re:pattern for a regex search,")
+    print("w:word to look up a whole word, or n for the next page of matches.")
 
+    results = None
+    token_index = None
     while True:
-        try:
-            line_number = int(input(f"Enter a line number (1 to {total_lines}, or 0 to quit): "))
-            if line_number == 0:
-                print("Exiting the program.")
-                break
-            elif 1 <= line_number <= total_lines:
-                print(f"Line {line_number}: {lines[line_number - 1].strip()}")
+        command = input(f"Enter a line number (1 to {total_lines}, or 0 to quit): ").strip()
+        line_range = parseRange(command)
+        if line_range:
+            for line_number, text in lines.lineRange(*line_range):
+                print(f"Line {line_number}: {text}")
+        elif command.startswith("/"):
+            results = ResultPages(lines.search(command[1:]))
+            print_next_matches(lines, results)
+        elif command.startswith("re:"):
+            try:
+                # search() compiles the pattern before returning
+                results = ResultPages(lines.search(command[3:], regex=True))
+            except re.error as error:
+                print(f"Invalid regular expression: {error}")
+            else:
+                print_next_matches(lines, results)
+        elif command.startswith("w:"):
+            if token_index is None:
+                print("Building the word index...")
+                token_index = TokenIndex(lines)
+            results = ResultPages(token_index.lookup(command[2:].strip()))
+            print_next_matches(lines, results)
+        elif command == "n":
+            if results is None:
+                print("Search for something first.")
             else:
-                print(f"Invalid line number. Please enter a number between 1 and {total_lines}, or 0 to quit.")
-        except ValueError:
-            print("Invalid input. Please enter a valid integer.")
+                print_next_matches(lines, results)
+        else:
+            try:
+                line_number = int(command)
+                if line_number == 0:
+                    print("Exiting the program.")
+                    break
+                elif 1 <= line_number <= total_lines:
+                    print(f"Line {line_number}: {lines[line_number - 1].strip()}")
+                else:
+                    print(f"Invalid line number. Please enter a number between 1 and {total_lines}, or 0 to quit.")
+            except ValueError:
+                print("Invalid input. Please enter a valid integer or a command.")
 
 # Run the program
 navigate_file_lines()
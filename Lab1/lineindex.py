@@ -0,0 +1,310 @@
+"""
+File: lineindex.py
+Random access to the lines of a large text file through a table of
+line start offsets, so a line can be shown without reading the file
+into memory.  Also provides substring/regex search over the file,
+line ranges, paginated results, and an optional inverted word index.
+"""
+
+import bisect
+import itertools
+import mmap
+import os
+import re
+import struct
+import zlib
+from array import array
+
+INDEX_SUFFIX = ".idx"
+TOKEN_SUFFIX = ".tok"
+TOKEN_MAGIC = b"TOKIDX02"
+TOKEN_HEADER = struct.Struct("<8sQQI")   # magic, file size, mtime (ns), token count
+TOKEN_ENTRY = struct.Struct("<II")       # token length in bytes, posting count
+TOKEN_PATTERN = re.compile(r"\w+")
+PAGE_SIZE = 20
+SEARCH_BLOCK = 10000   # Lines decoded at a time by a regex or case-insensitive search
+INDEX_MAGIC = b"LINEIDX1"
+HEADER = struct.Struct("<8sQQQI")   # magic, file size, mtime (ns), line count, tail checksum
+TAIL_BYTES = 4096                   # Bytes before the indexed end used to detect rewrites
+
+
+class LineIndex:
+    """Behaves like a read-only list of the file's lines.
+
+    The offsets are found in one scan of a memory map and kept in an
+    array('Q') (8 bytes per line).  They are saved in a sidecar file
+    (fileName + ".idx") and reused while the file's size and mtime are
+    unchanged.  When the file has only been appended to, just the new
+    bytes are scanned."""
+
+    def __init__(self, fileName, encoding = "utf-8", useSidecar = True):
+        self.fileName = fileName
+        self.encoding = encoding
+        self.indexName = fileName + INDEX_SUFFIX if useSidecar else None
+        self._file = open(fileName, 'rb')
+        self.offsets = array('Q')
+        self.size = 0
+        self.mtime = 0
+        self.tailCrc = 0
+        if not self._loadSidecar():
+            self.refresh()
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, i):
+        """Returns line i (counting from 0), including its line ending."""
+        if i < 0:
+            i += len(self.offsets)
+        if not 0 <= i < len(self.offsets):
+            raise IndexError("line index out of range")
+        return self.readBytes(i, i + 1).decode(self.encoding, errors="replace")
+
+    def lineAt(self, number):
+        """Returns line `number` (counting from 1) without its line ending."""
+        return self[number - 1].rstrip("\r\n")
+
+    def readBytes(self, first, last):
+        """Returns the raw bytes of lines first..last-1 (counting from 0)."""
+        start = self.offsets[first]
+        end = self.offsets[last] if last < len(self.offsets) else self.size
+        self._file.seek(start)
+        return self._file.read(end - start)
+
+    def lineNumberAt(self, offset):
+        """Returns the number (counting from 1) of the line holding byte `offset`."""
+        return bisect.bisect_right(self.offsets, offset)
+
+    def lineRange(self, first, last):
+        """Returns (number, text) pairs for lines first..last (counting from 1),
+        read from disk in one go."""
+        first = max(first, 1)
+        last = min(last, len(self.offsets))
+        if first > last:
+            return []
+        text = self.readBytes(first - 1, last).decode(self.encoding, errors="replace")
+        # Split only where the offsets do; splitlines() would also
+        # split at form feeds, \x85, \u2028 and the like
+        lines = text.split("\n")
+        if text.endswith("\n"):
+            lines.pop()
+        return [(number, line[:-1] if line.endswith("\r") else line)
+                for number, line in zip(itertools.count(first), lines)]
+
+    def search(self, pattern, regex = False, ignoreCase = False):
+        """Returns an iterator over the numbers (counting from 1), in
+        order, of the lines containing `pattern`: a plain substring
+        unless `regex` is True, when it is a regular expression (str
+        or compiled str pattern).  The expression is compiled here,
+        so an invalid one raises re.error before any line is read.
+
+        A plain, case-sensitive substring is found in C through a
+        memory map of the file, each hit mapped back to its line with
+        a binary search of the offsets.  Other searches decode the
+        file SEARCH_BLOCK lines at a time and match the text, so "."
+        and "\\w" match whole non-ASCII characters."""
+        if not regex and not ignoreCase:
+            return self._findBytes(pattern.encode(self.encoding))
+        if isinstance(pattern, re.Pattern):
+            compiled = pattern
+        else:
+            flags = re.MULTILINE | (re.IGNORECASE if ignoreCase else 0)
+            compiled = re.compile(pattern if regex else re.escape(pattern), flags)
+        return self._searchText(compiled)
+
+    def _findBytes(self, needle):
+        if self.size == 0:
+            return
+        with mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            position = 0
+            while position < self.size:
+                hit = mm.find(needle, position, self.size)
+                if hit == -1:
+                    return
+                number = self.lineNumberAt(hit)
+                yield number
+                # Continue at the next line so each line is reported once
+                position = self.offsets[number] if number < len(self.offsets) else self.size
+
+    def _searchText(self, compiled):
+        for first in range(0, len(self.offsets), SEARCH_BLOCK):
+            last = min(first + SEARCH_BLOCK, len(self.offsets))
+            text = self.readBytes(first, last).decode(self.encoding, errors="replace")
+            number = first + 1
+            lineStart = 0
+            position = 0
+            while True:
+                match = compiled.search(text, position)
+                if match is None:
+                    break
+                hit = match.start()
+                number += text.count("\n", lineStart, hit)
+                yield number
+                # Continue at the next line so each line is reported once
+                lineStart = text.find("\n", hit)
+                if lineStart == -1:
+                    break
+                lineStart += 1
+                number += 1
+                position = lineStart
+
+    def refresh(self):
+        """Brings the index up to date with the file on disk: extends it
+        if the file was appended to, rebuilds it if it was rewritten."""
+        stat = os.stat(self.fileName)
+        if stat.st_size == self.size and stat.st_mtime_ns == self.mtime:
+            return
+        if stat.st_size <= self.size or self._tailChecksum(self.size) != self.tailCrc:
+            self.offsets = array('Q')
+            self.size = 0
+        self._scan(self.size, stat.st_size)
+        self.size = stat.st_size
+        self.mtime = stat.st_mtime_ns
+        self.tailCrc = self._tailChecksum(self.size)
+        self._saveSidecar()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _scan(self, start, end):
+        """Records the start of every line beginning in bytes [start, end)."""
+        if end == 0:
+            return
+        with mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if start == 0:
+                self.offsets.append(0)
+            elif mm[start - 1:start] == b"\n":
+                self.offsets.append(start)   # The old last line was complete
+            position = mm.find(b"\n", start, end)
+            while position != -1 and position + 1 < end:
+                self.offsets.append(position + 1)
+                position = mm.find(b"\n", position + 1, end)
+
+    def _tailChecksum(self, size):
+        start = max(0, size - TAIL_BYTES)
+        self._file.seek(start)
+        return zlib.crc32(self._file.read(size - start))
+
+    def _loadSidecar(self):
+        if self.indexName is None:
+            return False
+        try:
+            with open(self.indexName, 'rb') as f:
+                magic, size, mtime, count, tailCrc = HEADER.unpack(f.read(HEADER.size))
+                if magic != INDEX_MAGIC:
+                    return False
+                offsets = array('Q')
+                offsets.fromfile(f, count)
+        except (OSError, EOFError, struct.error):
+            return False
+        self.offsets, self.size, self.mtime, self.tailCrc = offsets, size, mtime, tailCrc
+        self.refresh()   # Reuses the index as is, extends it, or rebuilds it
+        return True
+
+    def _saveSidecar(self):
+        if self.indexName is None:
+            return
+        try:
+            temporary = self.indexName + ".tmp"
+            with open(temporary, 'wb') as f:
+                f.write(HEADER.pack(INDEX_MAGIC, self.size, self.mtime, len(self.offsets), self.tailCrc))
+                self.offsets.tofile(f)
+            os.replace(temporary, self.indexName)
+        except OSError:
+            pass   # A read-only directory just means no sidecar
+
+
+class TokenIndex:
+    """Inverted index from each word of a file to the lines it appears on.
+
+    Building it takes one pass over the file; it is then saved beside
+    the file (fileName + ".tok") and reloaded while the file is
+    unchanged, so word lookups on the same large file are instant."""
+
+    def __init__(self, lineIndex):
+        self.lineIndex = lineIndex
+        self.indexName = lineIndex.fileName + TOKEN_SUFFIX
+        self.postings = {}
+        if not self._load():
+            self._build()
+            self._save()
+
+    def lookup(self, word):
+        """Returns the line numbers (counting from 1) on which `word` appears."""
+        return self.postings.get(word.lower().encode(self.lineIndex.encoding), array('I'))
+
+    def _build(self, blockLines = 10000):
+        self.postings = {}
+        lines = self.lineIndex
+        encoding = lines.encoding
+        for first in range(0, len(lines), blockLines):
+            block = lines.readBytes(first, min(first + blockLines, len(lines)))
+            block = block.decode(encoding, errors="replace").lower()
+            for number, line in enumerate(block.split("\n"), first + 1):
+                for word in set(TOKEN_PATTERN.findall(line)):
+                    token = word.encode(encoding)
+                    postings = self.postings.get(token)
+                    if postings is None:
+                        postings = self.postings[token] = array('I')
+                    postings.append(number)
+
+    def _load(self):
+        try:
+            with open(self.indexName, 'rb') as f:
+                magic, size, mtime, count = TOKEN_HEADER.unpack(f.read(TOKEN_HEADER.size))
+                if magic != TOKEN_MAGIC or size != self.lineIndex.size or mtime != self.lineIndex.mtime:
+                    return False
+                postings = {}
+                for _ in range(count):
+                    tokenLength, postingCount = TOKEN_ENTRY.unpack(f.read(TOKEN_ENTRY.size))
+                    token = f.read(tokenLength)
+                    lines = array('I')
+                    lines.fromfile(f, postingCount)
+                    postings[token] = lines
+        except (OSError, EOFError, struct.error):
+            return False
+        self.postings = postings
+        return True
+
+    def _save(self):
+        try:
+            temporary = self.indexName + ".tmp"
+            with open(temporary, 'wb') as f:
+                f.write(TOKEN_HEADER.pack(TOKEN_MAGIC, self.lineIndex.size, self.lineIndex.mtime, len(self.postings)))
+                for token, lines in self.postings.items():
+                    f.write(TOKEN_ENTRY.pack(len(token), len(lines)))
+                    f.write(token)
+                    lines.tofile(f)
+            os.replace(temporary, self.indexName)
+        except OSError:
+            pass
+
+
+class ResultPages:
+    """Hands out search results a page at a time, pulling them lazily
+    from the search so a query with millions of hits stays cheap."""
+
+    def __init__(self, numbers, pageSize = PAGE_SIZE):
+        self._numbers = iter(numbers)
+        self.pageSize = pageSize
+        self.shown = 0
+
+    def nextPage(self):
+        """Returns the next page of line numbers (empty when exhausted)."""
+        page = list(itertools.islice(self._numbers, self.pageSize))
+        self.shown += len(page)
+        return page
+
+
+def parseRange(text):
+    """Returns (first, last) for input like "100-200", or None."""
+    match = re.fullmatch(r"\s*(\d+)\s*-\s*(\d+)\s*", text)
+    if match is None:
+        return None
+    return int(match.group(1)), int(match.group(2))
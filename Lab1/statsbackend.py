@@ -0,0 +1,122 @@
+"""
+Backends for the mean, median and mode in stats.py.
+
+The NumPy backend converts and reduces whole arrays in C; the array
+backend needs only the standard library and is used when NumPy is not
+installed.  Both return plain Python numbers like the original
+list-based functions, including a list of modes (in first-seen order)
+when several numbers tie.  Integer input is kept as integers, so the
+median and mode of ints are ints, as before.  The median and mode are
+exact; the NumPy mean adds pairwise, so it can differ from sum() /
+len() in the last few bits (sum() itself adds with compensation on
+Python 3.12 and later).
+"""
+import os
+from array import array
+from collections import Counter
+
+from streamstats import StreamingStats
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class ArrayBackend:
+    """Standard-library backend over a compact array('d')."""
+
+    name = "array"
+
+    def parse(self, text):
+        return array('d', map(float, text.split()))
+
+    def as_array(self, numbers):
+        if isinstance(numbers, array):
+            return numbers
+        numbers = numbers if hasattr(numbers, "__len__") else list(numbers)
+        try:
+            return array('q', numbers)
+        except (TypeError, OverflowError):
+            return array('d', numbers)
+
+    def mean(self, values):
+        return sum(values) / len(values) if len(values) else 0
+
+    def median(self, values):
+        if values.typecode == 'q':
+            # StreamingStats buffers floats, which would turn ints into floats
+            ordered = sorted(values)
+            n = len(ordered)
+            if n == 0:
+                return 0
+            mid = n // 2
+            return (ordered[mid - 1] + ordered[mid]) / 2 if n % 2 == 0 else ordered[mid]
+        return StreamingStats(values).median()
+
+    def mode(self, values):
+        if values.typecode == 'q':
+            # Counted like the list version, so the modes stay ints
+            frequency = Counter(values)
+            if not frequency:
+                return None
+            max_freq = max(frequency.values())
+            modes = [number for number, freq in frequency.items() if freq == max_freq]
+            return modes[0] if len(modes) == 1 else modes
+        return StreamingStats(values).mode()
+
+
+class NumpyBackend:
+    """Vectorized backend over a float64 ndarray."""
+
+    name = "numpy"
+
+    def parse(self, text):
+        # Converting the split tokens in one call raises ValueError on a
+        # bad token, like float() does
+        return np.array(text.split(), dtype=np.float64)
+
+    def as_array(self, numbers):
+        if isinstance(numbers, np.ndarray):
+            return numbers
+        values = np.asarray(numbers)
+        # Ints that fit in int64 stay ints; anything else becomes float64
+        return values if values.dtype.kind in "iu" else values.astype(np.float64)
+
+    def mean(self, values):
+        if len(values) == 0:
+            return 0
+        # Pairwise summation: within a few ulps of sum(), not bit for bit
+        return float(values.sum(dtype=np.float64)) / len(values)
+
+    def median(self, values):
+        n = len(values)
+        if n == 0:
+            return 0
+        mid = n // 2
+        if n % 2 == 0:
+            low, high = np.partition(values, [mid - 1, mid])[mid - 1:mid + 1]
+            return (low.item() + high.item()) / 2
+        return np.partition(values, mid)[mid].item()
+
+    def mode(self, values):
+        if len(values) == 0:
+            return None
+        _, first_index, counts = np.unique(values, return_index=True, return_counts=True)
+        tied = np.sort(first_index[counts == counts.max()])
+        modes = [values[i].item() for i in tied]
+        return modes[0] if len(modes) == 1 else modes
+
+
+BACKENDS = {"array": ArrayBackend}
+if np is not None:
+    BACKENDS["numpy"] = NumpyBackend
+
+
+def get_backend(name=None):
+    """Returns the named backend, else the one chosen by the STATS_BACKEND
+    environment variable, else NumPy when it is installed."""
+    name = name or os.environ.get("STATS_BACKEND") or ("numpy" if np is not None else "array")
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown or unavailable stats backend: {name}")
+    return BACKENDS[name]()
@@ -0,0 +1,51 @@
+"""
+Times parsing, mean, median and mode for each available stats backend
+on 10**6 to 10**8 values.
+"""
+import random
+import sys
+import time
+
+from statsbackend import BACKENDS, get_backend
+
+# The pure-Python array backend takes minutes past this size
+ARRAY_BACKEND_LIMIT = 10 ** 7
+DEFAULT_SIZES = (10 ** 6, 10 ** 7, 10 ** 8)
+
+
+def make_text(n, seed=0):
+    rng = random.Random(seed)
+    # Quarter steps in a bounded range, so values repeat and the mode is meaningful
+    return " ".join(str(rng.randint(0, 100000) / 4) for _ in range(n))
+
+
+def time_call(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def run(n):
+    text = make_text(n)
+    print(f"n = {n:,}")
+    for name in BACKENDS:
+        if name == "array" and n > ARRAY_BACKEND_LIMIT:
+            print(f"  {name:6} skipped")
+            continue
+        backend = get_backend(name)
+        values, parse_time = time_call(backend.parse, text)
+        mean, mean_time = time_call(backend.mean, values)
+        median, median_time = time_call(backend.median, values)
+        _, mode_time = time_call(backend.mode, values)
+        print(f"  {name:6} parse {parse_time:7.2f}s  mean {mean_time:6.2f}s  "
+              f"median {median_time:6.2f}s  mode {mode_time:6.2f}s  (mean {mean:.4f}, median {median})")
+
+
+def main(sizes=DEFAULT_SIZES):
+    for n in sizes:
+        run(n)
+
+
+if __name__ == "__main__":
+    sizes = [int(float(arg)) for arg in sys.argv[1:]]
+    main(sizes or DEFAULT_SIZES)
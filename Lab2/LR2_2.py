@@ -1,15 +1,27 @@
+import re
+from lineindex import LineIndex, ResultPages, TokenIndex, parseRange
+
 def read_file(filename):
-    """Reads a file and returns its lines as a list."""
+    """Indexes a file and returns its lines as a list-like LineIndex,
+    which reads each line from disk only when it is shown."""
     try:
-        with open(filename, 'r') as f:
-            lines = f.readlines()
-        return lines
+        return LineIndex(filename)
     except FileNotFoundError:
         print("Error: File not found.")
         return []
 
+def show_page(lines, results):
+    """Prints the next page of search results."""
+    page = results.nextPage()
+    if not page:
+        print("No more matches." if results.shown else "No matches.")
+    for number in page:
+        print(f"Line {number}: {lines.lineAt(number)}")
+
 def navigate_lines(lines):
     """Allows user to navigate through the lines in the file."""
+    results = None
+    token_index = None
     while True:
         num_lines = len(lines)
         if num_lines == 0:
@@ -17,10 +29,43 @@ def navigate_lines(lines):
             break
 
         print(f"\nThe file has {num_lines} lines.")
-        choice = input(f"Enter a line number (1-{num_lines}, or 0 to quit): ")
+        print("Commands: a line number, a range (e.g. 100-200), /text, re:pattern, w:word, n (next matches)")
+        choice = input(f"Enter a line number (1-{num_lines}), a command, or 0 to quit: ").strip()
+
+        line_range = parseRange(choice)
+        if line_range:
+            for number, text in lines.lineRange(*line_range):
+                print(f"Line {number}: {text}")
+            continue
+        elif choice.startswith("/"):
+            results = ResultPages(lines.search(choice[1:]))
+            show_page(lines, results)
+            continue
+        elif choice.startswith("re:"):
+            try:
+                # search() compiles the pattern before returning
+                results = ResultPages(lines.search(choice[3:], regex=True))
+            except re.error as error:
+                print(f"Invalid regular expression: {error}")
+                continue
+            show_page(lines, results)
+            continue
+        elif choice.startswith("w:"):
+            if token_index is None:
+                print("Building the word index...")
+                token_index = TokenIndex(lines)
+            results = ResultPages(token_index.lookup(choice[2:].strip()))
+            show_page(lines, results)
+            continue
+        elif choice == "n":
+            if results is None:
+                print("Search for something first.")
+            else:
+                show_page(lines, results)
+            continue
 
         if not choice.isdigit():
-            print("Invalid input. Please enter a number.")
+            print("Invalid input. Please enter a number or a command.")
             continue
 
         choice = int(choice)
@@ -3,9 +3,22 @@ Program: generator.py
 Author: Ken
 Generates and displays sentences using a simple grammar
 and vocabulary.  Words are chosen at random.
+
+Run with arguments for bulk generation, e.g.
+    python generator_modified.py 5000000 -o corpus.txt --seed 42 --workers 4
+Add --grammar grammar.txt to generate from a weighted grammar file
+(see grammar.py) instead of the built-in grammar.  Bulk output
+depends only on the count and seed, not on the number of worker
+processes.
 """
 
+import argparse
 import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from grammar import loadGrammar
+
+BATCH_SIZE = 100000   # Sentences drawn, joined, and written at a time
 
 def getWords(filename):
     """Reads words from a file and returns them as a tuple."""
@@ -41,13 +54,88 @@ def prepositionalPhrase():
     """Builds and returns a prepositional phrase."""
     return random.choice(prepositions) + " " + nounPhrase()
 
+def sentenceBatch(count, rng = random):
+    """Builds `count` sentences at once and returns them as one string,
+    a sentence per line.  Each word slot is drawn with a single
+    choices() call and the sentences are assembled with joins."""
+    if count <= 0:
+        return ""
+    # Slots of: article noun verb article noun preposition article noun
+    slots = [articles, nouns, verbs, articles, nouns, prepositions, articles, nouns]
+    columns = [rng.choices(words, k=count) for words in slots]
+    return "\n".join(map(" ".join, zip(*columns))) + "\n"
+
+def _batchSeed(seed, index):
+    """Seed for batch `index`, so each batch can be built by any process."""
+    return None if seed is None else f"{seed}:{index}"
+
+def _batchCounts(number, batchSize):
+    return [min(batchSize, number - start) for start in range(0, number, batchSize)]
+
+_workerGrammar = None   # Compiled grammar of a worker process, set once by _initWorker
+
+def _initWorker(grammar):
+    global _workerGrammar
+    _workerGrammar = grammar
+
+def _buildBatch(count, seed, grammar = None):
+    """Builds one batch with its own generator, from the compiled
+    grammar if one is given."""
+    rng = random.Random(seed)
+    if grammar is not None:
+        return grammar.sentenceBatch(count, rng)
+    return sentenceBatch(count, rng)
+
+def _buildWorkerBatch(count, seed):
+    """Worker: builds one batch from the grammar the worker was started with."""
+    return _buildBatch(count, seed, _workerGrammar)
+
+def writeSentences(number, out, seed = None, workers = 1, batchSize = BATCH_SIZE,
+                   grammar = None):
+    """Writes `number` sentences to the text stream `out` a batch at a
+    time, from the compiled grammar if one is given.  With workers > 1
+    the batches are built in worker processes, each sent the grammar
+    once when it starts, and written in order."""
+    counts = _batchCounts(number, batchSize)
+    seeds = [_batchSeed(seed, index) for index in range(len(counts))]
+    if workers > 1 and len(counts) > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_initWorker,
+                                 initargs=(grammar,)) as pool:
+            for text in pool.map(_buildWorkerBatch, counts, seeds):
+                out.write(text)
+    else:
+        for count, batchSeed in zip(counts, seeds):
+            out.write(_buildBatch(count, batchSeed, grammar))
+
+def bulk(arguments):
+    """Generates sentences in bulk as described by the command line."""
+    parser = argparse.ArgumentParser(description="Generate random sentences in bulk.")
+    parser.add_argument("number", type=int, help="number of sentences")
+    parser.add_argument("-o", "--output", help="output file (default: standard output)")
+    parser.add_argument("--seed", type=int, help="seed for reproducible output")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes")
+    parser.add_argument("--grammar", help="weighted grammar file to generate from")
+    options = parser.parse_args(arguments)
+    # Loaded once, before any output, so grammar errors are reported first
+    grammar = loadGrammar(options.grammar) if options.grammar else None
+    if options.output:
+        with open(options.output, "w", buffering=1024 * 1024) as out:
+            writeSentences(options.number, out, options.seed, options.workers,
+                           grammar=grammar)
+    else:
+        writeSentences(options.number, sys.stdout, options.seed, options.workers,
+                       grammar=grammar)
+
 def main():
     """Allows the user to input the number of sentences
     to generate."""
     number = int(input("Enter the number of sentences: "))
-    for count in range(number):
-        print(sentence())
+    writeSentences(number, sys.stdout)
 
-# The entry point for program execution
+# The entry point for program execution.  The worker processes
+# re-import this module, so only run when it is the main program
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) > 1:
+        bulk(sys.argv[1:])
+    else:
+        main()
@@ -0,0 +1,343 @@
+"""
+File: grammar.py
+A weighted grammar engine for the sentence generator.  Production rules
+and weighted vocabularies are read from files and compiled into flat
+tables; every choice is then drawn with Walker's alias method in
+constant time, however many alternatives or words a symbol has.
+
+A grammar file holds one definition per line ('#' starts a comment):
+    Sentence -> NounPhrase VerbPhrase
+    VerbPhrase -> [3] Verb NounPhrase | Verb NounPhrase PrepositionalPhrase
+    Noun = nouns.txt
+A rule lists alternatives separated by '|', each optionally weighted
+with a leading [weight].  A vocabulary names a file, relative to the
+grammar file, holding one word per line optionally followed by a
+weight.  Names in a rule that are not defined are literal words.  The
+first symbol defined is the start symbol.
+
+Compiled grammars are cached beside the grammar file (fileName +
+".cache"), keyed by a hash of the grammar and vocabulary files.  The
+cache holds the tables as JSON, not a pickle, so a planted cache file
+can at worst be rejected, never run code.
+"""
+
+import hashlib
+import json
+import os
+import random
+from array import array
+
+CACHE_SUFFIX = ".cache"
+CACHE_MAGIC = "GRAMMAR2"
+MAX_TOKENS = 10000   # Longest sentence generated before the grammar is assumed to loop
+
+_loaded = {}   # Hash of the source files -> CompiledGrammar, per process
+
+
+def buildAlias(weights):
+    """Returns Walker alias tables (probabilities, aliases) for a list of
+    weights, built with Vose's method in linear time.  Choice i is drawn
+    by picking a column i uniformly and keeping it with probability
+    probabilities[i], else taking aliases[i]."""
+    count = len(weights)
+    total = float(sum(weights))
+    if count == 0 or total <= 0:
+        raise ValueError("weights must contain a positive value")
+    scaled = [weight * count / total for weight in weights]
+    probabilities = array('d', [1.0] * count)
+    aliases = array('I', range(count))
+    small = [i for i, value in enumerate(scaled) if value < 1.0]
+    large = [i for i, value in enumerate(scaled) if value >= 1.0]
+    while small and large:
+        less = small.pop()
+        more = large.pop()
+        probabilities[less] = scaled[less]
+        aliases[less] = more
+        scaled[more] -= 1.0 - scaled[less]
+        if scaled[more] < 1.0:
+            small.append(more)
+        else:
+            large.append(more)
+    # Whatever is left over is 1 up to rounding error
+    return probabilities, aliases
+
+
+class CompiledGrammar:
+    """A grammar flattened into arrays.  Symbol s owns the slots
+    starts[s] to starts[s] + counts[s] - 1 of the probability, alias
+    and target tables.  The target of a slot is an index into
+    `expansions` for a rule or into `words` for a vocabulary.  An
+    expansion is stored last item first, ready to push on a stack;
+    items >= 0 are symbols and items < 0 are the words ~item."""
+
+    def __init__(self, symbols, isRule, starts, counts, probabilities, aliases,
+                 targets, expansions, words):
+        self.symbols = symbols
+        self.isRule = isRule
+        self.starts = starts
+        self.counts = counts
+        self.probabilities = probabilities
+        self.aliases = aliases
+        self.targets = targets
+        self.expansions = expansions
+        self.words = words
+        self.symbolIds = {name: index for index, name in enumerate(symbols)}
+
+    def toJson(self):
+        """Returns the tables as a JSON-ready dictionary."""
+        return {"symbols": self.symbols, "isRule": list(self.isRule),
+                "starts": list(self.starts), "counts": list(self.counts),
+                "probabilities": list(self.probabilities), "aliases": list(self.aliases),
+                "targets": list(self.targets), "expansions": self.expansions, "words": self.words}
+
+    @classmethod
+    def fromJson(cls, tables):
+        """Returns the grammar in a dictionary made by toJson, raising
+        ValueError if the tables are inconsistent."""
+        try:
+            symbols = [str(name) for name in tables["symbols"]]
+            words = [str(word) for word in tables["words"]]
+            isRule = array('b', tables["isRule"])
+            starts = array('I', tables["starts"])
+            counts = array('I', tables["counts"])
+            probabilities = array('d', tables["probabilities"])
+            aliases = array('I', tables["aliases"])
+            targets = array('I', tables["targets"])
+            expansions = [tuple(int(item) for item in expansion) for expansion in tables["expansions"]]
+        except (KeyError, TypeError, OverflowError) as error:
+            raise ValueError("malformed grammar tables: %s" % error)
+        slots = len(targets)
+        if not (len(symbols) == len(isRule) == len(starts) == len(counts) > 0) or \
+           len(probabilities) != slots or len(aliases) != slots:
+            raise ValueError("grammar tables differ in length")
+        for symbol in range(len(symbols)):
+            start, count = starts[symbol], counts[symbol]
+            if count == 0 or start + count > slots:
+                raise ValueError("symbol %d has no valid slots" % symbol)
+            limit = len(expansions) if isRule[symbol] else len(words)
+            for slot in range(start, start + count):
+                if aliases[slot] >= count or targets[slot] >= limit:
+                    raise ValueError("slot %d is out of range" % slot)
+        for expansion in expansions:
+            for item in expansion:
+                if item >= len(symbols) or ~item >= len(words):
+                    raise ValueError("expansion item %d is out of range" % item)
+        return cls(symbols, isRule, starts, counts, probabilities, aliases,
+                   targets, expansions, words)
+
+    def choose(self, symbol, rng = random):
+        """Draws one alternative (or word) of a symbol id in O(1) and
+        returns its target index."""
+        column = rng.random() * self.counts[symbol]
+        slot = int(column)
+        start = self.starts[symbol]
+        if column - slot >= self.probabilities[start + slot]:
+            slot = self.aliases[start + slot]
+        return self.targets[start + slot]
+
+    def sentence(self, rng = random, start = None):
+        """Expands the start symbol (or `start`) into a sentence."""
+        return self._generate(1, rng, start)[0]
+
+    def sentenceBatch(self, count, rng = random, start = None):
+        """Returns `count` sentences as one string, a sentence per line."""
+        if count <= 0:
+            return ""
+        return "\n".join(self._generate(count, rng, start)) + "\n"
+
+    def _generate(self, count, rng, start):
+        # choose() inlined, with the tables bound to locals: this loop
+        # runs once per symbol of every sentence
+        draw = rng.random
+        counts, starts, probabilities, aliases, targets = (
+            self.counts, self.starts, self.probabilities, self.aliases, self.targets)
+        isRule, expansions, words = self.isRule, self.expansions, self.words
+        startId = self.symbolIds[start] if start else 0
+        sentences = []
+        for _ in range(count):
+            stack = [startId]
+            sentence = []
+            steps = 0
+            while stack:
+                item = stack.pop()
+                if item < 0:
+                    sentence.append(words[~item])
+                    continue
+                column = draw() * counts[item]
+                slot = int(column)
+                index = starts[item] + slot
+                if column - slot >= probabilities[index]:
+                    index = starts[item] + aliases[index]
+                if isRule[item]:
+                    stack.extend(expansions[targets[index]])
+                else:
+                    sentence.append(words[targets[index]])
+                steps += 1
+                if steps > MAX_TOKENS:
+                    raise ValueError("sentence exceeds %d symbols; the grammar may not terminate" % MAX_TOKENS)
+            sentences.append(" ".join(sentence))
+        return sentences
+
+
+def _parseGrammar(text):
+    """Returns the rules {name: [(weight, [names])]} and vocabularies
+    {name: fileName} of a grammar file, and the symbols in order."""
+    rules = {}
+    vocabularies = {}
+    order = []
+    for number, line in enumerate(text.splitlines(), 1):
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        if "->" in line:
+            name, body = (part.strip() for part in line.split("->", 1))
+            alternatives = []
+            for alternative in body.split("|"):
+                alternative = alternative.strip()
+                weight = 1.0
+                if alternative.startswith("["):
+                    weightText, _, alternative = alternative[1:].partition("]")
+                    weight = _parseWeight(weightText, number)
+                alternatives.append((weight, alternative.split()))
+            rules.setdefault(name, []).extend(alternatives)
+        elif "=" in line:
+            name, fileName = (part.strip() for part in line.split("=", 1))
+            vocabularies[name] = fileName
+        else:
+            raise ValueError("line %d: expected 'Symbol -> ...' or 'Symbol = file'" % number)
+        if not name or len(name.split()) != 1:
+            raise ValueError("line %d: invalid symbol name %r" % (number, name))
+        if name in rules and name in vocabularies:
+            raise ValueError("line %d: %s is both a rule and a vocabulary" % (number, name))
+        if name not in order:
+            order.append(name)
+    if not order:
+        raise ValueError("the grammar defines no symbols")
+    return rules, vocabularies, order
+
+
+def _parseWeight(text, number):
+    try:
+        weight = float(text)
+    except ValueError:
+        raise ValueError("line %d: invalid weight %r" % (number, text))
+    if weight < 0:
+        raise ValueError("line %d: negative weight" % number)
+    return weight
+
+
+def _readVocabulary(fileName):
+    """Returns the words and weights of a vocabulary file."""
+    words = []
+    weights = []
+    with open(fileName, "r", encoding = "utf-8") as f:
+        for number, line in enumerate(f, 1):
+            fields = line.split()
+            if not fields:
+                continue
+            if len(fields) > 2:
+                raise ValueError("%s line %d: expected a word and an optional weight" % (fileName, number))
+            words.append(fields[0])
+            weights.append(_parseWeight(fields[1], number) if len(fields) == 2 else 1.0)
+    return words, weights
+
+
+def compileGrammar(text, baseDir = "."):
+    """Compiles grammar source text into a CompiledGrammar; vocabulary
+    file names are relative to baseDir."""
+    rules, vocabularies, order = _parseGrammar(text)
+    symbolIds = {name: index for index, name in enumerate(order)}
+    wordIds = {}
+    words = []
+
+    def wordItem(word):
+        if word not in wordIds:
+            wordIds[word] = len(words)
+            words.append(word)
+        return wordIds[word]
+
+    isRule = array('b')
+    starts = array('I')
+    counts = array('I')
+    probabilities = array('d')
+    aliases = array('I')
+    targets = array('I')
+    expansions = []
+    for name in order:
+        if name in rules:
+            weights = [weight for weight, items in rules[name]]
+            slotTargets = []
+            for weight, items in rules[name]:
+                slotTargets.append(len(expansions))
+                expansions.append(tuple(symbolIds[item] if item in symbolIds else ~wordItem(item)
+                                        for item in reversed(items)))
+        else:
+            vocabulary, weights = _readVocabulary(os.path.join(baseDir, vocabularies[name]))
+            slotTargets = [wordItem(word) for word in vocabulary]
+        try:
+            symbolProbabilities, symbolAliases = buildAlias(weights)
+        except ValueError:
+            raise ValueError("%s has no alternatives with a positive weight" % name)
+        isRule.append(name in rules)
+        starts.append(len(targets))
+        counts.append(len(weights))
+        probabilities.extend(symbolProbabilities)
+        aliases.extend(symbolAliases)
+        targets.extend(slotTargets)
+    return CompiledGrammar(order, isRule, starts, counts, probabilities, aliases,
+                           targets, expansions, words)
+
+
+def sourceHash(fileName):
+    """Returns a SHA-256 digest of a grammar file and its vocabulary files."""
+    with open(fileName, "rb") as f:
+        source = f.read()
+    digest = hashlib.sha256(source)
+    baseDir = os.path.dirname(fileName)
+    rules, vocabularies, order = _parseGrammar(source.decode("utf-8"))
+    for name in order:
+        if name in vocabularies:
+            digest.update(b"\0" + name.encode("utf-8") + b"\0")
+            with open(os.path.join(baseDir, vocabularies[name]), "rb") as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(block)
+    return digest.hexdigest()
+
+
+def loadGrammar(fileName, useCache = True):
+    """Returns the compiled grammar of a file, from memory or the cache
+    file when the grammar and its vocabularies are unchanged, else by
+    compiling it (and refreshing the cache)."""
+    key = sourceHash(fileName)
+    if key in _loaded:
+        return _loaded[key]
+    cacheName = fileName + CACHE_SUFFIX
+    grammar = _loadCache(cacheName, key) if useCache else None
+    if grammar is None:
+        with open(fileName, "r", encoding = "utf-8") as f:
+            grammar = compileGrammar(f.read(), os.path.dirname(fileName))
+        if useCache:
+            _saveCache(cacheName, key, grammar)
+    _loaded[key] = grammar
+    return grammar
+
+
+def _loadCache(cacheName, key):
+    try:
+        with open(cacheName, "r", encoding = "utf-8") as f:
+            cache = json.load(f)
+        if cache["magic"] != CACHE_MAGIC or cache["key"] != key:
+            return None
+        return CompiledGrammar.fromJson(cache["tables"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _saveCache(cacheName, key, grammar):
+    try:
+        temporary = cacheName + ".tmp"
+        with open(temporary, "w", encoding = "utf-8") as f:
+            json.dump({"magic": CACHE_MAGIC, "key": key, "tables": grammar.toJson()}, f)
+        os.replace(temporary, cacheName)
+    except OSError:
+        pass   # A read-only directory just means no cache
@@ -0,0 +1,156 @@
+"""
+File: parallelparse.py
+Parses a large file of numbers in parallel.  The file is memory-mapped,
+split into byte ranges that start and end on whitespace, and each range
+is parsed in a worker process that returns mergeable partial statistics.
+"""
+
+import mmap
+import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from streamstats import MODE_LIMIT
+
+BLOCK_SIZE = 8 * 1024 * 1024   # Bytes a worker parses at a time
+WHITESPACE = re.compile(rb"\s")
+
+
+class PartialStats:
+    """Statistics of part of a file: count, sum, mean and sum of squared
+    deviations (merged with Chan's formula, which stays accurate where a
+    raw sum of squares would not), and a frequency table that gives the
+    exact median and mode.  As in StreamingStats, the table is dropped
+    once it holds more than modeLimit distinct numbers, so a worker never
+    builds or sends back an unbounded table; the median and mode are then
+    unknown (see exact) and must come from StreamingStats instead."""
+
+    def __init__(self, modeLimit = MODE_LIMIT):
+        self.count = 0
+        self.total = 0.0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self.frequency = Counter()
+        self.modeLimit = modeLimit
+
+    def addBlock(self, numbers):
+        """Adds a list of numbers."""
+        if not numbers:
+            return
+        count = len(numbers)
+        total = sum(numbers)
+        mean = total / count
+        m2 = sum((number - mean) ** 2 for number in numbers)
+        self._combine(count, total, mean, m2)
+        self._count(numbers)
+
+    def merge(self, other):
+        """Folds another partial result into this one."""
+        if other.count:
+            self._combine(other.count, other.total, other._mean, other._m2)
+            if other.frequency is None:
+                self.frequency = None
+            else:
+                self._count(other.frequency)
+        return self
+
+    @property
+    def exact(self):
+        """True while the frequency table, and so the median and mode, is kept."""
+        return self.frequency is not None
+
+    def _count(self, numbers):
+        if self.frequency is not None:
+            self.frequency.update(numbers)
+            if len(self.frequency) > self.modeLimit:
+                self.frequency = None
+
+    def _combine(self, count, total, mean, m2):
+        newCount = self.count + count
+        delta = mean - self._mean
+        self._m2 += m2 + delta * delta * self.count * count / newCount
+        self._mean += delta * count / newCount
+        self.count = newCount
+        self.total += total
+
+    def mean(self):
+        return self.total / self.count if self.count else 0
+
+    def variance(self):
+        return self._m2 / self.count if self.count else 0
+
+    def median(self):
+        """Returns the exact median, walking the distinct values in order."""
+        if not self.exact:
+            raise ValueError("too many distinct numbers to keep a frequency table")
+        if self.count == 0:
+            return 0
+        mid = self.count // 2
+        seen = 0
+        previous = None
+        for number in sorted(self.frequency):
+            if seen + self.frequency[number] > mid:
+                if self.count % 2 == 0 and seen == mid:
+                    return (previous + number) / 2
+                return number
+            seen += self.frequency[number]
+            previous = number
+
+    def modes(self):
+        """Returns the most frequent numbers."""
+        if not self.exact:
+            raise ValueError("too many distinct numbers to keep a frequency table")
+        if not self.frequency:
+            return []
+        maxFreq = max(self.frequency.values())
+        return [number for number, freq in self.frequency.items() if freq == maxFreq]
+
+
+def _alignForward(mm, position):
+    """Returns the first whitespace position at or after `position`."""
+    if position <= 0:
+        return 0
+    match = WHITESPACE.search(mm, position)
+    return match.start() if match else len(mm)
+
+
+def chunkRanges(mm, parts):
+    """Splits the mapped file into `parts` byte ranges cut at whitespace."""
+    size = len(mm)
+    bounds = sorted({_alignForward(mm, size * i // parts) for i in range(parts)} | {size})
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if start < end]
+
+
+def parseRange(fileName, start, end, modeLimit = MODE_LIMIT):
+    """Worker: parses the numbers in bytes [start, end) of the file."""
+    partial = PartialStats(modeLimit)
+    with open(fileName, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        position = start
+        while position < end:
+            blockEnd = min(end, _alignForward(mm, position + BLOCK_SIZE))
+            numbers = []
+            for word in mm[position:blockEnd].split():
+                try:
+                    numbers.append(float(word))
+                except ValueError:
+                    continue
+            partial.addBlock(numbers)
+            position = blockEnd
+    return partial
+
+
+def parseFile(fileName, workers = None, modeLimit = MODE_LIMIT):
+    """Parses the whole file using a pool of worker processes and
+    returns the merged PartialStats."""
+    workers = workers or os.cpu_count() or 1
+    result = PartialStats(modeLimit)
+    if os.path.getsize(fileName) == 0:
+        return result
+    with open(fileName, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        ranges = chunkRanges(mm, workers * 4)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for partial in pool.map(parseRange, [fileName] * len(ranges),
+                                [start for start, end in ranges], [end for start, end in ranges],
+                                [modeLimit] * len(ranges)):
+            result.merge(partial)
+    return result
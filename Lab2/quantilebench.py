@@ -0,0 +1,53 @@
+"""
+File: quantilebench.py
+Compares the KLL sketch's median with the exact streaming median
+for speed, memory, and rank error.
+"""
+
+import random
+import time
+from quantilesketch import KLLSketch
+from streamstats import StreamingStats
+
+
+def rankError(numbers, estimate):
+    """Returns how far, as a fraction of n, the estimate's rank is from the middle."""
+    below = sum(1 for number in numbers if number < estimate)
+    return abs(below / len(numbers) - 0.5)
+
+
+def benchmark(n, k):
+    rng = random.Random(n)
+    numbers = [rng.lognormvariate(0, 1) for _ in range(n)]
+
+    start = time.perf_counter()
+    with StreamingStats(numbers) as stats:
+        exact = stats.median()
+    exactTime = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sketch = KLLSketch(k, seed=1)
+    sketch.updateAll(numbers)
+    estimate = sketch.median()
+    sketchTime = time.perf_counter() - start
+
+    # Build the same sketch from four shards and merge them
+    shards = [KLLSketch(k, seed=i) for i in range(4)]
+    for i, shard in enumerate(shards):
+        shard.updateAll(numbers[i::4])
+    merged = shards[0]
+    for shard in shards[1:]:
+        merged.merge(KLLSketch.fromBytes(shard.toBytes()))
+
+    print(f"n={n:>9,}  exact {exact:.5f} in {exactTime:6.2f}s   "
+          f"sketch {estimate:.5f} in {sketchTime:6.2f}s ({sketch.size} items, rank error {rankError(numbers, estimate):.4f})   "
+          f"merged rank error {rankError(numbers, merged.median()):.4f}")
+
+
+def main(sizes = (10 ** 4, 10 ** 5, 10 ** 6), k = 200):
+    for n in sizes:
+        benchmark(n, k)
+
+
+if __name__ == "__main__":
+    main()
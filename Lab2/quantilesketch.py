@@ -0,0 +1,120 @@
+"""
+File: quantilesketch.py
+A KLL sketch for approximate quantiles of an unbounded stream of
+numbers in bounded memory.  Sketches built from separate files or
+processes can be merged, and are serialized as JSON.
+"""
+
+import bisect
+import json
+import math
+import random
+
+DEFAULT_K = 200     # Larger k means more memory and a smaller rank error (about 1.7 / k)
+DEFAULT_C = 2 / 3   # Capacity ratio between neighbouring levels
+
+
+class KLLSketch:
+    """Keeps a stack of compactors; an item at level h stands for
+    2 ** h numbers of the stream.  When the sketch is full, a level is
+    sorted and every other item is promoted to the next level, so the
+    sketch holds about k / (1 - c) items however many numbers are added."""
+
+    def __init__(self, k = DEFAULT_K, c = DEFAULT_C, seed = None):
+        self.k = k
+        self.c = c
+        self.count = 0
+        self.compactors = []
+        self.size = 0
+        self.maxSize = 0
+        self._random = random.Random(seed)
+        self._sorted = None
+        self._grow()
+
+    def update(self, number):
+        """Adds one number to the sketch."""
+        self.compactors[0].append(number)
+        self.count += 1
+        self.size += 1
+        self._sorted = None
+        if self.size >= self.maxSize:
+            self._compress()
+
+    def updateAll(self, numbers):
+        """Adds every number from an iterable."""
+        for number in numbers:
+            self.update(number)
+
+    def merge(self, other):
+        """Folds another sketch into this one."""
+        while len(self.compactors) < len(other.compactors):
+            self._grow()
+        for level, items in enumerate(other.compactors):
+            self.compactors[level].extend(items)
+        self.count += other.count
+        self.size = sum(len(items) for items in self.compactors)
+        self._sorted = None
+        while self.size >= self.maxSize:
+            self._compress()
+        return self
+
+    def quantile(self, q):
+        """Returns the approximate q-quantile (0 <= q <= 1), or None if empty."""
+        if self.count == 0:
+            return None
+        if self._sorted is None:
+            weighted = sorted((number, 2 ** level)
+                              for level, items in enumerate(self.compactors) for number in items)
+            cumulative = []
+            total = 0
+            for number, weight in weighted:
+                total += weight
+                cumulative.append(total)
+            self._sorted = (cumulative, [number for number, weight in weighted])
+        cumulative, numbers = self._sorted
+        index = bisect.bisect_left(cumulative, q * self.count)
+        return numbers[min(index, len(numbers) - 1)]
+
+    def median(self):
+        """Returns the approximate median."""
+        return self.quantile(0.5)
+
+    def toBytes(self):
+        """Returns the sketch serialized as UTF-8 JSON."""
+        return json.dumps({"k": self.k, "c": self.c, "count": self.count,
+                           "compactors": self.compactors}).encode("utf-8")
+
+    @classmethod
+    def fromBytes(cls, data, seed = None):
+        """Rebuilds a sketch from toBytes() output."""
+        state = json.loads(data.decode("utf-8"))
+        sketch = cls(state["k"], state["c"], seed)
+        while len(sketch.compactors) < len(state["compactors"]):
+            sketch._grow()
+        sketch.compactors = [list(items) for items in state["compactors"]]
+        sketch.count = state["count"]
+        sketch.size = sum(len(items) for items in sketch.compactors)
+        return sketch
+
+    def _capacity(self, level):
+        depth = len(self.compactors) - level - 1
+        return int(math.ceil(self.k * self.c ** depth)) + 1
+
+    def _grow(self):
+        self.compactors.append([])
+        self.maxSize = sum(self._capacity(level) for level in range(len(self.compactors)))
+
+    def _compress(self):
+        for level in range(len(self.compactors)):
+            if len(self.compactors[level]) >= self._capacity(level):
+                if level + 1 >= len(self.compactors):
+                    self._grow()
+                items = self.compactors[level]
+                items.sort()
+                # An odd item out stays at this level
+                keep = [items.pop()] if len(items) % 2 else []
+                self.compactors[level + 1].extend(items[self._random.randint(0, 1)::2])
+                self.compactors[level] = keep
+                self.size = sum(len(items) for items in self.compactors)
+                if self.size < self.maxSize:
+                    break
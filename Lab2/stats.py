@@ -3,68 +3,57 @@ File: stats.py
 Prints the mode, median, and mean of a set of numbers in a file.
 """
 
+import os
+from parallelparse import parseFile
+from streamstats import StreamingStats, readNumbers
 
-fileName = input("Enter the file name: ")
-f = open(fileName, 'r')
-
-
-# Input the text, convert it to numbers, and
-# add the numbers to a list
-numbers = []
-for line in f:
-   words = line.split()
-   for word in words:
-       try:
-           numbers.append(float(word))
-       except ValueError:
-           continue
+# Files at least this large are parsed by a pool of worker processes
+PARALLEL_THRESHOLD = 64 * 1024 * 1024
 
 
 # Define mean function
 def mean(numbers):
    if not numbers:
        return 0
-   return sum(numbers) / len(numbers)
-
+   return StreamingStats(numbers).mean()
 
-# If the list is empty, print 0 for all
-if not numbers:
-   print("The mean is 0")
-   print("The median is 0")
-   print("The mode is 0")
-else:
-   # Sort the list and print the number at its midpoint
-   numbers.sort()
-   print("The mean is", mean(numbers))
 
-
-   midpoint = len(numbers) // 2
-   print("The median is", end=" ")
-   if len(numbers) % 2 == 1:
-       print(numbers[midpoint])
+def report(stats):
+   # If there are no numbers, print 0 for all
+   if stats.count == 0:
+       print("The mean is 0")
+       print("The median is 0")
+       print("The mode is 0")
    else:
-       print((numbers[midpoint] + numbers[midpoint - 1]) / 2)
-
-
-   # Obtain the set of unique words and their
-   # frequencies, saving these associations in
-   # a dictionary
-   theDictionary = {}
-   for number in numbers:
-       count = theDictionary.get(number, None)
-       if count == None:
-           theDictionary[number] = 1
-       else:
-           theDictionary[number] = count + 1
-
-
-   # Find the mode by obtaining the maximum value
-   # in the dictionary and determining its key
-   theMaximum = max(theDictionary.values())
-   for key in theDictionary:
-       if theDictionary[key] == theMaximum:
-           print("The mode is", key)
-           break
-
-
-
+       print("The mean is", stats.mean())
+       print("The median is", stats.median())
+
+
+       # Among the numbers with the highest frequency,
+       # print the smallest one
+       print("The mode is", min(stats.modes()))
+
+
+def main():
+   fileName = input("Enter the file name: ")
+
+   # Big files are parsed in parallel; that gives the median and mode
+   # only while few numbers repeat, so otherwise (and for small files)
+   # the numbers are fed one at a time to the streaming engine
+   if os.path.getsize(fileName) >= PARALLEL_THRESHOLD:
+       stats = parseFile(fileName)
+       if stats.exact:
+           report(stats)
+           return
+   with open(fileName, 'r') as f:
+       stats = StreamingStats(readNumbers(f))
+   try:
+       report(stats)
+   finally:
+       stats.close()
+
+
+# The worker processes re-import this module, so only
+# prompt for input when it is run as a program
+if __name__ == "__main__":
+   main()
@@ -0,0 +1,174 @@
+"""
+File: streamstats.py
+Computes the mean, variance, median, and mode of a stream of numbers
+in a single pass, without keeping the whole stream in a list.
+"""
+
+import heapq
+import tempfile
+from itertools import groupby
+from operator import itemgetter
+from array import array
+from collections import Counter
+
+MEMORY_LIMIT = 1000000   # Numbers held in memory before a sorted run is spilled to disk
+READ_CHUNK = 65536       # Numbers read back at a time from each spilled run
+MODE_LIMIT = 100000      # Distinct numbers counted in memory before the mode is found by merging runs
+
+
+class StreamingStats:
+    """Consumes numbers one at a time.  The mean and variance are kept
+    with Welford's method, and the median exactly: numbers are buffered
+    in a compact array and, once the buffer reaches memoryLimit, sorted
+    and spilled to a temporary file.  The median then merges the sorted
+    runs up to the middle rank.  The mode comes from a frequency counter
+    while there are at most modeLimit distinct numbers; past that (as in
+    a file of measurements, where few numbers repeat) the counter is
+    dropped and the mode is found by counting runs of equal numbers in
+    the merged sorted runs.  Each spilled run also stores the stream
+    position of its numbers, so tied modes are still returned in the
+    order first seen."""
+
+    def __init__(self, numbers = (), memoryLimit = MEMORY_LIMIT, modeLimit = MODE_LIMIT):
+        self.count = 0
+        self.total = 0.0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self.frequency = Counter()
+        self.memoryLimit = memoryLimit
+        self.modeLimit = modeLimit
+        self._buffer = array('d')
+        self._runs = []
+        self.update(numbers)
+
+    def add(self, number):
+        """Adds one number to the statistics."""
+        self.count += 1
+        self.total += number
+        delta = number - self._mean
+        self._mean += delta / self.count
+        self._m2 += delta * (number - self._mean)
+        if self.frequency is not None:
+            self.frequency[number] += 1
+            if len(self.frequency) > self.modeLimit:
+                self.frequency = None
+        self._buffer.append(number)
+        if len(self._buffer) >= self.memoryLimit:
+            self._spill()
+
+    def update(self, numbers):
+        """Adds every number from an iterable."""
+        for number in numbers:
+            self.add(number)
+
+    def mean(self):
+        """Returns the mean, or 0 if no numbers were added."""
+        return self.total / self.count if self.count else 0
+
+    def variance(self):
+        """Returns the population variance, or 0 if no numbers were added."""
+        return self._m2 / self.count if self.count else 0
+
+    def median(self):
+        """Returns the exact median, or 0 if no numbers were added."""
+        if self.count == 0:
+            return 0
+        mid = self.count // 2
+        if not self._runs:
+            ordered = sorted(self._buffer)
+            if self.count % 2 == 0:
+                return (ordered[mid - 1] + ordered[mid]) / 2
+            return ordered[mid]
+        previous = None
+        for rank, number in enumerate(self._ordered()):
+            if rank == mid:
+                return (previous + number) / 2 if self.count % 2 == 0 else number
+            previous = number
+
+    def modes(self):
+        """Returns the most frequent numbers in the order first seen."""
+        if self.frequency is None:
+            # Equal numbers merge in stream order, so the first of
+            # each group holds the number's first position
+            modes = []
+            maxFreq = 0
+            for number, group in groupby(self._orderedWithPositions(), key = itemgetter(0)):
+                first = next(group)[1]
+                freq = 1 + sum(1 for _ in group)
+                if freq > maxFreq:
+                    modes = [(first, number)]
+                    maxFreq = freq
+                elif freq == maxFreq:
+                    modes.append((first, number))
+            modes.sort()
+            return [number for first, number in modes]
+        if not self.frequency:
+            return []
+        maxFreq = max(self.frequency.values())
+        return [number for number, freq in self.frequency.items() if freq == maxFreq]
+
+    def mode(self):
+        """Returns the mode, a list of modes if several numbers tie,
+        or None if no numbers were added."""
+        modes = self.modes()
+        if not modes:
+            return None
+        return modes[0] if len(modes) == 1 else modes
+
+    def close(self):
+        """Deletes the spilled runs."""
+        for run, count in self._runs:
+            run.close()
+        self._runs = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _spill(self):
+        """Writes the buffer to a run file sorted, as its numbers
+        followed by their positions in the stream."""
+        buffer = self._buffer
+        base = self.count - len(buffer)
+        order = sorted(range(len(buffer)), key = buffer.__getitem__)
+        run = tempfile.TemporaryFile()
+        array('d', [buffer[i] for i in order]).tofile(run)
+        array('Q', [base + i for i in order]).tofile(run)
+        self._runs.append((run, len(order)))
+        self._buffer = array('d')
+
+    def _ordered(self):
+        """Yields every number in increasing order."""
+        return heapq.merge(*[self._readRun(run, 0, count, 'd') for run, count in self._runs],
+                           sorted(self._buffer))
+
+    def _orderedWithPositions(self):
+        """Yields every (number, position) pair in increasing order."""
+        runs = [zip(self._readRun(run, 0, count, 'd'), self._readRun(run, 8 * count, count, 'Q'))
+                for run, count in self._runs]
+        base = self.count - len(self._buffer)
+        buffered = sorted(zip(self._buffer, range(base, self.count)))
+        return heapq.merge(*runs, buffered)
+
+    def _readRun(self, run, offset, count, typecode):
+        """Yields count items of the typecode stored in the run
+        from the byte offset."""
+        while count > 0:
+            chunk = array(typecode)
+            run.seek(offset)
+            chunk.fromfile(run, min(count, READ_CHUNK))
+            offset = run.tell()
+            count -= len(chunk)
+            yield from chunk
+
+
+def readNumbers(fileObj):
+    """Yields every token of a text file that parses as a number."""
+    for line in fileObj:
+        for word in line.split():
+            try:
+                yield float(word)
+            except ValueError:
+                continue
@@ -0,0 +1,86 @@
+import os
+import re
+import tempfile
+import unittest
+from lineindex import LineIndex, ResultPages, TokenIndex, parseRange
+
+LINES = [
+    "café au lait",
+    "page\x0cbreak and separator",
+    "naïve Ünïcode word\r",
+    "",
+    "cafe\x85next",
+    "last café",
+]
+
+
+class TestLineIndex(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.fileName = os.path.join(self.directory.name, "lines.txt")
+        with open(self.fileName, "w", encoding="utf-8", newline="") as f:
+            f.write("\n".join(LINES))
+        self.lines = LineIndex(self.fileName)
+
+    def tearDown(self):
+        self.lines.close()
+        self.directory.cleanup()
+
+    def test_lines_split_only_at_newlines(self):
+        self.assertEqual(len(self.lines), len(LINES))
+        for number, text in enumerate(LINES, 1):
+            self.assertEqual(self.lines.lineAt(number), text.rstrip("\r"))
+
+    def test_line_range_matches_line_numbers(self):
+        expected = [(number, text.rstrip("\r")) for number, text in enumerate(LINES, 1)]
+        self.assertEqual(self.lines.lineRange(1, 6), expected)
+        self.assertEqual(self.lines.lineRange(2, 3), expected[1:3])
+        self.assertEqual(self.lines.lineRange(0, 100), expected)
+        self.assertEqual(self.lines.lineRange(5, 4), [])
+
+    def test_parse_range(self):
+        self.assertEqual(parseRange("100-200"), (100, 200))
+        self.assertEqual(parseRange(" 3 - 7 "), (3, 7))
+        self.assertIsNone(parseRange("12"))
+        self.assertIsNone(parseRange("a-b"))
+
+    def test_substring_and_regex_search(self):
+        self.assertEqual(list(self.lines.search("café")), [1, 6])
+        self.assertEqual(list(self.lines.search("CAFÉ", ignoreCase=True)), [1, 6])
+        self.assertEqual(list(self.lines.search("caf.", regex=True)), [1, 5, 6])
+        self.assertEqual(list(self.lines.search(r"^\w+$", regex=True)), [])
+        self.assertEqual(list(self.lines.search(r"^$", regex=True)), [4])
+        self.assertEqual(list(self.lines.search("separator$", regex=True)), [2])
+
+    def test_invalid_regex_raises_before_iteration(self):
+        with self.assertRaises(re.error):
+            self.lines.search("\N{BULLET}[", regex=True)
+
+    def test_result_pages(self):
+        pages = ResultPages(self.lines.search("a"), pageSize=2)
+        self.assertEqual(pages.nextPage(), [1, 2])
+        self.assertEqual(pages.nextPage(), [3, 5])
+        self.assertEqual(pages.nextPage(), [6])
+        self.assertEqual(pages.nextPage(), [])
+        self.assertEqual(pages.shown, 5)
+
+    def test_token_index_lookup(self):
+        tokens = TokenIndex(self.lines)
+        self.assertEqual(list(tokens.lookup("café")), [1, 6])
+        self.assertEqual(list(tokens.lookup("Naïve")), [3])
+        self.assertEqual(list(tokens.lookup("ünïcode")), [3])
+        self.assertEqual(list(tokens.lookup("missing")), [])
+        reloaded = TokenIndex(self.lines)
+        self.assertEqual(reloaded.postings, tokens.postings)
+
+    def test_token_index_saves_long_tokens(self):
+        with open(self.fileName, "a", encoding="utf-8") as f:
+            f.write("\n" + "x" * 70000)
+        lines = LineIndex(self.fileName)
+        TokenIndex(lines)
+        self.assertEqual(list(TokenIndex(lines).lookup("x" * 70000)), [7])
+        lines.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import os
+import random
+import tempfile
+import unittest
+from parallelparse import PartialStats, parseFile
+from streamstats import StreamingStats
+
+class TestParallelParse(unittest.TestCase):
+    def writeNumbers(self, numbers):
+        f = tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False)
+        with f:
+            f.write(" ".join(str(number) for number in numbers))
+        self.addCleanup(os.remove, f.name)
+        return f.name
+
+    def test_matches_streaming_statistics(self):
+        numbers = [random.randint(0, 50) / 2 for _ in range(5001)]
+        fileName = self.writeNumbers(numbers)
+        stats = parseFile(fileName, workers = 2)
+        with StreamingStats(numbers) as expected:
+            self.assertTrue(stats.exact)
+            self.assertEqual(stats.count, expected.count)
+            self.assertAlmostEqual(stats.mean(), expected.mean())
+            self.assertAlmostEqual(stats.variance(), expected.variance())
+            self.assertEqual(stats.median(), expected.median())
+            self.assertEqual(stats.modes(), expected.modes())
+
+    def test_frequency_table_is_bounded(self):
+        numbers = list(range(100))
+        fileName = self.writeNumbers(numbers)
+        stats = parseFile(fileName, workers = 2, modeLimit = 10)
+        self.assertFalse(stats.exact)
+        self.assertEqual(stats.count, 100)
+        self.assertAlmostEqual(stats.mean(), 49.5)
+        self.assertRaises(ValueError, stats.median)
+        self.assertRaises(ValueError, stats.modes)
+
+    def test_merge_drops_table_past_limit(self):
+        first = PartialStats(modeLimit = 5)
+        first.addBlock([1, 2, 3])
+        second = PartialStats(modeLimit = 5)
+        second.addBlock([4, 5, 6])
+        self.assertTrue(second.exact)
+        first.merge(second)
+        self.assertFalse(first.exact)
+        self.assertEqual(first.count, 6)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import random
+import unittest
+from streamstats import StreamingStats
+
+def baselineMode(numbers):
+    """The original list-based mode() of stats.py."""
+    if not numbers:
+        return None
+    frequency = {}
+    for num in numbers:
+        frequency[num] = frequency.get(num, 0) + 1
+    max_freq = max(frequency.values())
+    modes = [num for num, freq in frequency.items() if freq == max_freq]
+    return modes[0] if len(modes) == 1 else modes
+
+class TestStreamingStats(unittest.TestCase):
+    def test_empty(self):
+        stats = StreamingStats()
+        self.assertEqual(stats.mean(), 0)
+        self.assertEqual(stats.median(), 0)
+        self.assertIsNone(stats.mode())
+
+    def test_matches_list_statistics(self):
+        numbers = [random.randint(0, 50) / 2 for _ in range(1001)]
+        stats = StreamingStats(numbers)
+        ordered = sorted(numbers)
+        self.assertAlmostEqual(stats.mean(), sum(numbers) / len(numbers))
+        self.assertEqual(stats.median(), ordered[len(ordered) // 2])
+        mean = sum(numbers) / len(numbers)
+        self.assertAlmostEqual(stats.variance(), sum((x - mean) ** 2 for x in numbers) / len(numbers))
+
+    def test_median_with_spilled_runs(self):
+        numbers = [random.random() for _ in range(1000)]
+        ordered = sorted(numbers)
+        with StreamingStats(numbers, memoryLimit=64) as stats:
+            self.assertEqual(stats.median(), (ordered[499] + ordered[500]) / 2)
+
+    def test_multiple_modes_in_first_seen_order(self):
+        self.assertEqual(StreamingStats([3, 1, 1, 3, 2]).mode(), [3, 1])
+        self.assertEqual(StreamingStats([3, 1, 1, 2]).mode(), 1)
+
+    def test_modes_from_runs_when_counter_is_dropped(self):
+        numbers = [random.randint(0, 300) / 4 for _ in range(2000)]
+        with StreamingStats(numbers, memoryLimit=64, modeLimit=16) as stats:
+            self.assertIsNone(stats.frequency)
+            self.assertEqual(stats.mode(), baselineMode(numbers))
+            self.assertEqual(stats.median(), StreamingStats(numbers).median())
+
+    def test_tied_modes_past_mode_limit_in_first_seen_order(self):
+        # Many distinct values, several tied for the top count, with
+        # later ties smaller than earlier ones
+        numbers = [random.random() for _ in range(3000)]
+        for value in (0.9, 0.5, 0.7, 0.1):
+            for _ in range(3):
+                numbers.insert(random.randrange(len(numbers) + 1), value)
+        for limit in (3000, 100, 17):
+            with StreamingStats(numbers, memoryLimit=limit, modeLimit=50) as stats:
+                self.assertEqual(stats.mode(), baselineMode(numbers))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,186 @@
+"""
+File: accountstore.py
+This module defines the AccountStore class, the permanent storage
+for a bank's accounts.
+"""
+import os
+import pickle
+import shutil
+import sqlite3
+import struct
+import zlib
+ 
+SQLITE_HEADER = b"SQLite format 3\x00"
+ 
+class CorruptAccountError(Exception):
+    """Raised when a stored account fails its checksum or a legacy
+    pickle file cannot be read completely."""
+ 
+def checksum(name, pin, balance):
+    """Returns the CRC-32 of an account record."""
+    record = name.encode("utf-8") + b"\x00" + pin.encode("utf-8") + b"\x00"
+    return zlib.crc32(record + struct.pack("<d", float(balance)))
+ 
+class AccountStore:
+    """This class keeps accounts in an SQLite file, one row per account,
+    indexed by (name, PIN).  Accounts are read and written one at a
+    time, so opening a store does not load it.  Every row carries a
+    checksum that is verified when the row is read.  Changes are held
+    in a transaction until commit() is called."""
+ 
+    def __init__(self, fileName):
+        """Opens the store in the file, creating it if needed."""
+        self.fileName = fileName
+        # Threads may share the store; TransactionEngine serializes its use
+        self.connection = sqlite3.connect(fileName, check_same_thread = False)
+        self.connection.create_function("account_checksum", 3, checksum, deterministic = True)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS accounts ("
+            "name TEXT NOT NULL, pin TEXT NOT NULL, balance REAL NOT NULL, "
+            "checksum INTEGER NOT NULL, PRIMARY KEY (name, pin))")
+        self.connection.commit()
+ 
+    def __len__(self):
+        """Returns the number of accounts."""
+        return self.connection.execute("SELECT COUNT(*) FROM accounts").fetchone()[0]
+ 
+    def get(self, name, pin):
+        """Returns the (name, pin, balance) record of the account,
+        or None if the account does not exist."""
+        row = self.connection.execute(
+            "SELECT name, pin, balance, checksum FROM accounts WHERE name = ? AND pin = ?",
+            (name, pin)).fetchone()
+        return None if row is None else self._verify(row)
+ 
+    def put(self, name, pin, balance):
+        """Adds the account, or replaces its balance if it exists."""
+        self.putMany([(name, pin, balance)])
+ 
+    def putMany(self, records):
+        """Adds or replaces many (name, pin, balance) records."""
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO accounts (name, pin, balance, checksum) VALUES (?, ?, ?, ?)",
+            ((name, pin, float(balance), checksum(name, pin, balance))
+             for name, pin, balance in records))
+ 
+    def delete(self, name, pin):
+        """Deletes the account and returns True, or returns False
+        if it does not exist."""
+        cursor = self.connection.execute(
+            "DELETE FROM accounts WHERE name = ? AND pin = ?", (name, pin))
+        return cursor.rowcount > 0
+ 
+    def records(self, after = None):
+        """Yields every (name, pin, balance) record in (name, pin)
+        order, or those after the (name, pin) key, read in order
+        from the primary key's index."""
+        if after is None:
+            cursor = self.connection.execute(
+                "SELECT name, pin, balance, checksum FROM accounts ORDER BY name, pin")
+        else:
+            cursor = self.connection.execute(
+                "SELECT name, pin, balance, checksum FROM accounts "
+                "WHERE (name, pin) > (?, ?) ORDER BY name, pin", tuple(after))
+        for row in cursor:
+            yield self._verify(row)
+ 
+    def recordsNamed(self, name):
+        """Yields the (name, pin, balance) records in the name,
+        in PIN order, found through the primary key."""
+        cursor = self.connection.execute(
+            "SELECT name, pin, balance, checksum FROM accounts WHERE name = ? ORDER BY pin", (name,))
+        for row in cursor:
+            yield self._verify(row)
+ 
+    def recordsWithBalance(self, low, high):
+        """Yields the (name, pin, balance) records with balances from
+        low up to but not including high, in order of balance."""
+        cursor = self.connection.execute(
+            "SELECT name, pin, balance, checksum FROM accounts "
+            "WHERE balance >= ? AND balance < ? ORDER BY balance", (low, high))
+        for row in cursor:
+            yield self._verify(row)
+ 
+    def applyInterest(self, rate):
+        """Adds interest at the rate to every balance in one UPDATE,
+        without reading the accounts into Python, and returns the
+        total interest.  A row that fails its checksum is left
+        failing it."""
+        total = self.connection.execute(
+            "SELECT TOTAL(balance * ?) FROM accounts", (rate,)).fetchone()[0]
+        self.connection.execute(
+            "UPDATE accounts SET balance = balance + balance * :rate, checksum = "
+            "CASE WHEN checksum = account_checksum(name, pin, balance) "
+            "THEN account_checksum(name, pin, balance + balance * :rate) ELSE -1 END",
+            {"rate": rate})
+        return total
+ 
+    def createBalanceIndex(self):
+        """Indexes the balances, for recordsWithBalance."""
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS accounts_balance ON accounts (balance)")
+ 
+    def commit(self):
+        """Makes the changes since the last commit permanent."""
+        self.connection.commit()
+ 
+    def rollback(self):
+        """Discards the changes since the last commit."""
+        self.connection.rollback()
+ 
+    def close(self):
+        """Closes the file, discarding uncommitted changes."""
+        self.connection.close()
+ 
+    def _verify(self, row):
+        name, pin, balance, storedChecksum = row
+        if checksum(name, pin, balance) != storedChecksum:
+            raise CorruptAccountError("Account " + name + "/" + pin + " in " +
+                                      self.fileName + " fails its checksum")
+        return name, pin, balance
+ 
+def isLegacyFile(fileName):
+    """Returns True if the file exists and is not an SQLite store,
+    that is, it holds pickled accounts."""
+    try:
+        with open(fileName, 'rb') as fileObj:
+            header = fileObj.read(len(SQLITE_HEADER))
+    except FileNotFoundError:
+        return False
+    return header != SQLITE_HEADER and header != b""
+ 
+def readLegacyFile(fileName):
+    """Returns the accounts in a file of pickled accounts.  Unlike the
+    old loader, which stopped quietly at the first bad record, this
+    raises CorruptAccountError unless every record can be read."""
+    accounts = []
+    with open(fileName, 'rb') as fileObj:
+        while fileObj.peek(1):
+            try:
+                account = pickle.load(fileObj)
+            except Exception as error:
+                raise CorruptAccountError("Record " + str(len(accounts) + 1) + " of " +
+                                          fileName + " cannot be read: " + str(error))
+            accounts.append(account)
+    return accounts
+ 
+def openStore(fileName):
+    """Returns the AccountStore in the file.  A file of pickled
+    accounts is converted to a store first, and the original is
+    kept as fileName + ".bak".  The store is built and committed
+    in a temporary file that then replaces the original, so a
+    failed conversion leaves the original file in place."""
+    if not isLegacyFile(fileName):
+        return AccountStore(fileName)
+    records = [(account.getName(), account.getPin(), account.getBalance())
+               for account in readLegacyFile(fileName)]
+    temporary = fileName + ".tmp"
+    if os.path.exists(temporary):
+        os.remove(temporary)
+    store = AccountStore(temporary)
+    store.putMany(records)
+    store.commit()
+    store.close()
+    shutil.copy2(fileName, fileName + ".bak")
+    os.replace(temporary, fileName)
+    return AccountStore(fileName)
@@ -0,0 +1,262 @@
+"""
+File: accounttable.py
+This module defines the AccountTable class, which holds a bank's
+accounts in columns so that every balance can be updated at once.
+"""
+import sys
+import weakref
+from array import array
+from savingsaccount import SavingsAccount
+ 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+ 
+INITIAL_CAPACITY = 1024
+ 
+class AccountTable:
+    """This class stores accounts by column: names, PINs, balances,
+    and the account class of each row.  A key maps to a row, and
+    the rows of removed accounts are reused.  The balances are a
+    NumPy array when NumPy is installed (else an array('d')), so
+    interest is applied to all of them in one operation.
+ 
+    The table is used like a dictionary of accounts keyed by
+    (name, PIN).  The accounts it returns are views: their balances
+    live in the table's row.  Views are held weakly and made again
+    when needed, and rows are found through a dictionary per name
+    keyed by the PIN strings already in the PIN column, so an
+    account costs no objects beyond its PIN string.
+ 
+    Secondary indexes (see secondaryindex.py) can listen to the
+    table; they are told of every account added or removed and
+    every balance changed."""
+ 
+    def __init__(self):
+        self.rows = {}        # name -> {pin -> row}
+        self.count = 0
+        self.names = []
+        self.pins = []
+        self.classes = [SavingsAccount]   # Account class of each kind code
+        self.views = weakref.WeakValueDictionary()   # row -> account bound to it
+        self.free = []        # Rows of removed accounts
+        self.size = 0         # Rows in use, including free ones
+        self.listeners = []   # Secondary indexes kept in sync with the table
+        if np is not None:
+            self.balances = np.zeros(INITIAL_CAPACITY)
+            self.kinds = np.zeros(INITIAL_CAPACITY, dtype=np.uint8)
+        else:
+            self.balances = array('d')
+            self.kinds = array('B')
+ 
+    def __len__(self):
+        return self.count
+ 
+    def __contains__(self, key):
+        return self._row(key) is not None
+ 
+    def __setitem__(self, key, account):
+        self.add(key, account)
+ 
+    def keys(self):
+        """Yields the keys of the accounts."""
+        for name, pins in self.rows.items():
+            for pin in pins:
+                yield (name, pin)
+ 
+    def values(self):
+        """Yields every account."""
+        for pins in self.rows.values():
+            for row in pins.values():
+                yield self.viewOf(row)
+ 
+    def get(self, key, default = None):
+        """Returns the account with the key, or default."""
+        row = self._row(key)
+        return default if row is None else self.viewOf(row)
+ 
+    def rowsInUse(self):
+        """Yields the rows that hold accounts."""
+        for pins in self.rows.values():
+            yield from pins.values()
+ 
+    def setBalance(self, row, balance):
+        """Changes the balance in a row, telling the listeners."""
+        if not self.listeners:
+            self.balances[row] = balance
+            return
+        oldBalance = float(self.balances[row])
+        self.balances[row] = balance
+        for listener in self.listeners:
+            listener.changed(self, row, oldBalance)
+ 
+    def addListener(self, listener):
+        """Builds the listener from the table's rows and keeps
+        it informed of changes from now on."""
+        listener.rebuild(self)
+        self.listeners.append(listener)
+ 
+    def removeListener(self, listener):
+        self.listeners.remove(listener)
+ 
+    def add(self, key, account):
+        """Adds the account under the key (replacing any account
+        there) and makes it a view onto its row."""
+        row = self._row(key)
+        if row is not None and self.views.get(row) is account:
+            return
+        if row is not None:
+            self._detach(row)
+        row = self.addRecord(key, account.getName(), account.getPin(),
+                             account.getBalance(), type(account))
+        account.bind(self, row)
+        self.views[row] = account
+ 
+    def addRecord(self, key, name, pin, balance, accountClass = SavingsAccount):
+        """Adds an account from its fields without making an
+        account object, and returns its row."""
+        name = sys.intern(name)
+        row = self._row(key)
+        if row is not None:
+            self.kinds[row] = self._kindOf(accountClass)
+            self.setBalance(row, balance)
+            return row
+        row = self.free.pop() if self.free else self._newRow()
+        self.rows.setdefault(name, {})[pin] = row
+        self.count += 1
+        self.names[row] = name
+        self.pins[row] = pin
+        self.balances[row] = balance
+        self.kinds[row] = self._kindOf(accountClass)
+        for listener in self.listeners:
+            listener.added(self, row)
+        return row
+ 
+    def addRecords(self, records, accountClass = SavingsAccount):
+        """Adds many (name, pin, balance) records keyed by
+        (name, pin), as addRecord does for each.  New accounts
+        are added at the end of the columns in one step."""
+        kind = self._kindOf(accountClass)
+        first = self.size
+        names = []
+        pins = []
+        balances = []
+        pending = {}   # Key -> index in the lists of a row added below
+        for name, pin, balance in records:
+            key = (name, pin)
+            index = pending.get(key)
+            if index is not None:   # Repeated in this batch
+                balances[index] = balance
+                continue
+            if self.free or self.listeners or self._row(key) is not None:
+                self.addRecord(key, name, pin, balance, accountClass)
+                continue
+            name = sys.intern(name)
+            pending[key] = len(names)
+            self.rows.setdefault(name, {})[pin] = first + len(names)
+            names.append(name)
+            pins.append(pin)
+            balances.append(balance)
+        if not names:
+            return
+        count = len(names)
+        self.names.extend(names)
+        self.pins.extend(pins)
+        self.size += count
+        self.count += count
+        if np is None:
+            self.balances.extend(balances)
+            self.kinds.extend([kind] * count)
+            return
+        if self.size > len(self.balances):
+            grow = max(self.size, len(self.balances))
+            self.balances = np.concatenate((self.balances, np.zeros(grow)))
+            self.kinds = np.concatenate((self.kinds, np.zeros(grow, dtype=np.uint8)))
+        self.balances[first:self.size] = balances
+        self.kinds[first:self.size] = kind
+ 
+    def pop(self, key, default = None):
+        """Removes the account with the key and returns it,
+        no longer a view, or returns default."""
+        row = self._row(key)
+        if row is None:
+            return default
+        name, pin = key
+        pins = self.rows[name]
+        del pins[pin]
+        if not pins:
+            del self.rows[name]
+        self.count -= 1
+        for listener in self.listeners:
+            listener.removed(self, row)
+        account = self.viewOf(row)
+        self._detach(row)
+        self.names[row] = None
+        self.pins[row] = None
+        self.balances[row] = 0.0    # A free row earns no interest
+        self.free.append(row)
+        return account
+ 
+    def records(self):
+        """Yields the (name, pin, balance) of every account."""
+        for pins in self.rows.values():
+            for row in pins.values():
+                yield self.names[row], self.pins[row], float(self.balances[row])
+ 
+    def applyInterest(self):
+        """Adds interest at each account class's RATE to every
+        balance and returns the total interest."""
+        rates = [accountClass.RATE for accountClass in self.classes]
+        if np is not None:
+            size = self.size
+            interest = self.balances[:size] * np.array(rates)[self.kinds[:size]]
+            self.balances[:size] += interest
+            total = float(interest.sum())
+        else:
+            total = 0.0
+            for row in range(self.size):
+                interest = self.balances[row] * rates[self.kinds[row]]
+                self.balances[row] += interest
+                total += interest
+        # Every balance moved, so rebuilding beats n separate updates
+        for listener in self.listeners:
+            listener.rebuild(self)
+        return total
+ 
+    def _row(self, key):
+        name, pin = key
+        pins = self.rows.get(name)
+        return None if pins is None else pins.get(pin)
+ 
+    def _kindOf(self, accountClass):
+        if accountClass not in self.classes:
+            self.classes.append(accountClass)
+        return self.classes.index(accountClass)
+ 
+    def _newRow(self):
+        row = self.size
+        self.size += 1
+        self.names.append(None)
+        self.pins.append(None)
+        if np is None:
+            self.balances.append(0.0)
+            self.kinds.append(0)
+        elif row == len(self.balances):
+            self.balances = np.concatenate((self.balances, np.zeros(row)))
+            self.kinds = np.concatenate((self.kinds, np.zeros(row, dtype=np.uint8)))
+        return row
+ 
+    def viewOf(self, row):
+        """Returns the account in a row, making a view if needed."""
+        account = self.views.get(row)
+        if account is None:
+            account = self.classes[self.kinds[row]](self.names[row], self.pins[row])
+            account.bind(self, row)
+            self.views[row] = account
+        return account
+ 
+    def _detach(self, row):
+        account = self.views.pop(row, None)
+        if account is not None:
+            account.unbind()
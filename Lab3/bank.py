@@ -2,83 +2,323 @@
 File: bank.py
 This module defines the Bank class.
 """
-import pickle
+import os
 import random
+from itertools import islice
+from accountstore import AccountStore, openStore
+from accounttable import AccountTable
+from journal import JOURNAL_SUFFIX, Journal
 from savingsaccount import SavingsAccount
+from sortedindex import SortedIndex
+ 
+CHECKPOINT_RECORDS = 10000    # Journal records that trigger a checkpoint
  
 class Bank:
     """This class represents a bank as a collection of savings accounts.
     An optional file name is also associated
     with the bank, to allow transfer of accounts to and
-    from permanent file storage."""
+    from permanent file storage.  Changes made through the
+    bank are written to a journal as they happen, and are
+    checkpointed into the file by save()."""
  
     def __init__(self, fileName = None):
-        """Creates a new dictionary to hold the accounts.
-        If a file name is provided, loads the accounts from
-        a file of pickled accounts."""
-        self.accounts = {}
+        """Creates a new table to hold the accounts.
+        If a file name is provided, opens the account store
+        in the file, and accounts are read from it only as
+        they are needed; the table then holds just the
+        accounts in use.  A file of pickled accounts is
+        converted to a store first.  Changes left in the
+        journal by a crash are recovered.  A bank without
+        a file keeps its keys in a sorted index, so its
+        accounts can be listed in order without sorting."""
+        self.accounts = AccountTable()
         self.fileName = fileName
+        self.store = None
+        self.journal = None
+        self.index = None
+        self.indexes = {}
         if fileName is not None:
-            fileObj = open(fileName, 'rb')
-            while True:
-                try:
-                    account = pickle.load(fileObj)
-                    self.add(account)
-                except Exception:
-                    fileObj.close()
-                    break
+            self.store = openStore(fileName)
+            self.journal = Journal(fileName + JOURNAL_SUFFIX)
+            self._recover()
+        else:
+            self.index = SortedIndex()
  
     def __str__(self):
         """Returns the string representation of the bank, sorted by name."""
-        sorted_accounts = sorted(self.accounts.values())
-        return "\n\n".join(str(account) for account in sorted_accounts)
+        return "\n\n".join(str(account) for account in self.orderedAccounts())
  
     def makeKey(self, name, pin):
-        """Returns a key for the account."""
-        return name + "/" + pin
+        """Returns a key for the account, a (name, PIN)
+        tuple, which is cheaper to build than a joined
+        string and shares the account's strings."""
+        return (name, pin)
  
     def add(self, account):
         """Adds the account to the bank."""
         key = self.makeKey(account.getName(), account.getPin())
         self.accounts[key] = account
+        if self.index is not None:
+            self.index.add(key)
+        if self.store is not None:
+            self.store.put(account.getName(), account.getPin(), account.getBalance())
+        self.logChange("add", account)
+ 
+    def addRecords(self, records):
+        """Adds many (name, pin, balance) records at once,
+        replacing any accounts with the same keys, without
+        making account objects.  A bank with a file writes
+        them straight to its store and commits them, so
+        they are neither journaled nor loaded into the
+        table; a bank without one adds them to the table
+        and its sorted index in one merge."""
+        table = self.accounts
+        if self.store is not None:
+            # Checkpoint first, or recovery would replay older
+            # journal records over the new balances
+            self.save()
+            records = list(records)
+            for name, pin, balance in records:
+                key = self.makeKey(name, pin)
+                if key in table:   # Keep an account in use current
+                    table.addRecord(key, name, pin, balance)
+            self.store.putMany(records)
+            self.store.commit()
+            return
+        records = list(records)
+        table.addRecords(records)
+        self.index.update(self.makeKey(name, pin) for name, pin, balance in records)
  
     def remove(self, name, pin):
         """Removes the account from the bank and
         and returns it, or None if the account does
         not exist."""
-        key = self.makeKey(name, pin)
-        return self.accounts.pop(key, None)
+        account = self.get(name, pin)
+        if account is not None:
+            account = self.accounts.pop(self.makeKey(name, pin))
+            if self.index is not None:
+                self.index.discard(self.makeKey(name, pin))
+            if self.store is not None:
+                self.store.delete(name, pin)
+            self.logChange("remove", account)
+        return account
  
     def get(self, name, pin):
         """Returns the account from the bank,
         or returns None if the account does
         not exist."""
         key = self.makeKey(name, pin)
-        return self.accounts.get(key, None)
+        account = self.accounts.get(key, None)
+        if account is None and self.store is not None:
+            record = self.store.get(name, pin)
+            if record is not None:
+                self.accounts.addRecord(key, *record)
+                account = self.accounts.get(key)
+        return account
+ 
+    def deposit(self, name, pin, amount):
+        """Deposits the amount in the account and returns
+        None, or returns an error message."""
+        account = self.get(name, pin)
+        if account is None:
+            return "Account not found"
+        message = account.deposit(amount)
+        if message is None:
+            self.logChange("deposit", account)
+        return message
+ 
+    def withdraw(self, name, pin, amount):
+        """Withdraws the amount from the account and returns
+        None, or returns an error message."""
+        account = self.get(name, pin)
+        if account is None:
+            return "Account not found"
+        message = account.withdraw(amount)
+        if message is None:
+            self.logChange("withdraw", account)
+        return message
+ 
+    def transfer(self, fromName, fromPin, toName, toPin, amount):
+        """Moves the amount between two accounts and returns
+        None, or returns an error message and moves nothing."""
+        source = self.get(fromName, fromPin)
+        target = self.get(toName, toPin)
+        if source is None or target is None:
+            return "Account not found"
+        if source is target:
+            return "Cannot transfer to the same account"
+        message = source.withdraw(amount)
+        if message is None:
+            target.deposit(amount)
+            self.logChange("transfer", source, target)
+        return message
  
     def computeInterest(self):
         """Computes and returns the interest on
-        all accounts."""
-        total = 0
-        for account in self.accounts.values():
-            total += account.computeInterest()
+        all accounts, at the RATE of each account's
+        class, in one pass over the balance column.
+        A bank with a file does not load its accounts:
+        after a checkpoint, the store adds interest at
+        the SavingsAccount RATE to every stored balance
+        in one UPDATE, the accounts in use get theirs in
+        the table and are written over their rows, and
+        the lot is committed as one transaction, so the
+        journal, which is empty, needs no record of it."""
+        if self.store is None:
+            return self.accounts.applyInterest()
+        self.save()
+        total = self.store.applyInterest(SavingsAccount.RATE)
+        # The store's interest on the accounts in use is replaced by the table's
+        total -= sum(balance for name, pin, balance in self.accounts.records()) * SavingsAccount.RATE
+        total += self.accounts.applyInterest()
+        self.save()
         return total
  
     def getKeys(self):
         """Returns a sorted list of keys."""
-        return sorted(self.accounts.keys())
+        if self.index is not None:
+            return list(self.index)
+        return [self.makeKey(name, pin) for name, pin, balance in self.store.records()]
+ 
+    def orderedAccounts(self, after = None):
+        """Yields the accounts in (name, PIN) order, starting
+        after the given key if there is one.  Accounts read
+        from the store that are not in use are not added
+        to the table."""
+        if self.index is not None:
+            for key in self.index.after(after):
+                yield self.accounts.get(key)
+            return
+        for name, pin, balance in self.store.records(after):
+            account = self.accounts.get(self.makeKey(name, pin), None)
+            if account is None:
+                account = SavingsAccount(name, pin, balance)
+            yield account
+ 
+    def addIndex(self, name, index):
+        """Installs a secondary index (see secondaryindex.py)
+        under the name; it is built now and kept in sync with
+        the accounts from then on.  accountsNamed uses an index
+        named "name" and accountsWithBalance one named
+        "balance"; without them they scan the accounts."""
+        self.indexes[name] = index
+        self.accounts.addListener(index)
+        if name == "balance" and self.store is not None:
+            self.store.createBalanceIndex()
+ 
+    def removeIndex(self, name):
+        """Uninstalls the secondary index with the name."""
+        self.accounts.removeListener(self.indexes.pop(name))
+ 
+    def accountsNamed(self, name):
+        """Returns a list of the accounts in the name,
+        in PIN order."""
+        table = self.accounts
+        index = self.indexes.get("name")
+        if index is not None:
+            rows = index.rows(name)
+        else:
+            rows = [row for row in table.rowsInUse() if table.names[row] == name]
+        found = {table.pins[row]: table.viewOf(row) for row in rows}
+        if self.store is not None:
+            for name, pin, balance in self.store.recordsNamed(name):
+                if pin not in found:
+                    found[pin] = SavingsAccount(name, pin, balance)
+        return [found[pin] for pin in sorted(found)]
+ 
+    def accountsWithBalance(self, low, high):
+        """Returns a list of the accounts with balances from
+        low up to but not including high, in order of balance
+        (then name and PIN)."""
+        table = self.accounts
+        index = self.indexes.get("balance")
+        if index is not None:
+            rows = index.rows(low, high)
+        else:
+            rows = [row for row in table.rowsInUse() if low <= table.balances[row] < high]
+        found = [table.viewOf(row) for row in rows]
+        if self.store is not None:
+            # The store's balances are stale for accounts in use
+            for name, pin, balance in self.store.recordsWithBalance(low, high):
+                if self.makeKey(name, pin) not in table:
+                    found.append(SavingsAccount(name, pin, balance))
+        found.sort(key = lambda account: (account.getBalance(), account.getName(), account.getPin()))
+        return found
+ 
+    def getPage(self, size, after = None):
+        """Returns a list of up to size accounts in (name, PIN)
+        order, following the key after.  Passing the key of the
+        last account returned gets the next page."""
+        return list(islice(self.orderedAccounts(after), size))
  
     def save(self, fileName = None):
-        """Saves pickled accounts to a file. The parameter
-        allows the user to change file names."""
-        if fileName is not None:
-            self.fileName = fileName
+        """Saves the accounts to a file. The parameter
+        allows the user to change file names.  Saving to
+        the bank's own file is a checkpoint: the accounts
+        in use are written to the store, which then holds
+        every change in the journal, and the journal is
+        emptied."""
+        if fileName is not None and fileName != self.fileName:
+            self._saveAs(fileName)
+            return
         elif self.fileName is None:
             return
-        fileObj = open(self.fileName, 'wb')
-        for account in self.accounts.values():
-            pickle.dump(account, fileObj)
-        fileObj.close()
+        self.store.putMany(self.accounts.records())
+        self.store.commit()
+        self.journal.clear()
+ 
+    def close(self):
+        """Closes the bank's file.  Changes made through the
+        bank are kept in the journal; changes made directly
+        to accounts since the last save are discarded."""
+        if self.store is not None:
+            self.journal.close()
+            self.store.close()
+            self.store = None
+            self.journal = None
+ 
+    def _saveAs(self, fileName):
+        """Writes every account to a new store in the file,
+        replacing the file, and switches the bank to it."""
+        temporary = fileName + ".tmp"
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        newStore = AccountStore(temporary)
+        newStore.putMany((account.getName(), account.getPin(), account.getBalance())
+                         for account in self.orderedAccounts())
+        newStore.commit()
+        newStore.close()
+        os.replace(temporary, fileName)
+        self.close()   # The old file keeps only its own journaled changes
+        self.fileName = fileName
+        self.index = None
+        self.store = AccountStore(fileName)
+        self.journal = Journal(fileName + JOURNAL_SUFFIX)
+        self.journal.clear()   # Left by an earlier bank in this file
+ 
+    def logChange(self, operation, *accounts):
+        """Journals a change made to the accounts,
+        checkpointing when the journal has grown long."""
+        if self.journal is None:
+            return
+        self.journal.append(operation, [(account.getName(), account.getPin(), account.getBalance())
+                                        for account in accounts])
+        if self.journal.count >= CHECKPOINT_RECORDS:
+            self.save()
+ 
+    def _recover(self):
+        """Applies the changes in the journal to the store
+        and checkpoints them."""
+        if self.journal.count == 0:
+            return
+        for operation, entries in self.journal.records():
+            for name, pin, balance in entries:
+                if operation == "remove":
+                    self.store.delete(name, pin)
+                else:
+                    self.store.put(name, pin, balance)
+        self.store.commit()
+        self.journal.clear()
  
 # Functions for testing
  
@@ -0,0 +1,114 @@
+"""
+File: bankbench.py
+Measures the memory and speed of building, looking up, and saving
+banks of 10**5 to 10**7 accounts, next to the original representation
+(accounts with a __dict__, keyed by joined "name/pin" strings).
+"""
+import os
+import pickle
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from bank import Bank
+from savingsaccount import SavingsAccount
+ 
+DEFAULT_SIZES = (10 ** 5, 10 ** 6)
+LOOKUPS = 100000
+NAMES = ("Brandon", "Molly", "Elena", "Mark", "Tricia", "Ken", "Jill", "Jack")
+ 
+class DictAccount:
+    """An account as originally stored: fields in a __dict__."""
+ 
+    def __init__(self, name, pin, balance):
+        self.name = name
+        self.pin = pin
+        self.balance = balance
+ 
+def fields(n, seed = 0):
+    """Yields n (name, pin, balance) triples like createBank's."""
+    rng = random.Random(seed)
+    for pinNumber in range(1000, 1000 + n):
+        # Names are built fresh, as if read from input, so interning matters
+        yield "".join(rng.choice(NAMES)), str(pinNumber), float(rng.randint(100, 1000))
+ 
+def buildBank(n):
+    bank = Bank()
+    for name, pin, balance in fields(n):
+        bank.add(SavingsAccount(name, pin, balance))
+    return bank
+ 
+def buildDict(n):
+    accounts = {}
+    for name, pin, balance in fields(n):
+        accounts[name + "/" + pin] = DictAccount(name, pin, balance)
+    return accounts
+ 
+def measure(build, n):
+    """Returns (result, seconds, bytes per account) for a build."""
+    start = time.perf_counter()
+    result = build(n)
+    seconds = time.perf_counter() - start
+    del result
+    tracemalloc.start()
+    result = build(n)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, current / n
+ 
+def timeLookups(get, probes):
+    """Returns lookups per second and how many were found."""
+    start = time.perf_counter()
+    found = sum(1 for name, pin in probes if get(name, pin) is not None)
+    return len(probes) / (time.perf_counter() - start), found
+ 
+def saveDict(accounts, fileName):
+    """Saves the accounts as the original Bank.save did."""
+    with open(fileName, 'wb') as fileObj:
+        for account in accounts.values():
+            pickle.dump(account, fileObj)
+ 
+def timeSave(save, n):
+    """Returns the seconds a save takes and the bytes per account
+    it writes."""
+    with tempfile.TemporaryDirectory() as directory:
+        fileName = os.path.join(directory, "bank.dat")
+        start = time.perf_counter()
+        save(fileName)
+        seconds = time.perf_counter() - start
+        return seconds, os.path.getsize(fileName) / n
+ 
+def run(n):
+    print("n = {:,}".format(n))
+    # Probe keys that exist, so every lookup finds its account
+    rng = random.Random(1)
+    keys = [(name, pin) for name, pin, balance in fields(n)]
+    probes = [rng.choice(keys) for _ in range(LOOKUPS)]
+    del keys
+ 
+    accounts, seconds, perAccount = measure(buildDict, n)
+    print("  original   build {:7.2f}s  {:6.1f} bytes/account".format(seconds, perAccount))
+    rate, found = timeLookups(lambda name, pin: accounts.get(name + "/" + pin), probes)
+    print("  original   lookups {:,.0f}/s  ({:,} of {:,} found)".format(rate, found, LOOKUPS))
+    seconds, perAccount = timeSave(lambda fileName: saveDict(accounts, fileName), n)
+    print("  original   save  {:7.2f}s  {:6.1f} bytes/account on disk".format(seconds, perAccount))
+    del accounts
+ 
+    bank, seconds, perAccount = measure(buildBank, n)
+    print("  compact    build {:7.2f}s  {:6.1f} bytes/account".format(seconds, perAccount))
+    rate, found = timeLookups(bank.get, probes)
+    print("  compact    lookups {:,.0f}/s  ({:,} of {:,} found)".format(rate, found, LOOKUPS))
+    def saveBank(fileName):
+        bank.save(fileName)
+        bank.close()   # Before the directory is removed
+    seconds, perAccount = timeSave(saveBank, n)
+    print("  compact    save  {:7.2f}s  {:6.1f} bytes/account on disk".format(seconds, perAccount))
+ 
+def main(sizes = DEFAULT_SIZES):
+    for n in sizes:
+        run(n)
+ 
+if __name__ == "__main__":
+    sizes = [int(float(arg)) for arg in sys.argv[1:]]
+    main(sizes or DEFAULT_SIZES)
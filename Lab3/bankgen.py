@@ -0,0 +1,151 @@
+"""
+File: bankgen.py
+Generates banks of synthetic accounts for load and persistence
+testing.  Accounts are drawn in batches from a seed, with configurable
+distributions of owners' names and balances, and each batch is written
+to the bank's table or store in bulk (see Bank.addRecords).  NumPy
+draws the batches when it is installed; without it the standard
+random module is used, which is slower and draws different accounts
+from the same seed.
+ 
+From the command line:
+    python bankgen.py 1e6 -o bank.dat --seed 1 --balances lognormal 6 1
+"""
+import argparse
+import random
+import sys
+import time
+from bank import Bank
+ 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+ 
+NAMES = ("Brandon", "Molly", "Elena", "Mark", "Tricia", "Ken", "Jill", "Jack")
+BATCH_SIZE = 100000
+FIRST_PIN = 1000
+ 
+# Balance distributions: name -> (parameters, defaults).  Balances
+# from uniform are whole amounts from low to high, as createBank's are;
+# the others are rounded to cents and never negative.
+DISTRIBUTIONS = {
+    "uniform": (("low", "high"), (100.0, 1000.0)),
+    "normal": (("mean", "deviation"), (550.0, 150.0)),
+    "lognormal": (("mu", "sigma"), (6.0, 1.0)),
+}
+ 
+def owners(count, prefix = "Owner"):
+    """Returns count distinct owners' names, for banks whose owners
+    hold only a few accounts each."""
+    return tuple(prefix + str(number) for number in range(count))
+ 
+def zipfWeights(count, exponent = 1.0):
+    """Returns weights under which the name at index i is drawn in
+    proportion to 1 / (i + 1) ** exponent, so a few owners hold
+    most of the accounts."""
+    return [1.0 / (rank ** exponent) for rank in range(1, count + 1)]
+ 
+def _balancesNumpy(rng, count, distribution, first, second):
+    if distribution == "uniform":
+        balances = rng.integers(int(first), int(second) + 1, count).astype(float)
+    elif distribution == "normal":
+        balances = rng.normal(first, second, count)
+    else:
+        balances = rng.lognormal(first, second, count)
+    return np.maximum(np.round(balances, 2), 0.0).tolist()
+ 
+def _balancesRandom(rng, count, distribution, first, second):
+    if distribution == "uniform":
+        low, high = int(first), int(second)
+        return [float(rng.randint(low, high)) for _ in range(count)]
+    if distribution == "normal":
+        draw = rng.gauss
+    else:
+        draw = rng.lognormvariate
+    return [max(round(draw(first, second), 2), 0.0) for _ in range(count)]
+ 
+def generateRecords(count, seed = None, names = NAMES, nameWeights = None,
+                    balances = "uniform", parameters = None,
+                    firstPin = FIRST_PIN, batchSize = BATCH_SIZE):
+    """Yields lists of up to batchSize (name, pin, balance) records,
+    count records in all.  PINs are consecutive from firstPin, so
+    every key is new.  Names are drawn from names, in proportion to
+    nameWeights if given, and balances from the named distribution
+    in DISTRIBUTIONS with its parameters.  Batch i is drawn from
+    (seed, i), so a seed and batch size always give the same
+    records."""
+    if balances not in DISTRIBUTIONS:
+        raise ValueError("unknown balance distribution: " + str(balances))
+    first, second = parameters or DISTRIBUTIONS[balances][1]
+    names = [sys.intern(name) for name in names]
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    if np is not None:
+        nameArray = np.array(names, dtype=object)
+        probabilities = None
+        if nameWeights is not None:
+            probabilities = np.asarray(nameWeights, dtype=float)
+            probabilities = probabilities / probabilities.sum()
+    for index, start in enumerate(range(0, count, batchSize)):
+        size = min(batchSize, count - start)
+        pins = map(str, range(firstPin + start, firstPin + start + size))
+        if np is not None:
+            rng = np.random.default_rng([seed, index])
+            batchNames = nameArray[rng.choice(len(names), size, p = probabilities)].tolist()
+            batchBalances = _balancesNumpy(rng, size, balances, first, second)
+        else:
+            rng = random.Random(str(seed) + ":" + str(index))
+            batchNames = rng.choices(names, nameWeights, k = size)
+            batchBalances = _balancesRandom(rng, size, balances, first, second)
+        yield list(zip(batchNames, pins, batchBalances))
+ 
+def populate(bank, count, **options):
+    """Adds count generated accounts to the bank, a batch at a time,
+    and returns the bank.  The options are those of
+    generateRecords."""
+    for records in generateRecords(count, **options):
+        bank.addRecords(records)
+    return bank
+ 
+def generateBank(count, fileName = None, **options):
+    """Returns a new bank of count generated accounts, kept in the
+    file if one is given (replacing any accounts with the same
+    keys already there)."""
+    return populate(Bank(fileName), count, **options)
+ 
+def main(arguments = None):
+    parser = argparse.ArgumentParser(description = "Generate a bank of synthetic accounts.")
+    parser.add_argument("number", type = lambda text: int(float(text)),
+                        help = "number of accounts, e.g. 1e6")
+    parser.add_argument("-o", "--output", help = "bank file to write (default: a bank in memory)")
+    parser.add_argument("--seed", type = int, help = "seed, for a repeatable bank")
+    parser.add_argument("--owners", type = int,
+                        help = "draw from this many owners' names instead of the usual eight")
+    parser.add_argument("--zipf", type = float, metavar = "EXPONENT",
+                        help = "skew the names drawn with Zipf weights")
+    parser.add_argument("--balances", nargs = "+", default = ["uniform"],
+                        metavar = ("DISTRIBUTION", "PARAMETER"),
+                        help = "one of " + ", ".join(DISTRIBUTIONS) + ", optionally with its two parameters")
+    parser.add_argument("--batch", type = int, default = BATCH_SIZE, help = "records per batch")
+    arguments = parser.parse_args(arguments)
+ 
+    distribution = arguments.balances[0]
+    if distribution not in DISTRIBUTIONS or len(arguments.balances) not in (1, 3):
+        parser.error("--balances takes one of " + ", ".join(DISTRIBUTIONS) +
+                     " and optionally two parameters")
+    parameters = [float(value) for value in arguments.balances[1:]] or None
+    names = owners(arguments.owners) if arguments.owners else NAMES
+    weights = zipfWeights(len(names), arguments.zipf) if arguments.zipf else None
+ 
+    start = time.perf_counter()
+    bank = generateBank(arguments.number, arguments.output, seed = arguments.seed,
+                        names = names, nameWeights = weights, balances = distribution,
+                        parameters = parameters, batchSize = arguments.batch)
+    seconds = time.perf_counter() - start
+    print("{:,} accounts in {:.2f}s ({:,.0f} accounts/s)".format(
+        arguments.number, seconds, arguments.number / seconds))
+    bank.close()
+ 
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+File: bankstress.py
+Runs random transfers and batches of transactions on one bank from
+several threads through a TransactionEngine, reports transactions per
+second, and checks that the total balance is unchanged.
+"""
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from bank import Bank
+from savingsaccount import SavingsAccount
+from transactions import TransactionEngine
+ 
+DEFAULT_THREADS = (1, 2, 4, 8)
+ACCOUNTS = 10000
+TRANSACTIONS = 200000   # Split between the threads
+BATCH_SIZE = 8
+ 
+def makeBank(fileName = None):
+    """Returns a bank of ACCOUNTS accounts with whole-number balances,
+    so the total can be compared exactly."""
+    bank = Bank(fileName)
+    rng = random.Random(0)
+    for pinNumber in range(ACCOUNTS):
+        bank.add(SavingsAccount("Owner" + str(pinNumber % 97), str(pinNumber),
+                                float(rng.randint(100, 1000))))
+    bank.save()
+    return bank
+ 
+def totalBalance(bank):
+    return sum(account.getBalance() for account in bank.orderedAccounts())
+ 
+def randomTransaction(rng, keys):
+    (fromName, fromPin), (toName, toPin) = rng.sample(keys, 2)
+    amount = rng.randint(1, 200)
+    if rng.random() < 0.8:
+        return [("transfer", fromName, fromPin, toName, toPin, amount)]
+    # A deposit and a withdrawal that cancel out, as one batch
+    return [("deposit", fromName, fromPin, amount), ("withdraw", fromName, fromPin, amount)]
+ 
+def worker(engine, keys, count, seed, results):
+    rng = random.Random(seed)
+    done = failed = 0
+    while done < count:
+        batch = []
+        while len(batch) < BATCH_SIZE and done + len(batch) < count:
+            batch.extend(randomTransaction(rng, keys))
+        if len(batch) == 1:
+            transaction = batch[0]
+            outcomes = [engine.transfer(*transaction[1:])]
+        else:
+            outcomes = engine.submit(batch)
+        done += len(batch)
+        failed += sum(1 for outcome in outcomes if outcome is not None)
+    results.append(failed)
+ 
+def run(bank, threads):
+    engine = TransactionEngine(bank)
+    keys = bank.getKeys()
+    before = totalBalance(bank)
+    results = []
+    workers = [threading.Thread(target=worker,
+                                args=(engine, keys, TRANSACTIONS // threads, seed, results))
+               for seed in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    seconds = time.perf_counter() - start
+    after = totalBalance(bank)
+    print("  {:2} threads  {:9,.0f} transactions/s  {:6,} refused  total {} ({})".format(
+        threads, TRANSACTIONS / seconds, sum(results), after,
+        "conserved" if after == before else "CHANGED from " + str(before)))
+    return after == before
+ 
+def main(threadCounts = DEFAULT_THREADS):
+    conserved = True
+    print("In memory:")
+    bank = makeBank()
+    for threads in threadCounts:
+        conserved = run(bank, threads) and conserved
+    with tempfile.TemporaryDirectory() as directory:
+        print("With a file and journal:")
+        bank = makeBank(os.path.join(directory, "bank.dat"))
+        for threads in threadCounts:
+            conserved = run(bank, threads) and conserved
+        bank.close()
+    return conserved
+ 
+if __name__ == "__main__":
+    threadCounts = [int(arg) for arg in sys.argv[1:]]
+    if not main(threadCounts or DEFAULT_THREADS):
+        sys.exit(1)
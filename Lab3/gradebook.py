@@ -0,0 +1,328 @@
+"""
+File: gradebook.py
+This module defines the Gradebook class, which holds the test scores
+of a class of students in one matrix so that class statistics are
+computed for every student or test at once.
+"""
+import weakref
+from array import array
+from collections.abc import Sequence
+from student import Student
+ 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+ 
+INITIAL_CAPACITY = 1024
+ 
+def _number(score):
+    """Returns a whole score as an int, as it was set."""
+    return int(score) if score.is_integer() else score
+ 
+def _percentile(values, q):
+    """Returns the qth percentile of a list of numbers, interpolating
+    between the closest ranks as numpy.percentile does."""
+    values = sorted(values)
+    position = (len(values) - 1) * q / 100.0
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+ 
+class ScoreRow(Sequence):
+    """The scores of a student who is a view: a list-like window
+    onto the student's row.  Setting an item sets the score in the
+    gradebook (telling its listeners), so code that assigns to
+    student.scores[i] keeps working.  The row's length is the
+    number of tests, so anything that would change it raises
+    TypeError."""
+ 
+    def __init__(self, gradebook, row):
+        self.gradebook = gradebook
+        self.row = row
+ 
+    def __len__(self):
+        return self.gradebook.tests
+ 
+    def __iter__(self):
+        return iter(self.gradebook.rowScores(self.row))
+ 
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return self.gradebook.getScore(self.row, self._position(index))
+ 
+    def __setitem__(self, index, score):
+        if isinstance(index, slice):
+            positions = range(*index.indices(len(self)))
+            scores = list(score)
+            if len(scores) != len(positions):
+                raise TypeError("A student's scores cannot change in number")
+            for i, value in zip(positions, scores):
+                self.gradebook.setScore(self.row, i + 1, value)
+            return
+        self.gradebook.setScore(self.row, self._position(index), score)
+ 
+    def __delitem__(self, index):
+        raise TypeError("A student's scores cannot change in number")
+ 
+    def __eq__(self, other):
+        if isinstance(other, (ScoreRow, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+ 
+    def __repr__(self):
+        return repr(list(self))
+ 
+    def _position(self, index):
+        """Returns the test number (from 1) of a list index."""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("score index out of range")
+        return index + 1
+ 
+class Gradebook:
+    """This class stores a matrix of scores, one row per student and
+    one column per test.  The matrix is a NumPy array when NumPy is
+    installed (else a list of array('d') rows), and the statistics
+    are computed over all of it in vectorized form.
+ 
+    The students it returns are views: their scores live in the
+    gradebook's row, so Student's methods keep working and see the
+    same scores as the statistics.  Views are held weakly and made
+    again when needed, as AccountTable does for accounts.
+ 
+    Listeners, such as a Roster, are told of every student added
+    (added(gradebook, row)) and every score set (changed(gradebook,
+    row)), and rebuild(gradebook) builds them from scratch.
+ 
+    Statistics are per student (one value per row) unless perTest
+    is True (one value per test).  A key names a per-student
+    measure: "average", "high", or a test number counting from 1."""
+ 
+    def __init__(self, tests, studentClass = Student):
+        """Creates an empty gradebook of the given number of tests."""
+        if tests < 1:
+            raise ValueError("A gradebook needs at least one test")
+        self.tests = tests
+        self.studentClass = studentClass
+        self.names = []
+        self.views = weakref.WeakValueDictionary()   # row -> student bound to it
+        self.size = 0
+        self.listeners = []   # Kept in sync with the scores, e.g. a Roster
+        if np is not None:
+            self.matrix = np.zeros((INITIAL_CAPACITY, tests))
+        else:
+            self.matrix = []
+ 
+    def __len__(self):
+        return self.size
+ 
+    def __iter__(self):
+        """Yields the students in the order they were added."""
+        for row in range(self.size):
+            yield self.viewOf(row)
+ 
+    def add(self, student):
+        """Adds the student, copying in the student's scores, makes
+        it a view onto its row, and returns the row."""
+        if len(student.scores) != self.tests:
+            raise ValueError("Expected " + str(self.tests) + " scores for " +
+                             student.getName() + ", not " + str(len(student.scores)))
+        row = self._newRow(student.getName())
+        self.matrix[row][:] = array('d', student.scores)
+        student.bind(self, row)
+        self.views[row] = student
+        self._added(row)
+        return row
+ 
+    def addStudent(self, name):
+        """Adds a student with scores of 0 and returns it."""
+        row = self._newRow(name)
+        self._added(row)
+        return self.viewOf(row)
+ 
+    def addScores(self, names, scores):
+        """Adds many students at once: a list of names and a matching
+        sequence of score rows (a list of lists or a 2-D array)."""
+        names = list(names)
+        if np is None:
+            for name, values in zip(names, scores):
+                if len(values) != self.tests:
+                    raise ValueError("Expected " + str(self.tests) + " scores for " +
+                                     name + ", not " + str(len(values)))
+                row = self._newRow(name)
+                self.matrix[row][:] = array('d', values)
+                self._added(row)
+            return
+        scores = np.asarray(scores, dtype = float)
+        if scores.shape != (len(names), self.tests):
+            raise ValueError("Expected " + str(len(names)) + " rows of " + str(self.tests) +
+                             " scores, not an array of shape " + str(scores.shape))
+        first = self.size
+        self._reserve(first + len(names))
+        self.matrix[first:self.size] = scores
+        self.names.extend(names)
+        for row in range(first, self.size):
+            self._added(row)
+ 
+    def viewOf(self, row):
+        """Returns the student in a row, making a view if needed."""
+        student = self.views.get(row)
+        if student is None:
+            student = self.studentClass(self.names[row], 0)
+            student.bind(self, row)
+            self.views[row] = student
+        return student
+ 
+    def getScore(self, row, i):
+        """Returns the ith score of a row, counting from 1."""
+        self._checkTest(i)
+        return _number(float(self.matrix[row][i - 1]))
+ 
+    def setScore(self, row, i, score):
+        """Resets the ith score of a row, counting from 1."""
+        self._checkTest(i)
+        self.matrix[row][i - 1] = score
+        for listener in self.listeners:
+            listener.changed(self, row)
+ 
+    def addListener(self, listener):
+        """Builds the listener from the scores and keeps it
+        informed of changes from now on."""
+        listener.rebuild(self)
+        self.listeners.append(listener)
+ 
+    def removeListener(self, listener):
+        self.listeners.remove(listener)
+ 
+    def rowScores(self, row):
+        """Returns a list of the scores in a row."""
+        return [_number(float(score)) for score in self.matrix[row]]
+ 
+    def scoreRow(self, row):
+        """Returns a ScoreRow, a writable view of the scores in a row."""
+        return ScoreRow(self, row)
+ 
+    def scores(self):
+        """Returns the matrix of scores in use: a 2-D array, or
+        a list of rows without NumPy."""
+        if np is not None:
+            return self.matrix[:self.size]
+        return self.matrix
+ 
+    def averages(self, perTest = False):
+        """Returns the average score of each student, or of each test."""
+        if np is not None:
+            return self.scores().mean(axis = 0 if perTest else 1)
+        return [sum(values) / len(values) for values in self._lines(perTest)]
+ 
+    def highs(self, perTest = False):
+        """Returns the highest score of each student, or of each test."""
+        if np is not None:
+            return self.scores().max(axis = 0 if perTest else 1)
+        return [max(values) for values in self._lines(perTest)]
+ 
+    def percentiles(self, q, perTest = False):
+        """Returns the qth percentile (0 to 100) of each student's
+        scores, or of each test's."""
+        if np is not None:
+            return np.percentile(self.scores(), q, axis = 0 if perTest else 1)
+        return [_percentile(values, q) for values in self._lines(perTest)]
+ 
+    def zScores(self):
+        """Returns a matrix of each score's distance from its test's
+        average, in standard deviations (0 where every score on a
+        test is the same)."""
+        if np is not None:
+            scores = self.scores()
+            deviations = scores.std(axis = 0)
+            deviations[deviations == 0] = 1.0
+            return (scores - scores.mean(axis = 0)) / deviations
+        result = [array('d', values) for values in self.matrix]
+        for test, values in enumerate(self._lines(True)):
+            mean = sum(values) / len(values)
+            deviation = (sum((value - mean) ** 2 for value in values) / len(values)) ** 0.5 or 1.0
+            for row in result:
+                row[test] = (row[test] - mean) / deviation
+        return result
+ 
+    def keyValues(self, key):
+        """Returns each student's value of a key ("average", "high",
+        or a test number)."""
+        if key == "average":
+            return self.averages()
+        if key == "high":
+            return self.highs()
+        self._checkTest(key)
+        if np is not None:
+            return self.scores()[:, key - 1]
+        return [values[key - 1] for values in self.matrix]
+ 
+    def rowValue(self, row, key):
+        """Returns one student's value of a key, computed as
+        keyValues computes it for every student."""
+        values = self.matrix[row]
+        if key == "average":
+            return float(values.mean()) if np is not None else sum(values) / len(values)
+        if key == "high":
+            return float(max(values))
+        self._checkTest(key)
+        return float(values[key - 1])
+ 
+    def ranks(self, key = "average"):
+        """Returns each student's rank by a key, 1 for the best;
+        students with equal values share the best rank among them."""
+        values = self.keyValues(key)
+        if np is not None:
+            ordered = np.sort(values)
+            return len(values) - np.searchsorted(ordered, values, side = "right") + 1
+        ordered = sorted(values, reverse = True)
+        first = {}
+        for position, value in enumerate(ordered, 1):
+            first.setdefault(value, position)
+        return [first[value] for value in values]
+ 
+    def rankOrder(self, key = "average"):
+        """Returns a list of the students from best to worst by a key,
+        students with equal values in the order they were added."""
+        values = self.keyValues(key)
+        if np is not None:
+            rows = np.argsort(-values, kind = "stable").tolist()
+        else:
+            rows = sorted(range(self.size), key = lambda row: -values[row])
+        return [self.viewOf(row) for row in rows]
+ 
+    def _lines(self, perTest):
+        """Yields the scores of each student, or of each test."""
+        if perTest:
+            for test in range(self.tests):
+                yield [values[test] for values in self.matrix]
+        else:
+            yield from self.matrix
+ 
+    def _added(self, row):
+        for listener in self.listeners:
+            listener.added(self, row)
+ 
+    def _checkTest(self, i):
+        if not 1 <= i <= self.tests:
+            raise IndexError("Test " + str(i) + " is not between 1 and " + str(self.tests))
+ 
+    def _newRow(self, name):
+        row = self.size
+        self.names.append(name)
+        self._reserve(row + 1)
+        return row
+ 
+    def _reserve(self, size):
+        """Makes rows up to size available, growing the matrix
+        by at least doubling."""
+        if np is None:
+            while len(self.matrix) < size:
+                self.matrix.append(array('d', bytes(8 * self.tests)))
+        elif size > len(self.matrix):
+            grow = max(size - len(self.matrix), len(self.matrix))
+            self.matrix = np.concatenate((self.matrix, np.zeros((grow, self.tests))))
+        self.size = size
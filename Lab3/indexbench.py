@@ -0,0 +1,79 @@
+"""
+File: indexbench.py
+Measures queries by owner's name and by balance range on banks of
+10**5 to 10**6 accounts, with and without secondary indexes, and
+what keeping the indexes up to date costs each deposit.  Owners
+hold about ten accounts each.
+"""
+import random
+import sys
+import time
+from bank import Bank
+from bankbench import NAMES
+from savingsaccount import SavingsAccount
+from secondaryindex import NameIndex, BalanceIndex
+ 
+DEFAULT_SIZES = (10 ** 5, 10 ** 6)
+QUERIES = 20
+DEPOSITS = 100000
+ 
+def ownerName(rng, n):
+    """Returns one of about n / 10 owners' names."""
+    return rng.choice(NAMES) + str(rng.randrange(max(1, n // (10 * len(NAMES)))))
+ 
+def buildBank(n):
+    bank = Bank()
+    rng = random.Random(0)
+    for pinNumber in range(1000, 1000 + n):
+        bank.add(SavingsAccount(ownerName(rng, n), str(pinNumber), float(rng.randint(100, 1000))))
+    return bank
+ 
+def timeQueries(bank, n):
+    """Returns the seconds per name query and per balance query
+    (each range holds about 1% of the accounts)."""
+    rng = random.Random(2)
+    start = time.perf_counter()
+    for _ in range(QUERIES):
+        bank.accountsNamed(ownerName(rng, n))
+    byName = (time.perf_counter() - start) / QUERIES
+    start = time.perf_counter()
+    for _ in range(QUERIES):
+        low = rng.randint(100, 990)
+        bank.accountsWithBalance(low, low + 9)
+    byBalance = (time.perf_counter() - start) / QUERIES
+    return byName, byBalance
+ 
+def timeDeposits(bank, n):
+    """Returns deposits per second."""
+    rng = random.Random(3)
+    keys = bank.getKeys()
+    keys = [rng.choice(keys) for _ in range(DEPOSITS)]
+    start = time.perf_counter()
+    for name, pin in keys:
+        bank.deposit(name, pin, 1)
+    return DEPOSITS / (time.perf_counter() - start)
+ 
+def run(n):
+    print("n = {:,}".format(n))
+    bank = buildBank(n)
+    byName, byBalance = timeQueries(bank, n)
+    rate = timeDeposits(bank, n)
+    print("  scan       by name {:9.3f}ms  by balance {:9.3f}ms  {:9,.0f} deposits/s".format(
+        byName * 1000, byBalance * 1000, rate))
+    start = time.perf_counter()
+    bank.addIndex("name", NameIndex())
+    bank.addIndex("balance", BalanceIndex())
+    seconds = time.perf_counter() - start
+    byName, byBalance = timeQueries(bank, n)
+    rate = timeDeposits(bank, n)
+    print("  indexed    by name {:9.3f}ms  by balance {:9.3f}ms  {:9,.0f} deposits/s".format(
+        byName * 1000, byBalance * 1000, rate))
+    print("  indexes built in {:.2f}s".format(seconds))
+ 
+def main(sizes = DEFAULT_SIZES):
+    for n in sizes:
+        run(n)
+ 
+if __name__ == "__main__":
+    sizes = [int(float(arg)) for arg in sys.argv[1:]]
+    main(sizes or DEFAULT_SIZES)
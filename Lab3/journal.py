@@ -0,0 +1,109 @@
+"""
+File: journal.py
+This module defines the Journal class, a write-ahead log of the
+changes made to a bank since its last checkpoint.
+"""
+import json
+import os
+import struct
+import threading
+import zlib
+ 
+JOURNAL_SUFFIX = ".wal"
+RECORD_HEADER = struct.Struct("<II")   # payload length, CRC-32 of the payload
+SYNC_EVERY = 32         # Records written before the journal is forced to disk
+SYNC_INTERVAL = 0.05    # Seconds a record may wait to be forced to disk
+ 
+class Journal:
+    """This class appends change records to a file (the bank's file
+    name + ".wal").  Each record holds the operation and the name,
+    PIN, and balance afterward of each account it changed (two for
+    a transfer, so a transfer is replayed whole or not at all).
+    Balances are absolute, so replaying a record twice does no
+    harm.  Each record is handed to the operating system as it is
+    written, so it survives a crash of the program.  Records are
+    forced to disk, to survive a crash of the machine, in groups:
+    once SYNC_EVERY records have built up, when a timer started by
+    the first of them runs out after SYNC_INTERVAL seconds, or
+    when sync() is called."""
+ 
+    def __init__(self, fileName, syncEvery = SYNC_EVERY):
+        self.fileName = fileName
+        self.syncEvery = syncEvery
+        self.fileObj = open(fileName, 'ab')
+        self.unsynced = 0
+        self.timer = None   # Forces the waiting records to disk
+        self.lock = threading.Lock()   # The timer runs in its own thread
+        self.count = sum(1 for record in self.records())
+ 
+    def append(self, operation, entries):
+        """Writes a record of the change to the (name, pin, balance)
+        entries and flushes it, forcing the journal to disk if enough
+        records are waiting or starting the timer that will."""
+        payload = json.dumps([operation, entries]).encode("utf-8")
+        with self.lock:
+            self.fileObj.write(RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload)
+            self.fileObj.flush()
+            self.count += 1
+            self.unsynced += 1
+            if self.unsynced >= self.syncEvery:
+                self._sync()
+            elif self.timer is None:
+                self.timer = threading.Timer(SYNC_INTERVAL, self.sync)
+                self.timer.daemon = True
+                self.timer.start()
+ 
+    def sync(self):
+        """Forces every record written so far to disk."""
+        with self.lock:
+            self._sync()
+ 
+    def _sync(self):
+        self._stopTimer()
+        if self.unsynced and not self.fileObj.closed:
+            self.fileObj.flush()
+            os.fsync(self.fileObj.fileno())
+            self.unsynced = 0
+ 
+    def _stopTimer(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+ 
+    def records(self):
+        """Yields the (operation, entries) records in
+        the order written.  A record cut short by a crash ends
+        the journal; it is removed."""
+        self.fileObj.flush()
+        with open(self.fileName, 'rb') as fileObj:
+            goodEnd = 0
+            while True:
+                header = fileObj.read(RECORD_HEADER.size)
+                if len(header) < RECORD_HEADER.size:
+                    break
+                length, crc = RECORD_HEADER.unpack(header)
+                payload = fileObj.read(length)
+                if len(payload) < length or zlib.crc32(payload) != crc:
+                    break
+                goodEnd = fileObj.tell()
+                yield tuple(json.loads(payload.decode("utf-8")))
+            torn = fileObj.tell() > goodEnd
+        if torn:
+            with self.lock:
+                self.fileObj.truncate(goodEnd)
+ 
+    def clear(self):
+        """Empties the journal once its changes are checkpointed."""
+        with self.lock:
+            self.fileObj.truncate(0)
+            self.fileObj.flush()
+            os.fsync(self.fileObj.fileno())
+            self._stopTimer()
+            self.unsynced = 0
+            self.count = 0
+ 
+    def close(self):
+        """Forces the records to disk and closes the file."""
+        with self.lock:
+            self._sync()
+            self.fileObj.close()
@@ -0,0 +1,121 @@
+"""
+File: roster.py
+This module defines the Roster class, which answers leaderboard, rank,
+and ordered listing requests on a Gradebook's students without sorting
+the whole class for each request.
+"""
+import heapq
+from itertools import islice
+from sortedindex import SortedIndex
+ 
+class Roster:
+    """This class listens to a Gradebook and keeps, for each key
+    ("average", "high", or a test number) it has been asked about,
+    every student's value of the key, updated as scores are set.
+    For the keys it ranks, it also keeps the (value, -row) pairs
+    in a SortedIndex, so the top k students are read off the end
+    and a student's rank is found by a binary search.  Other keys
+    are answered by heapq.nlargest over the kept values.  Names are
+    kept in a SortedIndex of (name, row) pairs for listing students
+    in order of name.
+ 
+    Students with equal values are listed in the order they were
+    added, as Gradebook.rankOrder lists them, and share the best
+    rank among them."""
+ 
+    def __init__(self, gradebook, ranked = ("average",)):
+        """Creates a roster of the gradebook that ranks the keys
+        in ranked, and installs it as a listener."""
+        self.gradebook = gradebook
+        self.values = {}     # key -> each row's value
+        self.rankings = {}   # key -> SortedIndex of (value, -row)
+        for key in ranked:
+            self.rankings[key] = None
+        gradebook.addListener(self)
+ 
+    def __len__(self):
+        return len(self.gradebook)
+ 
+    def track(self, key):
+        """Keeps a ranking of the key from now on."""
+        self.rankings[key] = self._ranking(key)
+ 
+    def untrack(self, key):
+        """Stops keeping a ranking of the key."""
+        self.rankings.pop(key, None)
+ 
+    def topK(self, k, key = "average"):
+        """Returns a list of the k best students by the key."""
+        gradebook = self.gradebook
+        if key in self.rankings:
+            return [gradebook.viewOf(-row) for value, row in islice(reversed(self.rankings[key]), k)]
+        values = self._values(key)
+        # nlargest keeps the earlier row of equal values first
+        rows = heapq.nlargest(k, range(len(values)), key = values.__getitem__)
+        return [gradebook.viewOf(row) for row in rows]
+ 
+    def rankOf(self, student, key = "average"):
+        """Returns the student's rank by the key, 1 for the best."""
+        value = self._values(key)[student.row]
+        if key in self.rankings:
+            ranking = self.rankings[key]
+            # (value, 1) follows every (value, -row) pair
+            return len(ranking) - ranking.position((value, 1)) + 1
+        return sum(1 for other in self.values[key] if other > value) + 1
+ 
+    def byName(self, after = None):
+        """Yields the students in order of name, starting after
+        the given student if there is one."""
+        key = None if after is None else (after.getName(), after.row)
+        for name, row in self.names.after(key):
+            yield self.gradebook.viewOf(row)
+ 
+    def page(self, size, after = None):
+        """Returns a list of up to size students in order of name,
+        following the given student.  Passing the last student
+        returned gets the next page."""
+        return list(islice(self.byName(after), size))
+ 
+    # Gradebook listener methods
+ 
+    def rebuild(self, gradebook):
+        self.names = SortedIndex((name, row) for row, name in enumerate(gradebook.names))
+        for key in self.values:
+            self.values[key] = self._computeValues(key)
+        for key in self.rankings:
+            self.rankings[key] = self._ranking(key)
+ 
+    def added(self, gradebook, row):
+        self.names.add((gradebook.names[row], row))
+        for key, values in self.values.items():
+            value = gradebook.rowValue(row, key)
+            values.append(value)
+            if key in self.rankings:
+                self.rankings[key].add((value, -row))
+ 
+    def changed(self, gradebook, row):
+        for key, values in self.values.items():
+            value = gradebook.rowValue(row, key)
+            if value == values[row]:
+                continue
+            if key in self.rankings:
+                ranking = self.rankings[key]
+                ranking.discard((values[row], -row))
+                ranking.add((value, -row))
+            values[row] = value
+ 
+    def _values(self, key):
+        """Returns every row's value of the key, computing and
+        keeping them the first time the key is used."""
+        values = self.values.get(key)
+        if values is None:
+            values = self.values[key] = self._computeValues(key)
+        return values
+ 
+    def _computeValues(self, key):
+        values = self.gradebook.keyValues(key)
+        return values.tolist() if hasattr(values, "tolist") else list(values)
+ 
+    def _ranking(self, key):
+        values = self._values(key)
+        return SortedIndex((value, -row) for row, value in enumerate(values))
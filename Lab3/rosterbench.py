@@ -0,0 +1,77 @@
+"""
+File: rosterbench.py
+Measures leaderboard, rank, and listing requests on rosters of 10**5
+to 10**6 students, answered by full sorts of Student objects and by a
+Roster, and what keeping the Roster current costs each setScore.
+"""
+import random
+import sys
+import time
+from gradebook import Gradebook
+from roster import Roster
+ 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+ 
+DEFAULT_SIZES = (10 ** 5, 10 ** 6)
+TESTS = 5
+REQUESTS = 20
+UPDATES = 100000
+TOP = 10
+ 
+def buildGradebook(n, seed = 0):
+    rng = random.Random(seed)
+    names = ["Student" + str(rng.randrange(n)) for _ in range(n)]
+    if np is not None:
+        scores = np.random.default_rng(seed).integers(0, 101, (n, TESTS))
+    else:
+        scores = [[rng.randint(0, 100) for _ in range(TESTS)] for _ in range(n)]
+    gradebook = Gradebook(TESTS)
+    gradebook.addScores(names, scores)
+    return gradebook
+ 
+def timed(request):
+    """Returns the average seconds of REQUESTS calls."""
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        request()
+    return (time.perf_counter() - start) / REQUESTS
+ 
+def run(n):
+    print("n = {:,}".format(n))
+    gradebook = buildGradebook(n)
+    students = list(gradebook)
+    student = students[n // 2]
+    sortTop = timed(lambda: sorted(students, key = lambda s: s.getAverageScore(), reverse = True)[:TOP])
+    sortRank = timed(lambda: sorted(students, key = lambda s: s.getAverageScore(), reverse = True).index(student))
+    sortNames = timed(lambda: sorted(students)[:TOP])
+    print("  sorting    top {:9.3f}ms  rank {:9.3f}ms  by name {:9.3f}ms".format(
+        sortTop * 1000, sortRank * 1000, sortNames * 1000))
+ 
+    start = time.perf_counter()
+    roster = Roster(gradebook, ranked = ("average",))
+    built = time.perf_counter() - start
+    rosterTop = timed(lambda: roster.topK(TOP))
+    rosterRank = timed(lambda: roster.rankOf(student))
+    rosterNames = timed(lambda: roster.page(TOP))
+    heapTop = timed(lambda: roster.topK(TOP, "high"))
+    print("  roster     top {:9.3f}ms  rank {:9.3f}ms  by name {:9.3f}ms  (built in {:.2f}s)".format(
+        rosterTop * 1000, rosterRank * 1000, rosterNames * 1000, built))
+    print("  unranked   top {:9.3f}ms  (heapq.nlargest over kept values)".format(heapTop * 1000))
+ 
+    rng = random.Random(1)
+    updates = [(rng.choice(students), rng.randint(1, TESTS), rng.randint(0, 100)) for _ in range(UPDATES)]
+    start = time.perf_counter()
+    for student, test, score in updates:
+        student.setScore(test, score)
+    print("  setScore   {:,.0f}/s with the roster".format(UPDATES / (time.perf_counter() - start)))
+ 
+def main(sizes = DEFAULT_SIZES):
+    for n in sizes:
+        run(n)
+ 
+if __name__ == "__main__":
+    sizes = [int(float(arg)) for arg in sys.argv[1:]]
+    main(sizes or DEFAULT_SIZES)
@@ -2,17 +2,66 @@
 File: savingsaccount.py
 This module defines the SavingsAccount class.
 """
+import sys
  
 class SavingsAccount:
     """This class represents a savings account
-    with the owner's name, PIN, and balance."""
+    with the owner's name, PIN, and balance.  An account
+    kept in a bank's AccountTable is a view: its balance
+    is stored in the table's row.  The fields are slots
+    rather than a per-account dictionary, and names are
+    interned, since a bank may hold millions of accounts."""
+ 
+    __slots__ = ("name", "pin", "table", "row", "_balance", "__weakref__")
  
     RATE = 0.02    # Single rate for all accounts
  
     def __init__(self, name, pin, balance = 0.0):
-        self.name = name
+        self.name = sys.intern(name)
         self.pin = pin
-        self.balance = balance
+        self.table = None
+        self.row = None
+        self._balance = balance
+ 
+    @property
+    def balance(self):
+        """The balance, read from the table if the account is a view."""
+        if self.table is None:
+            return self._balance
+        return float(self.table.balances[self.row])
+ 
+    @balance.setter
+    def balance(self, value):
+        if self.table is None:
+            self._balance = value
+        else:
+            self.table.setBalance(self.row, value)
+ 
+    def bind(self, table, row):
+        """Makes the account a view onto a row of the table."""
+        self.table = table
+        self.row = row
+ 
+    def unbind(self):
+        """Copies the balance out of the table, so the account
+        stands alone again."""
+        self._balance = self.balance
+        self.table = None
+        self.row = None
+ 
+    def __getstate__(self):
+        """Pickles the account as the original class did: a
+        dictionary of the name, PIN, and balance."""
+        return {"name": self.name, "pin": self.pin, "balance": self.balance}
+ 
+    def __setstate__(self, state):
+        """Restores a pickled account.  Accounts pickled before
+        the balance moved into a table, as in old bank files,
+        have their __dict__ as their state."""
+        if isinstance(state, tuple):   # (__dict__, slots) state
+            dictState, slotState = state
+            state = dict(dictState or {}, **(slotState or {}))
+        self.__init__(state["name"], state["pin"], state.get("balance", state.get("_balance", 0.0)))
  
     def __str__(self):
         """Returns the string rep."""
@@ -58,6 +107,6 @@ class SavingsAccount:
  
     def computeInterest(self):
         """Computes, deposits, and returns the interest."""
-        interest = self.balance * SavingsAccount.RATE
+        interest = self.balance * self.RATE
         self.deposit(interest)
         return interest
@@ -0,0 +1,68 @@
+"""
+File: secondaryindex.py
+This module defines secondary indexes for a bank's AccountTable.
+An index listens to the table (see AccountTable.addListener) and is
+told of every account added or removed and every balance changed:
+    rebuild(table)                  build from scratch
+    added(table, row)
+    removed(table, row)             called before the row is cleared
+    changed(table, row, oldBalance)
+Any object with these methods can be installed with Bank.addIndex.
+"""
+from sortedindex import SortedIndex
+ 
+class NameIndex:
+    """A hash index from an owner's name to the rows of the
+    accounts in that name."""
+ 
+    def __init__(self):
+        self.rowsByName = {}
+ 
+    def rebuild(self, table):
+        self.rowsByName = {}
+        for row in table.rowsInUse():
+            self.added(table, row)
+ 
+    def added(self, table, row):
+        self.rowsByName.setdefault(table.names[row], set()).add(row)
+ 
+    def removed(self, table, row):
+        rows = self.rowsByName[table.names[row]]
+        rows.discard(row)
+        if not rows:
+            del self.rowsByName[table.names[row]]
+ 
+    def changed(self, table, row, oldBalance):
+        pass
+ 
+    def rows(self, name):
+        """Returns the rows of the accounts in the name."""
+        return self.rowsByName.get(name, ())
+ 
+class BalanceIndex:
+    """An ordered index of (balance, row) pairs, so the accounts
+    with balances in a range are found without a scan."""
+ 
+    def __init__(self):
+        self.entries = SortedIndex()
+ 
+    def rebuild(self, table):
+        self.entries = SortedIndex((float(table.balances[row]), row) for row in table.rowsInUse())
+ 
+    def added(self, table, row):
+        self.entries.add((float(table.balances[row]), row))
+ 
+    def removed(self, table, row):
+        self.entries.discard((float(table.balances[row]), row))
+ 
+    def changed(self, table, row, oldBalance):
+        self.entries.discard((oldBalance, row))
+        self.entries.add((float(table.balances[row]), row))
+ 
+    def rows(self, low, high):
+        """Yields, in order of balance, the rows with balances
+        from low up to but not including high."""
+        # Rows are never negative, so (low, -1) sorts before every
+        # entry with balance low
+        for balance, row in self.entries.range((low, -1), (high, -1)):
+            yield row
@@ -0,0 +1,137 @@
+"""
+File: sortedindex.py
+This module defines the SortedIndex class, a sorted collection of
+keys that stays sorted as keys are added and removed.
+"""
+from bisect import bisect_left, bisect_right
+from itertools import islice
+ 
+BLOCK_SIZE = 512   # Keys per block after a split
+ 
+class SortedIndex:
+    """This class keeps keys in order in a list of sorted blocks,
+    with the largest key of each block in a separate list.  A key
+    is found by a binary search of the block maxima and then of one
+    block, so adding or removing a key moves at most 2 * BLOCK_SIZE
+    entries rather than the whole list, and ordered iteration can
+    start anywhere without sorting."""
+ 
+    def __init__(self, keys = ()):
+        """Creates an index holding the keys."""
+        self._build(sorted(set(keys)))
+ 
+    def _build(self, ordered):
+        self.blocks = [ordered[i:i + BLOCK_SIZE] for i in range(0, len(ordered), BLOCK_SIZE)]
+        self.maxes = [block[-1] for block in self.blocks]
+        self.count = len(ordered)
+ 
+    def __len__(self):
+        return self.count
+ 
+    def __contains__(self, key):
+        i = bisect_left(self.maxes, key)
+        if i == len(self.maxes):
+            return False
+        block = self.blocks[i]
+        j = bisect_left(block, key)
+        return block[j] == key
+ 
+    def __iter__(self):
+        for block in self.blocks:
+            yield from block
+ 
+    def __reversed__(self):
+        for block in reversed(self.blocks):
+            yield from reversed(block)
+ 
+    def position(self, key):
+        """Returns the number of keys less than the key."""
+        i = bisect_left(self.maxes, key)
+        if i == len(self.blocks):
+            return self.count
+        return sum(len(block) for block in self.blocks[:i]) + bisect_left(self.blocks[i], key)
+ 
+    def add(self, key):
+        """Adds the key if it is not already present."""
+        if not self.blocks:
+            self.blocks.append([key])
+            self.maxes.append(key)
+            self.count = 1
+            return
+        i = min(bisect_left(self.maxes, key), len(self.maxes) - 1)
+        block = self.blocks[i]
+        j = bisect_left(block, key)
+        if j < len(block) and block[j] == key:
+            return
+        block.insert(j, key)
+        self.maxes[i] = block[-1]
+        self.count += 1
+        if len(block) > 2 * BLOCK_SIZE:
+            self.blocks[i:i + 1] = [block[:BLOCK_SIZE], block[BLOCK_SIZE:]]
+            self.maxes[i:i + 1] = [block[BLOCK_SIZE - 1], block[-1]]
+ 
+    def update(self, keys):
+        """Adds many keys.  A large batch is merged with the keys
+        present in one sort, which is faster than adding the keys
+        one by one."""
+        keys = list(keys)
+        if len(keys) < self.count // 16:
+            for key in keys:
+                self.add(key)
+            return
+        merged = list(self)
+        merged.extend(keys)
+        merged.sort()   # The keys present are one sorted run already
+        self._build([key for key, following in zip(merged, merged[1:]) if key != following] +
+                    merged[-1:])
+ 
+    def discard(self, key):
+        """Removes the key if it is present."""
+        i = bisect_left(self.maxes, key)
+        if i == len(self.maxes):
+            return
+        block = self.blocks[i]
+        j = bisect_left(block, key)
+        if block[j] != key:
+            return
+        del block[j]
+        self.count -= 1
+        if block:
+            self.maxes[i] = block[-1]
+        else:
+            del self.blocks[i]
+            del self.maxes[i]
+ 
+    def after(self, key = None):
+        """Yields the keys greater than the key (all keys if the
+        key is None) in order.  Keys added or removed during the
+        iteration may or may not be seen."""
+        if key is None:
+            if not self.blocks:
+                return
+            yield from self._keysFrom(self.blocks[0][0], bisect_left)
+        else:
+            yield from self._keysFrom(key, bisect_right)
+ 
+    def range(self, low, high):
+        """Yields the keys from low up to but not including high."""
+        for key in self._keysFrom(low, bisect_left):
+            if not key < high:
+                return
+            yield key
+ 
+    def page(self, size, after = None):
+        """Returns a list of up to size keys following the key."""
+        return list(islice(self.after(after), size))
+ 
+    def _keysFrom(self, key, find):
+        # Each block is copied before it is yielded from, and the next
+        # one is found again by key, so changes cannot derail the walk
+        while True:
+            i = find(self.maxes, key)
+            if i == len(self.blocks):
+                return
+            block = self.blocks[i]
+            chunk = block[find(block, key):]
+            yield from chunk
+            key, find = chunk[-1], bisect_right
@@ -1,12 +1,35 @@
 import random
 
 class Student(object):
-    """Represents a student."""
+    """Represents a student.  A student kept in a Gradebook is
+    a view: its scores are stored in the gradebook's row."""
 
     def __init__(self, name, number):
         """All scores are initially 0."""
         self.name = name
-        self.scores = [0] * number
+        self.gradebook = None
+        self.row = None
+        self._scores = [0] * number
+
+    @property
+    def scores(self):
+        """The scores: a list, or if the student is a view, a
+        ScoreRow that reads and writes the gradebook's row."""
+        if self.gradebook is None:
+            return self._scores
+        return self.gradebook.scoreRow(self.row)
+
+    def bind(self, gradebook, row):
+        """Makes the student a view onto a row of the gradebook."""
+        self.gradebook = gradebook
+        self.row = row
+
+    def unbind(self):
+        """Copies the scores out of the gradebook, so the student
+        stands alone again."""
+        self._scores = list(self.scores)
+        self.gradebook = None
+        self.row = None
 
     def getName(self):
         """Returns the student's name."""
@@ -14,11 +37,16 @@ class Student(object):
 
     def setScore(self, i, score):
         """Resets the ith score, counting from 1."""
-        self.scores[i - 1] = score
+        if self.gradebook is None:
+            self._scores[i - 1] = score
+        else:
+            self.gradebook.setScore(self.row, i, score)
 
     def getScore(self, i):
         """Returns the ith score, counting from 1."""
-        return self.scores[i - 1]
+        if self.gradebook is None:
+            return self._scores[i - 1]
+        return self.gradebook.getScore(self.row, i)
 
     def getAverageScore(self):
         """Returns the average score."""
@@ -0,0 +1,72 @@
+import os
+import pickle
+import tempfile
+import unittest
+from accountstore import CorruptAccountError, isLegacyFile, openStore, readLegacyFile
+from bank import Bank
+from savingsaccount import SavingsAccount
+ 
+# Two accounts (Ken/1001 with 500.0, Jill/1002 with 20.5) as the
+# original Bank.save wrote them with the original SavingsAccount,
+# whose fields were in a __dict__
+BASELINE_FILE = (
+    b'\x80\x04\x95Z\x00\x00\x00\x00\x00\x00\x00\x8c\x0esavingsaccount\x94\x8c\x0eSavingsAccount\x94\x93\x94)\x81\x94}\x94(\x8c\x04name\x94\x8c\x03Ke'
+    b'n\x94\x8c\x03pin\x94\x8c\x041001\x94\x8c\x07balance\x94G@\x7f@\x00\x00\x00\x00\x00ub.\x80\x04\x95[\x00\x00\x00\x00\x00\x00\x00\x8c\x0esavingsaccount'
+    b'\x94\x8c\x0eSavingsAccount\x94\x93\x94)\x81\x94}\x94(\x8c\x04name\x94\x8c\x04Jill\x94\x8c\x03pin\x94\x8c\x041002\x94\x8c\x07balance\x94G'
+    b'@4\x80\x00\x00\x00\x00\x00ub.')
+ 
+class TestLegacyFiles(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.fileName = os.path.join(self.directory.name, "bank.dat")
+ 
+    def tearDown(self):
+        self.directory.cleanup()
+ 
+    def test_converts_baseline_pickle_file(self):
+        with open(self.fileName, 'wb') as fileObj:
+            fileObj.write(BASELINE_FILE)
+        bank = Bank(self.fileName)
+        self.assertEqual(bank.get("Ken", "1001").getBalance(), 500.0)
+        self.assertEqual(bank.get("Jill", "1002").getBalance(), 20.5)
+        bank.close()
+        self.assertFalse(isLegacyFile(self.fileName))
+        with open(self.fileName + ".bak", 'rb') as fileObj:
+            self.assertEqual(fileObj.read(), BASELINE_FILE)
+        bank = Bank(self.fileName)
+        self.assertEqual(bank.getKeys(), [("Jill", "1002"), ("Ken", "1001")])
+        bank.close()
+ 
+    def test_failed_conversion_keeps_original(self):
+        with open(self.fileName, 'wb') as fileObj:
+            fileObj.write(BASELINE_FILE + b"\x80\x04not a pickle")
+        with open(self.fileName, 'rb') as fileObj:
+            original = fileObj.read()
+        with self.assertRaises(CorruptAccountError):
+            openStore(self.fileName)
+        with open(self.fileName, 'rb') as fileObj:
+            self.assertEqual(fileObj.read(), original)
+        self.assertFalse(os.path.exists(self.fileName + ".bak"))
+ 
+class TestPickledAccounts(unittest.TestCase):
+    def test_reads_baseline_records(self):
+        with tempfile.TemporaryDirectory() as directory:
+            fileName = os.path.join(directory, "bank.dat")
+            with open(fileName, 'wb') as fileObj:
+                fileObj.write(BASELINE_FILE)
+            accounts = readLegacyFile(fileName)
+        self.assertEqual([(account.getName(), account.getPin(), account.getBalance())
+                          for account in accounts],
+                         [("Ken", "1001", 500.0), ("Jill", "1002", 20.5)])
+ 
+    def test_view_pickles_with_its_balance(self):
+        bank = Bank()
+        bank.add(SavingsAccount("Ken", "1001", 500.0))
+        bank.deposit("Ken", "1001", 25)
+        account = pickle.loads(pickle.dumps(bank.get("Ken", "1001")))
+        self.assertIsNone(account.table)
+        self.assertEqual(account.getBalance(), 525.0)
+        self.assertEqual(account.getName(), "Ken")
+ 
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+from accountstore import CorruptAccountError
+from bank import Bank
+from savingsaccount import SavingsAccount
+from secondaryindex import BalanceIndex
+ 
+class TestAddRecords(unittest.TestCase):
+    def test_repeated_key_with_index_installed(self):
+        bank = Bank()
+        bank.addIndex("balance", BalanceIndex())
+        bank.addRecords([("Ken", "1", 1.0), ("Ken", "2", 2.0), ("Ken", "1", 5.0)])
+        self.assertEqual(bank.get("Ken", "1").getBalance(), 5.0)
+        self.assertEqual([account.getPin() for account in bank.accountsWithBalance(0, 10)], ["2", "1"])
+ 
+    def test_repeated_key_in_memory(self):
+        bank = Bank()
+        bank.addRecords([("Ken", "1", 1.0), ("Ken", "2", 2.0), ("Ken", "1", 5.0)])
+        self.assertEqual(bank.get("Ken", "1").getBalance(), 5.0)
+        self.assertEqual(bank.getKeys(), [("Ken", "1"), ("Ken", "2")])
+ 
+    def test_bulk_write_survives_recovery(self):
+        with tempfile.TemporaryDirectory() as directory:
+            fileName = os.path.join(directory, "bank.dat")
+            bank = Bank(fileName)
+            bank.add(SavingsAccount("Ken", "1", 100.0))
+            for _ in range(40):
+                bank.deposit("Ken", "1", 1)
+            bank.addRecords([("Ken", "1", 999.0)])
+            # Abandon the bank as a crash would, leaving its journal
+            bank.journal.sync()
+            bank.store.connection.close()
+            bank = Bank(fileName)
+            self.assertEqual(bank.get("Ken", "1").getBalance(), 999.0)
+            bank.close()
+ 
+class TestComputeInterest(unittest.TestCase):
+    def test_store_interest_without_loading_accounts(self):
+        with tempfile.TemporaryDirectory() as directory:
+            fileName = os.path.join(directory, "bank.dat")
+            bank = Bank(fileName)
+            bank.addRecords([("Ann", "1", 100.0), ("Bob", "2", 200.0), ("Cy", "3", 300.0)])
+            bank.deposit("Bob", "2", 50)   # In use, and only journaled
+            self.assertAlmostEqual(bank.computeInterest(), 650.0 * SavingsAccount.RATE)
+            self.assertEqual(len(bank.accounts), 1)
+            self.assertEqual(bank.journal.count, 0)
+            bank.deposit("Bob", "2", 1)
+            bank.close()
+            bank = Bank(fileName)
+            expected = {"Ann": 100.0, "Bob": 250.0, "Cy": 300.0}
+            for name, pin, balance in bank.store.records():
+                extra = 1 if name == "Bob" else 0
+                self.assertAlmostEqual(balance, expected[name] * (1 + SavingsAccount.RATE) + extra)
+            bank.close()
+ 
+    def test_corrupt_row_stays_corrupt(self):
+        with tempfile.TemporaryDirectory() as directory:
+            fileName = os.path.join(directory, "bank.dat")
+            bank = Bank(fileName)
+            bank.addRecords([("Ann", "1", 100.0)])
+            bank.store.connection.execute("UPDATE accounts SET balance = 1e6")
+            bank.store.commit()
+            bank.computeInterest()
+            self.assertRaises(CorruptAccountError, bank.get, "Ann", "1")
+            bank.close()
+ 
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+from gradebook import Gradebook
+from student import Student
+ 
+class TestStudentViews(unittest.TestCase):
+    def setUp(self):
+        self.gradebook = Gradebook(3)
+        student = Student("Alice", 3)
+        for i, score in enumerate((80, 90, 70), 1):
+            student.setScore(i, score)
+        self.gradebook.add(student)
+        self.student = student
+ 
+    def test_view_reads_the_gradebook(self):
+        self.assertEqual(self.student.scores, [80, 90, 70])
+        self.assertEqual(self.student.getAverageScore(), 80)
+        self.assertEqual(self.student.getHighScore(), 90)
+        self.assertEqual(str(self.student), "Name: Alice\nScores: 80 90 70")
+ 
+    def test_assigning_to_scores_writes_through(self):
+        self.student.scores[0] = 100
+        self.student.scores[-1] = 60
+        self.assertEqual(self.student.getScore(1), 100)
+        self.assertEqual(self.student.getScore(3), 60)
+        self.assertEqual(list(self.gradebook.averages()), [250 / 3])
+ 
+    def test_number_of_scores_is_fixed(self):
+        with self.assertRaises(TypeError):
+            del self.student.scores[0]
+        with self.assertRaises(IndexError):
+            self.student.scores[3] = 50
+ 
+    def test_unbind_copies_the_scores(self):
+        self.student.unbind()
+        self.student.scores[0] = 10
+        self.assertEqual(self.student.scores, [10, 90, 70])
+        self.assertEqual(list(self.gradebook.rowScores(0)), [80, 90, 70])
+ 
+if __name__ == "__main__":
+    unittest.main()
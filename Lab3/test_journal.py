@@ -0,0 +1,127 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+from bank import Bank
+from journal import JOURNAL_SUFFIX, RECORD_HEADER, SYNC_INTERVAL, Journal
+from savingsaccount import SavingsAccount
+ 
+def abandon(bank):
+    """Leaves the bank's files as a crash of the program would."""
+    bank.journal.fileObj.close()
+    bank.store.connection.close()
+ 
+class TestJournal(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.fileName = os.path.join(self.directory.name, "bank.dat.wal")
+ 
+    def tearDown(self):
+        self.directory.cleanup()
+ 
+    def test_records_read_back_in_order(self):
+        journal = Journal(self.fileName)
+        journal.append("deposit", [("Ken", "1", 105.0)])
+        journal.append("transfer", [("Ken", "1", 95.0), ("Jill", "2", 30.0)])
+        journal.close()
+        journal = Journal(self.fileName)
+        self.assertEqual(journal.count, 2)
+        self.assertEqual(list(journal.records()),
+                         [("deposit", [["Ken", "1", 105.0]]),
+                          ("transfer", [["Ken", "1", 95.0], ["Jill", "2", 30.0]])])
+        journal.close()
+ 
+    def test_torn_record_is_removed(self):
+        journal = Journal(self.fileName)
+        journal.append("deposit", [("Ken", "1", 105.0)])
+        journal.close()
+        goodSize = os.path.getsize(self.fileName)
+        with open(self.fileName, 'ab') as fileObj:
+            fileObj.write(RECORD_HEADER.pack(100, 0) + b'["deposit"')
+        journal = Journal(self.fileName)
+        self.assertEqual(journal.count, 1)
+        self.assertEqual(os.path.getsize(self.fileName), goodSize)
+        journal.append("withdraw", [("Ken", "1", 100.0)])
+        self.assertEqual([operation for operation, entries in journal.records()], ["deposit", "withdraw"])
+        journal.close()
+ 
+    def test_bad_checksum_ends_journal(self):
+        journal = Journal(self.fileName)
+        journal.append("deposit", [("Ken", "1", 105.0)])
+        journal.append("deposit", [("Ken", "1", 110.0)])
+        journal.close()
+        with open(self.fileName, 'r+b') as fileObj:
+            fileObj.seek(-3, os.SEEK_END)
+            fileObj.write(b"999")
+        journal = Journal(self.fileName)
+        self.assertEqual(list(journal.records()), [("deposit", [["Ken", "1", 105.0]])])
+        journal.close()
+ 
+    def test_record_is_written_without_a_later_append(self):
+        journal = Journal(self.fileName)
+        journal.append("deposit", [("Ken", "1", 105.0)])
+        self.assertGreater(os.path.getsize(self.fileName), 0)
+        time.sleep(SYNC_INTERVAL * 4)
+        self.assertEqual(journal.unsynced, 0)
+        journal.close()
+ 
+class TestRecovery(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.fileName = os.path.join(self.directory.name, "bank.dat")
+        bank = Bank(self.fileName)
+        bank.add(SavingsAccount("Ken", "1", 100.0))
+        bank.add(SavingsAccount("Jill", "2", 50.0))
+        bank.add(SavingsAccount("Jack", "3", 10.0))
+        bank.save()
+        self.bank = bank
+ 
+    def tearDown(self):
+        self.directory.cleanup()
+ 
+    def balances(self, bank):
+        return {key: bank.get(*key).getBalance() for key in bank.getKeys()}
+ 
+    def test_journal_is_replayed_after_a_crash(self):
+        bank = self.bank
+        bank.deposit("Ken", "1", 5)
+        bank.transfer("Ken", "1", "Jill", "2", 20)
+        bank.remove("Jack", "3")
+        bank.add(SavingsAccount("Elena", "4", 7.0))
+        self.assertEqual(bank.journal.count, 4)
+        abandon(bank)
+        bank = Bank(self.fileName)
+        self.assertEqual(self.balances(bank),
+                         {("Elena", "4"): 7.0, ("Jill", "2"): 70.0, ("Ken", "1"): 85.0})
+        self.assertEqual(bank.journal.count, 0)
+        self.assertEqual(os.path.getsize(self.fileName + JOURNAL_SUFFIX), 0)
+        bank.close()
+ 
+    def test_checkpoint_clears_journal(self):
+        bank = self.bank
+        bank.deposit("Ken", "1", 5)
+        bank.save()
+        self.assertEqual(bank.journal.count, 0)
+        self.assertEqual(os.path.getsize(self.fileName + JOURNAL_SUFFIX), 0)
+        bank.deposit("Jill", "2", 1)
+        abandon(bank)
+        bank = Bank(self.fileName)
+        self.assertEqual(self.balances(bank),
+                         {("Jack", "3"): 10.0, ("Jill", "2"): 51.0, ("Ken", "1"): 105.0})
+        bank.close()
+ 
+    def test_long_journal_is_checkpointed(self):
+        bank = self.bank
+        with mock.patch("bank.CHECKPOINT_RECORDS", 5):
+            for _ in range(12):
+                bank.deposit("Ken", "1", 1)
+        self.assertEqual(bank.journal.count, 2)
+        self.assertEqual(bank.store.get("Ken", "1"), ("Ken", "1", 110.0))
+        abandon(bank)
+        bank = Bank(self.fileName)
+        self.assertEqual(bank.get("Ken", "1").getBalance(), 112.0)
+        bank.close()
+ 
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,190 @@
+"""
+File: transactions.py
+This module defines the TransactionEngine class, which lets many
+threads work on one bank at once.
+"""
+import threading
+from contextlib import contextmanager
+ 
+STRIPES = 64    # Account locks; accounts share them by the hash of their keys
+ 
+class SharedLock:
+    """A lock that many threads may hold in shared mode at once, or
+    one thread in exclusive mode.  Waiting exclusive requests stop
+    new shared ones, so they are not starved."""
+ 
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.readers = 0
+        self.writing = False
+        self.writersWaiting = 0
+ 
+    @contextmanager
+    def shared(self):
+        with self.condition:
+            while self.writing or self.writersWaiting:
+                self.condition.wait()
+            self.readers += 1
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.readers -= 1
+                if self.readers == 0:
+                    self.condition.notify_all()
+ 
+    @contextmanager
+    def exclusive(self):
+        with self.condition:
+            self.writersWaiting += 1
+            while self.writing or self.readers:
+                self.condition.wait()
+            self.writersWaiting -= 1
+            self.writing = True
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.writing = False
+                self.condition.notify_all()
+ 
+class TransactionEngine:
+    """This class runs deposits, withdrawals, and transfers on a bank
+    from any number of threads.
+ 
+    Each account is guarded by one of a fixed set of striped locks,
+    chosen by the hash of its key.  A transaction or batch takes the
+    locks of every account it touches, always in stripe order, so
+    two transfers in opposite directions cannot deadlock.  The bank's
+    shared structures (its account table, store, and journal) are
+    guarded by a SharedLock, taken after the stripes: exclusively to
+    look accounts up, add or remove them, and journal changes, and
+    shared while balances change, so that the table cannot grow
+    under a balance update.  Balances change under the exclusive
+    lock instead when secondary indexes are installed, since they
+    are updated with every balance."""
+ 
+    def __init__(self, bank, stripes = STRIPES):
+        self.bank = bank
+        self.locks = [threading.Lock() for count in range(stripes)]
+        self.bankLock = SharedLock()
+ 
+    def deposit(self, name, pin, amount):
+        """Deposits the amount and returns None, or returns an error message."""
+        return self.submit([("deposit", name, pin, amount)])[0]
+ 
+    def withdraw(self, name, pin, amount):
+        """Withdraws the amount and returns None, or returns an error message."""
+        return self.submit([("withdraw", name, pin, amount)])[0]
+ 
+    def transfer(self, fromName, fromPin, toName, toPin, amount):
+        """Moves the amount between two accounts atomically and
+        returns None, or returns an error message."""
+        return self.submit([("transfer", fromName, fromPin, toName, toPin, amount)])[0]
+ 
+    def submit(self, transactions):
+        """Runs a batch of transactions, each one of
+            ("deposit", name, pin, amount)
+            ("withdraw", name, pin, amount)
+            ("transfer", fromName, fromPin, toName, toPin, amount)
+        with the locks of all their accounts held throughout, so
+        other threads see none or all of the batch.  Returns the
+        list of results, None or an error message for each."""
+        transactions = list(transactions)
+        keys = set()
+        for transaction in transactions:
+            keys.update(self._keys(transaction))
+        with self._locked(keys):
+            with self.bankLock.exclusive():
+                accounts = {key: self.bank.get(*key) for key in keys}
+            results = []
+            changes = []
+            if self.bank.accounts.listeners:
+                balanceLock = self.bankLock.exclusive()
+            else:
+                balanceLock = self.bankLock.shared()
+            with balanceLock:
+                for transaction in transactions:
+                    result, change = self._apply(transaction, accounts)
+                    results.append(result)
+                    if change is not None:
+                        changes.append(change)
+            if changes:
+                with self.bankLock.exclusive():
+                    for operation, changed in changes:
+                        self.bank.logChange(operation, *changed)
+        return results
+ 
+    def add(self, account):
+        """Adds the account to the bank."""
+        with self._locked([self.bank.makeKey(account.getName(), account.getPin())]):
+            with self.bankLock.exclusive():
+                self.bank.add(account)
+ 
+    def remove(self, name, pin):
+        """Removes the account from the bank and returns it,
+        or None if the account does not exist."""
+        with self._locked([self.bank.makeKey(name, pin)]):
+            with self.bankLock.exclusive():
+                return self.bank.remove(name, pin)
+ 
+    def computeInterest(self):
+        """Computes and returns the interest on all accounts,
+        with every lock held."""
+        with self._locked(None):
+            with self.bankLock.exclusive():
+                return self.bank.computeInterest()
+ 
+    def _keys(self, transaction):
+        operation = transaction[0]
+        if operation in ("deposit", "withdraw"):
+            return [self.bank.makeKey(transaction[1], transaction[2])]
+        elif operation == "transfer":
+            return [self.bank.makeKey(transaction[1], transaction[2]),
+                    self.bank.makeKey(transaction[3], transaction[4])]
+        raise ValueError("Unknown transaction: " + str(operation))
+ 
+    @contextmanager
+    def _locked(self, keys):
+        """Holds the stripe locks of the keys (all of them if keys
+        is None), acquired in stripe order."""
+        if keys is None:
+            stripes = range(len(self.locks))
+        else:
+            stripes = sorted({hash(key) % len(self.locks) for key in keys})
+        acquired = []
+        try:
+            for stripe in stripes:
+                self.locks[stripe].acquire()
+                acquired.append(self.locks[stripe])
+            yield
+        finally:
+            for lock in reversed(acquired):
+                lock.release()
+ 
+    def _apply(self, transaction, accounts):
+        """Applies one transaction to looked-up accounts and returns
+        (result, change), where change is None or the operation and
+        the accounts to journal."""
+        operation = transaction[0]
+        if operation == "transfer":
+            source = accounts[self.bank.makeKey(transaction[1], transaction[2])]
+            target = accounts[self.bank.makeKey(transaction[3], transaction[4])]
+            amount = transaction[5]
+            if source is None or target is None:
+                return "Account not found", None
+            if source is target:
+                return "Cannot transfer to the same account", None
+            message = source.withdraw(amount)
+            if message is not None:
+                return message, None
+            target.deposit(amount)
+            return None, (operation, (source, target))
+        account = accounts[self.bank.makeKey(transaction[1], transaction[2])]
+        if account is None:
+            return "Account not found", None
+        if operation == "deposit":
+            message = account.deposit(transaction[3])
+        else:
+            message = account.withdraw(transaction[3])
+        return message, None if message is not None else (operation, (account,))
@@ -1,16 +1,54 @@
 import tkinter as tk
 from tkinter import filedialog
+from text_index import TextIndex
 
-# Create a root window (hidden)
-root = tk.Tk()
-root.withdraw()  # Hide the root window
 
-# Open file dialog
-file_path = filedialog.askopenfilename(title="Select a text file",
-                                       filetypes=[("Text files", "*.txt"), ("All files", "*.*")])
+def run_queries(index):
+    """Answer word-frequency and keyword-in-context queries until the user quits."""
+    print("Commands: top [N], freq WORD, kwic WORD, quit")
+    while True:
+        command = input("> ").strip().split()
+        if not command:
+            continue
+        action, args = command[0].lower(), command[1:]
+        if action in ("quit", "q"):
+            break
+        elif action == "top":
+            k = int(args[0]) if args and args[0].isdigit() else 10
+            for word, count in index.top_words(k):
+                print(f"{count:8}  {word}")
+        elif action == "freq" and args:
+            print(f"'{args[0]}' occurs {index.frequency(args[0])} times")
+        elif action == "kwic" and args:
+            matches = index.keyword_in_context(args[0])
+            if not matches:
+                print(f"'{args[0]}' does not occur in the file")
+            for number, context in matches:
+                print(f"{number:7}: {context}")
+            shown, total = len(matches), index.frequency(args[0])
+            if shown < total:
+                print(f"({shown} of {total} occurrences shown)")
+        else:
+            print("Commands: top [N], freq WORD, kwic WORD, quit")
 
-# Print the selected file path
-if file_path:
-    print("Selected file:", file_path)
-else:
-    print("No file selected.")
+
+# The index may be built by worker processes, which re-import
+# this module, so only open the dialog in the main program
+if __name__ == "__main__":
+    # Create a root window (hidden)
+    root = tk.Tk()
+    root.withdraw()  # Hide the root window
+
+    # Open file dialog
+    file_path = filedialog.askopenfilename(title="Select a text file",
+                                           filetypes=[("Text files", "*.txt"), ("All files", "*.*")])
+
+    # Print the selected file path and index the file
+    if file_path:
+        print("Selected file:", file_path)
+        index = TextIndex.open(file_path)
+        print(f"{len(index.line_offsets)} lines, {len(index.lines)} words, "
+              f"{len(index.words)} distinct words")
+        run_queries(index)
+    else:
+        print("No file selected.")
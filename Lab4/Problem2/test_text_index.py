@@ -0,0 +1,61 @@
+import os
+import shutil
+import tempfile
+import unittest
+from text_index import TextIndex
+
+TEXT = ("The cat sat on the mat.\n"
+        "A dog saw the cat’s hat\n"
+        "\n"
+        "and THE end")
+
+
+class TestTextIndex(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.directory, "sample.txt")
+        with open(self.file_path, "w", encoding="utf-8") as f:
+            f.write(TEXT)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_frequencies(self):
+        index = TextIndex.open(self.file_path)
+        self.assertEqual(index.top_words(2), [("the", 4), ("a", 1)])
+        self.assertEqual(index.frequency("The"), 4)
+        self.assertEqual(index.frequency("cat’s"), 1)
+        self.assertEqual(index.frequency("missing"), 0)
+
+    def test_postings_and_context(self):
+        index = TextIndex.open(self.file_path)
+        self.assertEqual(index.postings("the"), [(1, 0), (1, 15), (2, 10), (4, 4)])
+        self.assertEqual(index.postings("the", limit=1), [(1, 0)])
+        number, context = index.keyword_in_context("dog", width=10)[0]
+        self.assertEqual(number, 2)
+        self.assertEqual(context, "the mat. A dog saw the c")
+
+    def test_parallel_build_matches_serial(self):
+        serial = TextIndex(self.file_path)
+        serial.build(workers=1)
+        parallel = TextIndex(self.file_path)
+        parallel.build(workers=2)
+        self.assertEqual(serial.words, parallel.words)
+        self.assertEqual(serial.lines, parallel.lines)
+        self.assertEqual(serial.columns, parallel.columns)
+        self.assertEqual(serial.line_offsets, parallel.line_offsets)
+
+    def test_saved_index_is_reused_until_file_changes(self):
+        TextIndex.open(self.file_path)
+        self.assertTrue(os.path.exists(self.file_path + ".index"))
+        loaded = TextIndex(self.file_path)
+        self.assertTrue(loaded._load())
+        self.assertEqual(loaded.frequency("the"), 4)
+        with open(self.file_path, "a", encoding="utf-8") as f:
+            f.write(" the")
+        self.assertFalse(TextIndex(self.file_path)._load())
+        self.assertEqual(TextIndex.open(self.file_path).frequency("the"), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
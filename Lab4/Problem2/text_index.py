@@ -0,0 +1,232 @@
+"""Word frequencies and a concordance (keyword in context) for a text file.
+
+The file is tokenized a line at a time, so it never has to fit in memory
+as text.  Large files are split at line boundaries and indexed in
+parallel.  The index is stored in flat arrays and saved beside the file
+(file_path + ".index"), so later opens of an unchanged file are instant.
+"""
+
+import mmap
+import os
+import re
+import struct
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+INDEX_SUFFIX = ".index"
+INDEX_MAGIC = b"TEXTIDX1"
+# magic, file size, mtime (ns), line count, word count, posting count
+HEADER = struct.Struct("<8sQQQQQ")
+WORD_PATTERN = re.compile(r"[^\W_]+(?:['’][^\W_]+)*")
+PARALLEL_THRESHOLD = 32 * 1024 * 1024   # Files at least this large are indexed by worker processes
+CONTEXT_WIDTH = 40                      # Characters shown on each side of a keyword
+
+
+def _chunk_ranges(mm, parts):
+    """Split the mapped file into about `parts` byte ranges cut after newlines."""
+    size = len(mm)
+    bounds = {0, size}
+    for i in range(1, parts):
+        newline = mm.find(b"\n", size * i // parts)
+        if newline != -1:
+            bounds.add(newline + 1)
+    bounds = sorted(bounds)
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if start < end]
+
+
+def _index_range(file_path, start, end, encoding):
+    """Worker: index bytes [start, end) of the file.
+
+    Returns the byte offset of each line and, for each word, the
+    (line, column) postings with lines counted from 0 within the range.
+    """
+    line_offsets = array('Q')
+    postings = {}
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        offset = start
+        line_number = 0
+        while offset < end:
+            newline = mm.find(b"\n", offset, end)
+            line_end = end if newline == -1 else newline + 1
+            line_offsets.append(offset)
+            text = mm[offset:line_end].decode(encoding, errors="replace")
+            for match in WORD_PATTERN.finditer(text):
+                word = match.group().lower()
+                entry = postings.get(word)
+                if entry is None:
+                    entry = postings[word] = (array('I'), array('I'))
+                entry[0].append(line_number)
+                entry[1].append(match.start())
+            offset = line_end
+            line_number += 1
+    return line_offsets, postings
+
+
+class TextIndex:
+    """Word frequencies and (line, column) postings of a text file.
+
+    Words are kept sorted from most to least frequent.  Word i owns
+    postings starts[i] to starts[i + 1] - 1 of the `lines` and
+    `columns` arrays, in file order.
+    """
+
+    def __init__(self, file_path, encoding="utf-8"):
+        self.file_path = file_path
+        self.encoding = encoding
+        self.index_path = file_path + INDEX_SUFFIX
+        self.words = []
+        self.word_ids = {}
+        self.starts = array('Q', [0])
+        self.lines = array('I')
+        self.columns = array('I')
+        self.line_offsets = array('Q')
+        self.size = 0
+        self.mtime = 0
+
+    @classmethod
+    def open(cls, file_path, workers=None, encoding="utf-8"):
+        """Return the index of a file, loading it from beside the file
+        when it is up to date and building (and saving) it otherwise."""
+        index = cls(file_path, encoding)
+        if not index._load():
+            index.build(workers)
+            index.save()
+        return index
+
+    def build(self, workers=None):
+        """Index the file, in parallel when it is large."""
+        stat = os.stat(self.file_path)
+        self.size, self.mtime = stat.st_size, stat.st_mtime_ns
+        if self.size == 0:
+            parts = []
+        elif workers == 1 or (workers is None and self.size < PARALLEL_THRESHOLD):
+            parts = [_index_range(self.file_path, 0, self.size, self.encoding)]
+        else:
+            workers = workers or os.cpu_count() or 1
+            with open(self.file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                ranges = _chunk_ranges(mm, workers * 4)
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                parts = list(pool.map(_index_range, [self.file_path] * len(ranges),
+                                      [start for start, end in ranges], [end for start, end in ranges],
+                                      [self.encoding] * len(ranges)))
+        self._merge(parts)
+
+    def _merge(self, parts):
+        """Combine per-range results into the flat arrays."""
+        merged = {}
+        self.line_offsets = array('Q')
+        for line_offsets, postings in parts:
+            base = len(self.line_offsets)
+            self.line_offsets.extend(line_offsets)
+            for word, (lines, columns) in postings.items():
+                entry = merged.get(word)
+                if entry is None:
+                    entry = merged[word] = (array('I'), array('I'))
+                if base:
+                    lines = array('I', [line + base for line in lines])
+                entry[0].extend(lines)
+                entry[1].extend(columns)
+        self.words = sorted(merged, key=lambda word: (-len(merged[word][0]), word))
+        self.word_ids = {word: i for i, word in enumerate(self.words)}
+        self.starts = array('Q', [0])
+        self.lines = array('I')
+        self.columns = array('I')
+        for word in self.words:
+            lines, columns = merged[word]
+            self.lines.extend(lines)
+            self.columns.extend(columns)
+            self.starts.append(len(self.lines))
+
+    def frequency(self, word):
+        """Return how many times a word occurs (case-insensitive)."""
+        i = self.word_ids.get(word.lower())
+        return 0 if i is None else self.starts[i + 1] - self.starts[i]
+
+    def top_words(self, k=10, min_length=1):
+        """Return the k most frequent (word, count) pairs, skipping words
+        shorter than min_length."""
+        result = []
+        for i, word in enumerate(self.words):
+            if len(result) == k:
+                break
+            if len(word) >= min_length:
+                result.append((word, self.starts[i + 1] - self.starts[i]))
+        return result
+
+    def postings(self, word, limit=None):
+        """Return the first `limit` (or all) (line, column) pairs of a
+        word, lines counted from 1."""
+        i = self.word_ids.get(word.lower())
+        if i is None:
+            return []
+        first, last = self.starts[i], self.starts[i + 1]
+        if limit is not None:
+            last = min(last, first + limit)
+        return [(line + 1, column) for line, column in zip(self.lines[first:last], self.columns[first:last])]
+
+    def line(self, number):
+        """Return line `number` (counted from 1) without its line ending."""
+        start = self.line_offsets[number - 1]
+        end = self.line_offsets[number] if number < len(self.line_offsets) else self.size
+        with open(self.file_path, 'rb') as f:
+            f.seek(start)
+            return f.read(end - start).decode(self.encoding, errors="replace").rstrip("\r\n")
+
+    def keyword_in_context(self, word, limit=20, width=CONTEXT_WIDTH):
+        """Return up to `limit` (line number, context) pairs, each context
+        showing `width` characters either side of the keyword."""
+        result = []
+        for number, column in self.postings(word, limit):
+            text = self.line(number)
+            left = text[:column]
+            right = text[column:]
+            # Borrow from the neighbouring lines when the keyword is near an end
+            if len(left) < width and number > 1:
+                left = self.line(number - 1) + " " + left
+            if len(right) < width + len(word) and number < len(self.line_offsets):
+                right = right + " " + self.line(number + 1)
+            left = " ".join(left.split())[-width:]
+            right = " ".join(right.split())[:width + len(word)]
+            result.append((number, left.rjust(width) + " " + right))
+        return result
+
+    def save(self):
+        """Write the index beside the file, ignoring an unwritable directory."""
+        try:
+            temporary = self.index_path + ".tmp"
+            with open(temporary, 'wb') as f:
+                f.write(HEADER.pack(INDEX_MAGIC, self.size, self.mtime, len(self.line_offsets),
+                                    len(self.words), len(self.lines)))
+                vocabulary = "\n".join(self.words).encode("utf-8")
+                f.write(struct.pack("<Q", len(vocabulary)))
+                f.write(vocabulary)
+                self.line_offsets.tofile(f)
+                self.starts.tofile(f)
+                self.lines.tofile(f)
+                self.columns.tofile(f)
+            os.replace(temporary, self.index_path)
+        except OSError:
+            pass
+
+    def _load(self):
+        """Load the saved index if it matches the file's size and mtime."""
+        try:
+            stat = os.stat(self.file_path)
+            with open(self.index_path, 'rb') as f:
+                magic, size, mtime, line_count, word_count, posting_count = HEADER.unpack(f.read(HEADER.size))
+                if magic != INDEX_MAGIC or size != stat.st_size or mtime != stat.st_mtime_ns:
+                    return False
+                vocabulary_length, = struct.unpack("<Q", f.read(8))
+                vocabulary = f.read(vocabulary_length).decode("utf-8")
+                line_offsets, starts, lines, columns = array('Q'), array('Q'), array('I'), array('I')
+                line_offsets.fromfile(f, line_count)
+                starts.fromfile(f, word_count + 1)
+                lines.fromfile(f, posting_count)
+                columns.fromfile(f, posting_count)
+        except (OSError, EOFError, struct.error, UnicodeDecodeError):
+            return False
+        self.words = vocabulary.split("\n") if word_count else []
+        self.word_ids = {word: i for i, word in enumerate(self.words)}
+        self.size, self.mtime = size, mtime
+        self.line_offsets, self.starts, self.lines, self.columns = line_offsets, starts, lines, columns
+        return True
@@ -1,9 +1,15 @@
 # UI.py
 
 import flet as ft
+import asyncio
 import datetime
-import requests
+import httpx
 from typing import Optional
+from api_client import ApiClient, ApiError
+from calendar_view import JournalCalendar
+from charts_view import HEATMAP_WEEKS, TREND_DAYS, JournalHeatmap, MoodTrendChart
+from local_store import LocalStore
+from sync import SyncEngine
 
 # --- UI Constants ---
 BG_COLOR = "#f8f9fa"
@@ -18,7 +24,9 @@ ERROR_COLOR = "#dc3545"
 SHADOW_COLOR = "#6c757d"
 
 # --- API & App State ---
-API_BASE_URL = "http://127.0.0.1:8000/api"
+api = ApiClient()
+store = LocalStore()
+sync_engine = SyncEngine(store, api)
 app_state = {"user_id": None, "user_name": None}
 
 def main(page: ft.Page):
@@ -29,7 +37,24 @@ def main(page: ft.Page):
 
     # --- UI Element Refs ---
     journal_entry_ref = ft.Ref[ft.TextField]()
-    calendar_grid_ref = ft.Ref[ft.GridView]()
+    calendar_ref = ft.Ref[JournalCalendar]()
+    mood_chart_ref = ft.Ref[MoodTrendChart]()
+    heatmap_ref = ft.Ref[JournalHeatmap]()
+
+    # --- In-flight requests; a newer click on the same action cancels the older one ---
+    pending_tasks = {}
+
+    async def run_latest(key: str, coro):
+        previous = pending_tasks.get(key)
+        if previous and not previous.done():
+            previous.cancel()
+        task = asyncio.ensure_future(coro)
+        pending_tasks[key] = task
+        try:
+            return await task
+        finally:
+            if pending_tasks.get(key) is task:
+                del pending_tasks[key]
 
     # --- MAIN UI VIEW CREATORS ---
 
@@ -38,7 +63,7 @@ def main(page: ft.Page):
         login_password_field = ft.TextField(label="Password", password=True, can_reveal_password=True, color=BLACK)
         error_text = ft.Text(value="", color=ERROR_COLOR, visible=False)
 
-        def handle_login(e):
+        async def handle_login(e):
             error_text.visible = False
             page.update()
             if not login_username_field.value or not login_password_field.value:
@@ -47,17 +72,18 @@ def main(page: ft.Page):
                 page.update()
                 return
             try:
-                response = requests.post(f"{API_BASE_URL}/login", json={"name": login_username_field.value, "password": login_password_field.value})
-                if response.status_code == 200:
-                    data = response.json()
-                    app_state["user_id"] = data["user_id"]
-                    app_state["user_name"] = data["name"]
-                    page.go("/main")
-                else:
-                    error_text.value = response.json().get("detail", "An unknown error occurred.")
-                    error_text.visible = True
-                    page.update()
-            except requests.exceptions.RequestException:
+                data = await run_latest("auth", api.login(login_username_field.value, login_password_field.value))
+                app_state["user_id"] = data["user_id"]
+                app_state["user_name"] = data["name"]
+                sync_engine.start(data["user_id"])  # Prefetch history for the calendar and charts
+                page.go("/main")
+            except ApiError as ex:
+                error_text.value = ex.detail or "An unknown error occurred."
+                error_text.visible = True
+                page.update()
+            except asyncio.CancelledError:
+                return
+            except httpx.HTTPError:
                 error_text.value = "Cannot connect to the server."
                 error_text.visible = True
                 page.update()
@@ -97,7 +123,7 @@ def main(page: ft.Page):
         reg_password_field = ft.TextField(label="Password", password=True, can_reveal_password=True, color=BLACK)
         error_text = ft.Text(value="", color=ERROR_COLOR, visible=False)
 
-        def handle_registration(e):
+        async def handle_registration(e):
             error_text.visible = False
             page.update()
             if not reg_username_field.value or not reg_password_field.value:
@@ -106,16 +132,15 @@ def main(page: ft.Page):
                 page.update()
                 return
             try:
-                response = requests.post(f"{API_BASE_URL}/register", json={"name": reg_username_field.value, "password": reg_password_field.value})
-                if response.status_code == 200:
-                    page.snack_bar = ft.SnackBar(content=ft.Text("Account created! Please log in."), bgcolor=SUCCESS_COLOR)
-                    page.snack_bar.open = True
-                    page.go("/")
-                else:
-                    error_text.value = response.json().get("detail", "Registration failed.")
-                    error_text.visible = True
-                    page.update()
-            except requests.exceptions.RequestException:
+                await api.register(reg_username_field.value, reg_password_field.value)
+                page.snack_bar = ft.SnackBar(content=ft.Text("Account created! Please log in."), bgcolor=SUCCESS_COLOR)
+                page.snack_bar.open = True
+                page.go("/")
+            except ApiError as ex:
+                error_text.value = ex.detail or "Registration failed."
+                error_text.visible = True
+                page.update()
+            except httpx.HTTPError:
                 error_text.value = "Cannot connect to the server."
                 error_text.visible = True
                 page.update()
@@ -149,58 +174,54 @@ def main(page: ft.Page):
             page.snack_bar.open = True
             page.update()
 
-        def select_mood(e):
+        # --- Entries are written to the local store first; the sync task uploads them ---
+
+        def paint_mood_selection(label: Optional[str]):
+            for item_container in mood_items:
+                is_selected = (item_container.data == label)
+                item_container.bgcolor = PRIMARY_COLOR if is_selected else WHITE
+                item_container.border = ft.border.all(2 if is_selected else 1, PRIMARY_COLOR if is_selected else BORDER_COLOR)
+                item_container.content.controls[0].color = WHITE if is_selected else TEXT_COLOR
+                item_container.content.controls[1].color = WHITE if is_selected else TEXT_MUTED
+
+        async def select_mood(e):
             if not app_state["user_id"]: return
             score_map = {"Happy": 9, "Content": 7, "Neutral": 5, "Sad": 3, "Angry": 1}
             label = e.control.data
             score = score_map.get(label, 5)
-            try:
-                requests.post(f"{API_BASE_URL}/mood-entry", json={"user_id": app_state["user_id"], "mood_score": score, "notes": f"Selected mood: {label}"})
-                show_snack_bar(f"Mood '{label}' saved!", SUCCESS_COLOR)
-                for item_container in e.control.parent.controls:
-                    is_selected = (item_container == e.control)
-                    item_container.bgcolor = PRIMARY_COLOR if is_selected else WHITE
-                    item_container.border = ft.border.all(2, PRIMARY_COLOR if is_selected else BORDER_COLOR)
-                    item_container.content.controls[0].color = WHITE if is_selected else TEXT_COLOR
-                    item_container.content.controls[1].color = WHITE if is_selected else TEXT_MUTED
-                page.update()
-            except requests.exceptions.RequestException: show_snack_bar("Connection error.", ERROR_COLOR)
+            store.add_mood(app_state["user_id"], score, f"Selected mood: {label}")
+            sync_engine.notify()
+            paint_mood_selection(label)
+            mood_chart_ref.current.add_mood(datetime.date.today(), score)
+            show_snack_bar(f"Mood '{label}' saved!", SUCCESS_COLOR)
 
-        def save_entry(e):
+        async def save_entry(e):
             if not app_state["user_id"]: return
             content = journal_entry_ref.current.value
             if not content:
                 show_snack_bar("Journal entry is empty.", ERROR_COLOR)
                 return
-            try:
-                requests.post(f"{API_BASE_URL}/journal-entry", json={"user_id": app_state["user_id"], "content": content})
-                journal_entry_ref.current.value = ""
-                show_snack_bar("Journal entry saved!", SUCCESS_COLOR)
-                update_calendar_with_entries()
+            store.add_journal(app_state["user_id"], content)
+            sync_engine.notify()
+            journal_entry_ref.current.value = ""
+            calendar_ref.current.mark_entry(datetime.date.today())
+            heatmap_ref.current.add_entry(datetime.date.today())
+            show_snack_bar("Journal entry saved!", SUCCESS_COLOR)
+
+        def load_charts():
+            since = (datetime.date.today() - datetime.timedelta(days=TREND_DAYS - 1)).isoformat()
+            mood_chart_ref.current.load(store.mood_daily_totals(app_state["user_id"], since))
+            heatmap_ref.current.load(store.journal_counts(app_state["user_id"], heatmap_ref.current.first_day))
+
+        def refresh_local_views():
+            if calendar_ref.current:
+                calendar_ref.current.invalidate()
+                load_charts()
                 page.update()
-            except requests.exceptions.RequestException: show_snack_bar("Connection error.", ERROR_COLOR)
-        
-        def update_calendar_with_entries():
-            if not app_state["user_id"] or not calendar_grid_ref.current: return
-            try:
-                response = requests.get(f"{API_BASE_URL}/journal-dates/{app_state['user_id']}")
-                if response.status_code == 200:
-                    entry_dates = set(response.json().get("dates", []))
-                    today_str = datetime.date.today().isoformat()
-                    for control in calendar_grid_ref.current.controls[7:]:
-                        if isinstance(control, ft.Container) and control.data:
-                            day_str = control.data
-                            if day_str == today_str:
-                                control.bgcolor = PRIMARY_COLOR
-                                control.content.color = WHITE
-                            elif day_str in entry_dates:
-                                control.bgcolor = ft.Colors.with_opacity(0.3, SUCCESS_COLOR)
-                                control.content.color = BLACK
-                            else:
-                                control.bgcolor = None
-                                control.content.color = TEXT_COLOR
-                    page.update()
-            except requests.exceptions.RequestException: pass
+
+        async def start_sync():
+            sync_engine.on_change = refresh_local_views
+            sync_engine.start(app_state["user_id"])
 
         mood_items = []
         moods = [("😄", "Happy"), ("😊", "Content"), ("😐", "Neutral"), ("😟", "Sad"), ("😠", "Angry")]
@@ -213,19 +234,15 @@ def main(page: ft.Page):
             )
 
         today = datetime.date.today()
-        calendar_grid_ref.current = ft.GridView(ref=calendar_grid_ref, expand=False, runs_count=7, max_extent=40, child_aspect_ratio=1.0, spacing=5, run_spacing=5)
-        for day in ["M", "T", "W", "T", "F", "S", "S"]:
-            calendar_grid_ref.current.controls.append(ft.Container(ft.Text(day, weight=ft.FontWeight.BOLD, color=TEXT_MUTED), alignment=ft.alignment.center))
-        
-        first_day_of_month = today.replace(day=1)
-        for _ in range(first_day_of_month.weekday()): calendar_grid_ref.current.controls.append(ft.Container())
-        
-        days_in_month = (today.replace(month=today.month % 12 + 1, day=1) - datetime.timedelta(days=1)).day
-        for day_num in range(1, days_in_month + 1):
-            day_date = datetime.date(today.year, today.month, day_num)
-            calendar_grid_ref.current.controls.append(
-                ft.Container(content=ft.Text(str(day_num), color=TEXT_COLOR), alignment=ft.alignment.center, border_radius=20, data=day_date.isoformat())
+        if calendar_ref.current is None:
+            calendar_ref.current = JournalCalendar(
+                lambda first, last: store.journal_dates_between(app_state["user_id"], first.isoformat(), last.isoformat()),
+                today_color=PRIMARY_COLOR, entry_color=ft.Colors.with_opacity(0.3, SUCCESS_COLOR),
+                text_color=TEXT_COLOR, label_color=TEXT_MUTED,
             )
+            mood_chart_ref.current = MoodTrendChart(line_color=PRIMARY_COLOR, grid_color=BORDER_COLOR)
+            heatmap_ref.current = JournalHeatmap(color=SUCCESS_COLOR, empty_color=BORDER_COLOR)
+            load_charts()
 
         left_sidebar = ft.Container(
             content=ft.Column([
@@ -233,7 +250,7 @@ def main(page: ft.Page):
                 ft.Row(controls=mood_items, alignment=ft.MainAxisAlignment.SPACE_EVENLY),
                 ft.Divider(),
                 ft.Text("Journaling Activity", weight=ft.FontWeight.BOLD, size=18, color=BLACK),
-                calendar_grid_ref.current,
+                calendar_ref.current,
             ], spacing=15, scroll=ft.ScrollMode.AUTO),
             width=400, padding=20, bgcolor=WHITE, border_radius=10,
             shadow=ft.BoxShadow(blur_radius=10, color=ft.Colors.with_opacity(0.1, SHADOW_COLOR))
@@ -250,16 +267,20 @@ def main(page: ft.Page):
         right_sidebar = ft.Container(
             content=ft.Column([
                 ft.Text("Insights & Visuals", weight=ft.FontWeight.BOLD, size=18, color=BLACK),
+                ft.Text(f"Mood trend (last {TREND_DAYS} days)", size=12, color=TEXT_MUTED),
+                mood_chart_ref.current,
+                ft.Text(f"Journaling heatmap (last {HEATMAP_WEEKS} weeks)", size=12, color=TEXT_MUTED),
+                heatmap_ref.current,
                 ft.Divider(),
                 ft.Text("Local Support Resources", weight=ft.FontWeight.BOLD, size=16, color=BLACK),
                 ft.Text("National Center for Mental Health Crisis Hotline", size=12),
                 ft.Text("1553", size=14, weight=ft.FontWeight.BOLD, selectable=True),
                 ft.TextButton("Mapúa University Health Services", url="https://www.mapua.edu.ph/pages/offices/health-services"),
-            ], spacing=8),
+            ], spacing=8, scroll=ft.ScrollMode.AUTO),
             width=300, padding=20, bgcolor=WHITE, border_radius=10,
             shadow=ft.BoxShadow(blur_radius=10, color=ft.Colors.with_opacity(0.1, SHADOW_COLOR))
         )
-        update_calendar_with_entries()
+        page.run_task(start_sync)
         return ft.View(
             "/main",
             [ft.Row([left_sidebar, main_content, right_sidebar], spacing=20, expand=True)],
@@ -269,6 +290,9 @@ def main(page: ft.Page):
             ),
         )
 
+    async def stop_sync():
+        sync_engine.stop()
+
     # --- Route Management ---
     def route_change(e):
         page.views.clear()
@@ -277,6 +301,10 @@ def main(page: ft.Page):
         elif page.route == "/register":
             page.views.append(create_registration_view())
         else:
+            page.run_task(stop_sync)
+            calendar_ref.current = None
+            mood_chart_ref.current = None
+            heatmap_ref.current = None
             app_state["user_id"] = None
             app_state["user_name"] = None
             page.views.append(create_login_view())
@@ -1,17 +1,20 @@
 # back.py
 
 from fastapi import FastAPI, HTTPException, status
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 from datetime import date, timedelta, datetime
-from typing import List, Optional
+from typing import List, Literal, Optional
 import matplotlib.pyplot as plt
 import seaborn as sns
 import pandas as pd
 import sqlite3
 import os
 import hashlib
+import asyncio
+import json
+import threading
 import numpy as np
 
 # --- FastAPI App Initialization ---
@@ -22,6 +25,52 @@ os.makedirs("static", exist_ok=True)
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 
+# --- CHANGE EVENTS (EventHub) ---
+class EventHub:
+    """In-process pub/sub that fans change events out to each user's open event streams.
+
+    Routes run in FastAPI's thread pool, so publish() hands each event to the
+    subscriber's event loop with call_soon_threadsafe.  A subscriber that falls
+    more than QUEUE_SIZE events behind loses the extra events; the client's
+    cursor-based pull still brings it up to date."""
+
+    QUEUE_SIZE = 100
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}  # user_id -> {queue: loop}
+
+    def subscribe(self, user_id: int) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=EventHub.QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.setdefault(user_id, {})[queue] = asyncio.get_running_loop()
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue):
+        with self._lock:
+            queues = self._subscribers.get(user_id, {})
+            queues.pop(queue, None)
+            if not queues:
+                self._subscribers.pop(user_id, None)
+
+    def publish(self, user_id: int, event: dict):
+        with self._lock:
+            targets = list(self._subscribers.get(user_id, {}).items())
+        for queue, loop in targets:
+            loop.call_soon_threadsafe(EventHub._offer, queue, event)
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, event: dict):
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            pass
+
+
+hub = EventHub()
+KEEPALIVE_SECONDS = 15
+
+
 # --- DATA LAYER (DatabaseManager) ---
 class DatabaseManager:
     @staticmethod
@@ -52,6 +101,12 @@ class DatabaseManager:
                            content TEXT,
                            date TEXT,
                            FOREIGN KEY(user_id) REFERENCES users(user_id))''')
+            # Offline clients tag entries with a client_id so a re-sent batch is ignored
+            for table in ("mood_entries", "journal_entries"):
+                columns = [row["name"] for row in c.execute(f"PRAGMA table_info({table})")]
+                if "client_id" not in columns:
+                    c.execute(f"ALTER TABLE {table} ADD COLUMN client_id TEXT")
+                c.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{table}_client_id ON {table}(client_id)")
             conn.commit()
 
     @staticmethod
@@ -92,6 +147,31 @@ class DatabaseManager:
         with DatabaseManager.get_connection() as conn:
             return conn.cursor().execute("SELECT date FROM journal_entries WHERE user_id = ? ORDER BY date DESC", (user_id,)).fetchall()
 
+    @staticmethod
+    def apply_sync_batch(user_id: int, items: list):
+        """Stores a batch of offline entries in one transaction; already-seen client_ids are skipped."""
+        today = datetime.now().date().isoformat()
+        with DatabaseManager.get_connection() as conn:
+            for item in items:
+                if item.kind == "mood":
+                    conn.execute("INSERT OR IGNORE INTO mood_entries (user_id, mood_score, notes, date, client_id) VALUES (?, ?, ?, ?, ?)",
+                                 (user_id, item.mood_score, item.notes, item.date or today, item.client_id))
+                else:
+                    conn.execute("INSERT OR IGNORE INTO journal_entries (user_id, content, date, client_id) VALUES (?, ?, ?, ?)",
+                                 (user_id, item.content, item.date or today, item.client_id))
+            conn.commit()
+
+    @staticmethod
+    def get_changes(user_id: int, mood_after: int, journal_after: int):
+        """Returns the entries added after the given row ids, oldest first."""
+        with DatabaseManager.get_connection() as conn:
+            c = conn.cursor()
+            moods = c.execute("SELECT id, client_id, mood_score, notes, date FROM mood_entries WHERE user_id = ? AND id > ? ORDER BY id",
+                              (user_id, mood_after)).fetchall()
+            journals = c.execute("SELECT id, client_id, content, date FROM journal_entries WHERE user_id = ? AND id > ? ORDER BY id",
+                                 (user_id, journal_after)).fetchall()
+            return [dict(row) for row in moods], [dict(row) for row in journals]
+
     @staticmethod
     def get_mood_entries(user_id: int, limit: int = 30):
         with DatabaseManager.get_connection() as conn:
@@ -116,6 +196,19 @@ class JournalInput(BaseModel):
     user_id: int
     content: str
 
+class SyncItem(BaseModel):
+    client_id: str
+    kind: Literal["mood", "journal"]
+    mood_score: Optional[int] = None
+    notes: Optional[str] = ""
+    content: Optional[str] = None
+    date: Optional[str] = None
+
+class SyncBatch(BaseModel):
+    user_id: int
+    items: List[SyncItem]
+    origin: Optional[str] = None  # id of the sending client, which is not sent its own sync event
+
 # --- API ROUTES ---
 @app.post("/api/register", tags=["Authentication"])
 def register_user(user_input: UserAuthInput):
@@ -139,14 +232,59 @@ def login_user(user_input: UserAuthInput):
 @app.post("/api/mood-entry", tags=["Mood Tracking"])
 def add_mood(entry: MoodInput):
     DatabaseManager.add_mood_entry(entry.user_id, entry.mood_score, entry.notes)
+    hub.publish(entry.user_id, {"type": "mood", "date": datetime.now().date().isoformat(), "mood_score": entry.mood_score})
     return {"message": "Mood entry added successfully"}
 
 @app.post("/api/journal-entry", tags=["Journaling"])
 def add_journal(entry: JournalInput):
     DatabaseManager.add_journal_entry(entry.user_id, entry.content)
+    hub.publish(entry.user_id, {"type": "journal", "date": datetime.now().date().isoformat()})
     return {"message": "Journal entry added successfully"}
 
 @app.get("/api/journal-dates/{user_id}", tags=["Journaling"])
 def get_journal_dates(user_id: int):
     entries = DatabaseManager.get_journal_entries(user_id)
-    return {"dates": [entry['date'] for entry in entries]}
\ No newline at end of file
+    return {"dates": [entry['date'] for entry in entries]}
+
+# --- Offline Sync ---
+@app.post("/api/sync", tags=["Sync"])
+def sync_batch(batch: SyncBatch):
+    DatabaseManager.apply_sync_batch(batch.user_id, batch.items)
+    if batch.items:
+        hub.publish(batch.user_id, {"type": "sync", "count": len(batch.items), "origin": batch.origin})
+    return {"accepted": [item.client_id for item in batch.items]}
+
+@app.get("/api/changes/{user_id}", tags=["Sync"])
+def get_changes(user_id: int, since: str = "0:0"):
+    """Returns entries newer than the cursor "<mood id>:<journal id>" plus the next cursor."""
+    try:
+        mood_after, journal_after = (int(part) for part in since.split(":"))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid sync cursor.")
+    moods, journals = DatabaseManager.get_changes(user_id, mood_after, journal_after)
+    if moods:
+        mood_after = moods[-1]["id"]
+    if journals:
+        journal_after = journals[-1]["id"]
+    return {"moods": moods, "journals": journals, "cursor": f"{mood_after}:{journal_after}"}
+
+@app.get("/api/events/{user_id}", tags=["Sync"])
+async def stream_events(user_id: int, origin: Optional[str] = None):
+    """Server-Sent Events stream of the user's changes; clients pull /changes when one arrives.
+    A client passing its origin id is not sent the sync events of its own uploads."""
+    queue = hub.subscribe(user_id)
+
+    async def event_stream():
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_SECONDS)
+                    if origin is not None and event.get("origin") == origin:
+                        continue
+                    yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+        finally:
+            hub.unsubscribe(user_id, queue)
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
\ No newline at end of file
@@ -0,0 +1,107 @@
+# calendar_view.py
+
+import calendar
+import datetime
+from typing import Callable, Dict, Iterable, Set, Tuple
+
+import flet as ft
+
+WEEKDAY_LABELS = ["M", "T", "W", "T", "F", "S", "S"]
+
+
+class JournalCalendar(ft.Column):
+    """Month grid that highlights the days with a journal entry.
+
+    Day cells are kept in a dict keyed by ISO date, so marking a new entry
+    recolors one cell instead of walking the whole grid.  The set of entry
+    dates is loaded one month at a time through `load_month(first, last)`
+    and cached per month; the grid itself is only rebuilt when the visible
+    month changes.  Callers are responsible for calling page.update()."""
+
+    def __init__(self, load_month: Callable[[datetime.date, datetime.date], Iterable[str]],
+                 today_color: str, entry_color: str, text_color: str, label_color: str):
+        self.load_month = load_month
+        self.today_color = today_color
+        self.entry_color = entry_color
+        self.text_color = text_color
+        self.label_color = label_color
+        self.cells: Dict[str, ft.Container] = {}
+        self.month_cache: Dict[Tuple[int, int], Set[str]] = {}
+        self.year = self.month = None
+
+        self.title = ft.Text(weight=ft.FontWeight.BOLD, color=text_color)
+        self.grid = ft.GridView(expand=False, runs_count=7, max_extent=40, child_aspect_ratio=1.0, spacing=5, run_spacing=5)
+        super().__init__([
+            ft.Row([
+                ft.IconButton(icon=ft.Icons.CHEVRON_LEFT, tooltip="Previous month", on_click=lambda _: self.shift_month(-1)),
+                self.title,
+                ft.IconButton(icon=ft.Icons.CHEVRON_RIGHT, tooltip="Next month", on_click=lambda _: self.shift_month(1)),
+            ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
+            self.grid,
+        ], spacing=5)
+        today = datetime.date.today()
+        self.show_month(today.year, today.month)
+
+    # --- Month data ---
+    def _entry_dates(self, year: int, month: int) -> Set[str]:
+        key = (year, month)
+        if key not in self.month_cache:
+            first = datetime.date(year, month, 1)
+            last = first.replace(day=calendar.monthrange(year, month)[1])
+            self.month_cache[key] = set(self.load_month(first, last))
+        return self.month_cache[key]
+
+    def invalidate(self):
+        """Drops cached months (e.g. after a sync brought in other devices' entries) and repaints."""
+        self.month_cache.clear()
+        entry_dates = self._entry_dates(self.year, self.month)
+        for day_str in self.cells:
+            self._paint_cell(day_str, entry_dates)
+
+    # --- Grid ---
+    def show_month(self, year: int, month: int):
+        if (year, month) == (self.year, self.month):
+            return
+        self.year, self.month = year, month
+        self.title.value = datetime.date(year, month, 1).strftime("%B %Y")
+        entry_dates = self._entry_dates(year, month)
+
+        controls = [ft.Container(ft.Text(day, weight=ft.FontWeight.BOLD, color=self.label_color), alignment=ft.alignment.center)
+                    for day in WEEKDAY_LABELS]
+        first_weekday, days_in_month = calendar.monthrange(year, month)
+        controls.extend(ft.Container() for _ in range(first_weekday))
+        self.cells = {}
+        for day_num in range(1, days_in_month + 1):
+            day_str = datetime.date(year, month, day_num).isoformat()
+            cell = ft.Container(content=ft.Text(str(day_num)), alignment=ft.alignment.center, border_radius=20, data=day_str)
+            self.cells[day_str] = cell
+            self._paint_cell(day_str, entry_dates)
+            controls.append(cell)
+        self.grid.controls = controls
+
+    def shift_month(self, step: int):
+        year, month = divmod(self.year * 12 + (self.month - 1) + step, 12)
+        self.show_month(year, month + 1)
+        if self.page:
+            self.update()
+
+    def mark_entry(self, day: datetime.date):
+        """Records a new entry on `day` and recolors only that cell."""
+        day_str = day.isoformat()
+        entry_dates = self.month_cache.get((day.year, day.month))
+        if entry_dates is not None:
+            entry_dates.add(day_str)
+        if day_str in self.cells:
+            self._paint_cell(day_str, entry_dates or {day_str})
+
+    def _paint_cell(self, day_str: str, entry_dates: Set[str]):
+        cell = self.cells[day_str]
+        if day_str == datetime.date.today().isoformat():
+            cell.bgcolor = self.today_color
+            cell.content.color = ft.Colors.WHITE
+        elif day_str in entry_dates:
+            cell.bgcolor = self.entry_color
+            cell.content.color = ft.Colors.BLACK
+        else:
+            cell.bgcolor = None
+            cell.content.color = self.text_color
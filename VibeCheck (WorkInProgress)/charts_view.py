@@ -0,0 +1,95 @@
+# charts_view.py
+
+import datetime
+from typing import Dict, Iterable, List, Tuple
+
+import flet as ft
+
+TREND_DAYS = 30        # days shown in the mood trend
+HEATMAP_WEEKS = 12     # weeks shown in the journaling heatmap
+
+
+class MoodTrendChart(ft.LineChart):
+    """Daily average mood over the last TREND_DAYS days, drawn natively by Flet.
+
+    Per-day totals are cached, so a new mood entry only updates one day
+    and rebuilds at most TREND_DAYS points.  Callers call page.update()."""
+
+    def __init__(self, line_color: str, grid_color: str):
+        self.daily: Dict[str, List[float]] = {}  # ISO date -> [score total, entry count]
+        self.line = ft.LineChartData(data_points=[], stroke_width=3, color=line_color, curved=True, point=True)
+        super().__init__(
+            data_series=[self.line], min_x=0, max_x=TREND_DAYS - 1, min_y=0, max_y=10, height=180,
+            left_axis=ft.ChartAxis(labels_size=24, labels_interval=5),
+            bottom_axis=ft.ChartAxis(labels_size=24),
+            horizontal_grid_lines=ft.ChartGridLines(interval=5, color=grid_color, width=1),
+            tooltip_bgcolor=ft.Colors.with_opacity(0.8, ft.Colors.WHITE),
+        )
+
+    def load(self, daily_rows: Iterable[Tuple[str, float, int]]):
+        """Replaces the cache with (date, score total, entry count) rows."""
+        self.daily = {day: [total, count] for day, total, count in daily_rows}
+        self._redraw()
+
+    def add_mood(self, day: datetime.date, score: int):
+        totals = self.daily.setdefault(day.isoformat(), [0, 0])
+        totals[0] += score
+        totals[1] += 1
+        self._redraw()
+
+    def _redraw(self):
+        first = datetime.date.today() - datetime.timedelta(days=TREND_DAYS - 1)
+        points = []
+        for offset in range(TREND_DAYS):
+            totals = self.daily.get((first + datetime.timedelta(days=offset)).isoformat())
+            if totals:
+                points.append(ft.LineChartDataPoint(offset, round(totals[0] / totals[1], 1)))
+        self.line.data_points = points
+        self.bottom_axis.labels = [
+            ft.ChartAxisLabel(value=offset, label=ft.Text((first + datetime.timedelta(days=offset)).strftime("%b %d"), size=10))
+            for offset in (0, TREND_DAYS // 2, TREND_DAYS - 1)
+        ]
+
+
+class JournalHeatmap(ft.Row):
+    """Entries per day for the last HEATMAP_WEEKS weeks, one column per week.
+
+    Cells are keyed by ISO date like the calendar, so a new entry recolors
+    a single cell.  Callers call page.update()."""
+
+    def __init__(self, color: str, empty_color: str):
+        self.color = color
+        self.empty_color = empty_color
+        self.counts: Dict[str, int] = {}
+        self.cells: Dict[str, ft.Container] = {}
+        today = datetime.date.today()
+        start = today - datetime.timedelta(days=today.weekday() + 7 * (HEATMAP_WEEKS - 1))
+        weeks = []
+        for week in range(HEATMAP_WEEKS):
+            column = []
+            for weekday in range(7):
+                day = start + datetime.timedelta(days=7 * week + weekday)
+                cell = ft.Container(width=14, height=14, border_radius=3, tooltip=day.strftime("%b %d"))
+                if day <= today:
+                    self.cells[day.isoformat()] = cell
+                column.append(cell)
+            weeks.append(ft.Column(column, spacing=3))
+        super().__init__(weeks, spacing=3)
+        self.first_day = start.isoformat()
+
+    def load(self, counts: Iterable[Tuple[str, int]]):
+        self.counts = dict(counts)
+        for day_str in self.cells:
+            self._paint_cell(day_str)
+
+    def add_entry(self, day: datetime.date):
+        day_str = day.isoformat()
+        self.counts[day_str] = self.counts.get(day_str, 0) + 1
+        if day_str in self.cells:
+            self._paint_cell(day_str)
+
+    def _paint_cell(self, day_str: str):
+        count = self.counts.get(day_str, 0)
+        cell = self.cells[day_str]
+        cell.bgcolor = ft.Colors.with_opacity(min(1.0, 0.25 + 0.25 * count), self.color) if count else self.empty_color
+        cell.tooltip = f"{day_str}: {count} entr{'y' if count == 1 else 'ies'}"
@@ -0,0 +1,147 @@
+# local_store.py
+
+import json
+import sqlite3
+import uuid
+from datetime import date
+from typing import List
+
+LOCAL_DB = "vibecheck_local.db"
+
+
+class LocalStore:
+    """Client-side SQLite copy of the user's entries.
+
+    Every mood or journal entry is written here first, together with an
+    outbox row carrying its client_id (the idempotency key the server uses
+    to ignore re-sent entries).  The UI only ever reads from this store, so
+    a slow or unreachable backend never blocks an interaction."""
+
+    def __init__(self, path: str = LOCAL_DB):
+        self.path = path
+        self.init_db()
+
+    def get_connection(self):
+        conn = sqlite3.connect(self.path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def init_db(self):
+        with self.get_connection() as conn:
+            c = conn.cursor()
+            c.execute('''CREATE TABLE IF NOT EXISTS mood_entries (
+                           client_id TEXT PRIMARY KEY,
+                           user_id INTEGER,
+                           mood_score INTEGER,
+                           notes TEXT,
+                           date TEXT)''')
+            c.execute('''CREATE TABLE IF NOT EXISTS journal_entries (
+                           client_id TEXT PRIMARY KEY,
+                           user_id INTEGER,
+                           content TEXT,
+                           date TEXT)''')
+            c.execute('''CREATE TABLE IF NOT EXISTS outbox (
+                           seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                           user_id INTEGER,
+                           client_id TEXT UNIQUE,
+                           payload TEXT)''')
+            c.execute('''CREATE TABLE IF NOT EXISTS sync_state (
+                           user_id INTEGER PRIMARY KEY,
+                           cursor TEXT)''')
+            c.execute("CREATE INDEX IF NOT EXISTS idx_journal_user_date ON journal_entries(user_id, date)")
+            c.execute("CREATE INDEX IF NOT EXISTS idx_mood_user_date ON mood_entries(user_id, date)")
+            conn.commit()
+
+    # --- Local writes (entry + outbox row in one transaction) ---
+    def add_mood(self, user_id: int, mood_score: int, notes: str = "") -> str:
+        client_id = uuid.uuid4().hex
+        today = date.today().isoformat()
+        payload = {"client_id": client_id, "kind": "mood", "mood_score": mood_score, "notes": notes, "date": today}
+        with self.get_connection() as conn:
+            conn.execute("INSERT INTO mood_entries (client_id, user_id, mood_score, notes, date) VALUES (?, ?, ?, ?, ?)",
+                         (client_id, user_id, mood_score, notes, today))
+            conn.execute("INSERT INTO outbox (user_id, client_id, payload) VALUES (?, ?, ?)",
+                         (user_id, client_id, json.dumps(payload)))
+            conn.commit()
+        return client_id
+
+    def add_journal(self, user_id: int, content: str) -> str:
+        client_id = uuid.uuid4().hex
+        today = date.today().isoformat()
+        payload = {"client_id": client_id, "kind": "journal", "content": content, "date": today}
+        with self.get_connection() as conn:
+            conn.execute("INSERT INTO journal_entries (client_id, user_id, content, date) VALUES (?, ?, ?, ?)",
+                         (client_id, user_id, content, today))
+            conn.execute("INSERT INTO outbox (user_id, client_id, payload) VALUES (?, ?, ?)",
+                         (user_id, client_id, json.dumps(payload)))
+            conn.commit()
+        return client_id
+
+    # --- Local reads ---
+    def journal_dates(self, user_id: int) -> List[str]:
+        with self.get_connection() as conn:
+            rows = conn.execute("SELECT DISTINCT date FROM journal_entries WHERE user_id = ? ORDER BY date DESC", (user_id,)).fetchall()
+            return [row["date"] for row in rows]
+
+    def journal_dates_between(self, user_id: int, first: str, last: str) -> List[str]:
+        """Returns the entry dates in [first, last]; served by the (user_id, date) index."""
+        with self.get_connection() as conn:
+            rows = conn.execute("SELECT DISTINCT date FROM journal_entries WHERE user_id = ? AND date BETWEEN ? AND ?",
+                                (user_id, first, last)).fetchall()
+            return [row["date"] for row in rows]
+
+    def mood_entries(self, user_id: int) -> List[dict]:
+        with self.get_connection() as conn:
+            rows = conn.execute("SELECT mood_score, notes, date FROM mood_entries WHERE user_id = ? ORDER BY date", (user_id,)).fetchall()
+            return [dict(row) for row in rows]
+
+    def mood_daily_totals(self, user_id: int, since: str) -> List[tuple]:
+        """Returns (date, score total, entry count) per day from `since` on."""
+        with self.get_connection() as conn:
+            rows = conn.execute("SELECT date, SUM(mood_score), COUNT(*) FROM mood_entries WHERE user_id = ? AND date >= ? GROUP BY date",
+                                (user_id, since)).fetchall()
+            return [tuple(row) for row in rows]
+
+    def journal_counts(self, user_id: int, since: str) -> List[tuple]:
+        """Returns (date, entry count) per day from `since` on."""
+        with self.get_connection() as conn:
+            rows = conn.execute("SELECT date, COUNT(*) FROM journal_entries WHERE user_id = ? AND date >= ? GROUP BY date",
+                                (user_id, since)).fetchall()
+            return [tuple(row) for row in rows]
+
+    # --- Outbox ---
+    def pending(self, user_id: int, limit: int) -> List[dict]:
+        """Returns the oldest unsent entries, at most `limit` of them."""
+        with self.get_connection() as conn:
+            rows = conn.execute("SELECT payload FROM outbox WHERE user_id = ? ORDER BY seq LIMIT ?", (user_id, limit)).fetchall()
+            return [json.loads(row["payload"]) for row in rows]
+
+    def pending_count(self, user_id: int) -> int:
+        with self.get_connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM outbox WHERE user_id = ?", (user_id,)).fetchone()[0]
+
+    def mark_sent(self, client_ids: List[str]):
+        with self.get_connection() as conn:
+            conn.executemany("DELETE FROM outbox WHERE client_id = ?", [(client_id,) for client_id in client_ids])
+            conn.commit()
+
+    # --- Pulled server changes ---
+    def get_cursor(self, user_id: int) -> str:
+        with self.get_connection() as conn:
+            row = conn.execute("SELECT cursor FROM sync_state WHERE user_id = ?", (user_id,)).fetchone()
+            return row["cursor"] if row else "0:0"
+
+    def apply_changes(self, user_id: int, changes: dict) -> bool:
+        """Merges a /changes response and advances the cursor.  Returns True if anything new arrived."""
+        moods = [(row["client_id"] or f"server-mood-{row['id']}", user_id, row["mood_score"], row["notes"], row["date"])
+                 for row in changes.get("moods", [])]
+        journals = [(row["client_id"] or f"server-journal-{row['id']}", user_id, row["content"], row["date"])
+                    for row in changes.get("journals", [])]
+        with self.get_connection() as conn:
+            before = conn.total_changes
+            conn.executemany("INSERT OR IGNORE INTO mood_entries (client_id, user_id, mood_score, notes, date) VALUES (?, ?, ?, ?, ?)", moods)
+            conn.executemany("INSERT OR IGNORE INTO journal_entries (client_id, user_id, content, date) VALUES (?, ?, ?, ?)", journals)
+            added = conn.total_changes - before
+            conn.execute("INSERT OR REPLACE INTO sync_state (user_id, cursor) VALUES (?, ?)", (user_id, changes["cursor"]))
+            conn.commit()
+        return added > 0
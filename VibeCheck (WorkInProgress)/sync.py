@@ -0,0 +1,112 @@
+# sync.py
+
+import asyncio
+import logging
+from typing import Callable, Optional
+
+import httpx
+
+from api_client import ApiClient, ApiError
+from local_store import LocalStore
+
+SYNC_BATCH_SIZE = 50
+SYNC_INTERVAL = 300      # seconds; fallback sync period, push events normally wake the task first
+MAX_BACKOFF = 300        # seconds; cap for the delay after failed syncs or event-stream drops
+
+logger = logging.getLogger("vibecheck.sync")
+
+
+class SyncEngine:
+    """Background task that uploads the local outbox and pulls server changes.
+
+    The outbox is sent oldest-first in batches; each entry carries its
+    client_id, so a batch that is re-sent after a lost response is not
+    stored twice.  Server changes are pulled with the cursor kept in the
+    local store whenever the server pushes a change event, so clients do
+    not poll.  While the backend is unreachable the task backs off and
+    keeps the entries queued."""
+
+    def __init__(self, store: LocalStore, api: ApiClient, batch_size: int = SYNC_BATCH_SIZE,
+                 interval: float = SYNC_INTERVAL, on_change: Optional[Callable[[], None]] = None):
+        self.store = store
+        self.api = api
+        self.batch_size = batch_size
+        self.interval = interval
+        self.on_change = on_change
+        self._wake = None
+        self._task = None
+        self._listener = None
+        self._user_id = None
+
+    def start(self, user_id: int):
+        """Starts syncing for `user_id`; does nothing if that user's task is already running."""
+        if self._task and not self._task.done() and self._user_id == user_id:
+            return
+        self.stop()
+        self._user_id = user_id
+        self._wake = asyncio.Event()
+        self._task = asyncio.ensure_future(self._run(user_id))
+        self._listener = asyncio.ensure_future(self._listen(user_id))
+
+    def stop(self):
+        for task in (self._task, self._listener):
+            if task and not task.done():
+                task.cancel()
+        self._task = self._listener = None
+
+    def notify(self):
+        """Wakes the sync task early, e.g. right after a local write."""
+        if self._wake:
+            self._wake.set()
+
+    async def sync_once(self, user_id: int) -> bool:
+        """Pushes every pending entry, then pulls server changes.  Returns True if new data arrived."""
+        while True:
+            batch = self.store.pending(user_id, self.batch_size)
+            if not batch:
+                break
+            result = await self.api.sync_batch(user_id, batch)
+            self.store.mark_sent(result.get("accepted", []))
+            if len(batch) < self.batch_size:
+                break
+        changes = await self.api.changes(user_id, self.store.get_cursor(user_id))
+        return self.store.apply_changes(user_id, changes)
+
+    async def _run(self, user_id: int):
+        delay = self.interval
+        while True:
+            # Cleared before syncing, so a write made during the sync wakes the next one
+            self._wake.clear()
+            try:
+                if await self.sync_once(user_id) and self.on_change:
+                    self.on_change()
+                delay = self.interval
+            except (ApiError, httpx.HTTPError) as ex:
+                delay = min(delay * 2, MAX_BACKOFF)
+                logger.warning("Sync failed, %d entries queued, retrying in %ds: %s",
+                               self.store.pending_count(user_id), delay, ex)
+            except Exception:
+                # Anything else (a bad response, a local store error) must not end the task
+                delay = min(delay * 2, MAX_BACKOFF)
+                logger.exception("Sync failed unexpectedly, retrying in %ds", delay)
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _listen(self, user_id: int):
+        """Subscribes to the server's change events and wakes the sync task on each one."""
+        delay = 1
+        while True:
+            try:
+                async for event in self.api.events(user_id):
+                    logger.debug("Change event: %s", event)
+                    self.notify()
+                    delay = 1
+            except (ApiError, httpx.HTTPError) as ex:
+                logger.info("Event stream dropped, reconnecting in %ds: %s", delay, ex)
+            except Exception:
+                logger.exception("Event stream failed, reconnecting in %ds", delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_BACKOFF)
+            self.notify()  # Catch up on anything missed while disconnected